@@ -0,0 +1,127 @@
+# accounts/activity.py
+"""
+Write-coalesced tracking of User.last_active and UserSession.last_activity.
+
+Requests only record a touch in the shared cache, at most once per user and
+session every ACTIVITY_WINDOW seconds. Touches are grouped in buckets of one
+window; flush() (run periodically by accounts.tasks.flush_last_active_task)
+writes every closed bucket to the database with one UPDATE per table.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import User, UserSession
+
+ACTIVITY_WINDOW = getattr(settings, 'ACCOUNTS_ACTIVITY_WINDOW', 60)
+# Buckets left unflushed for longer than this are dropped by the cache
+BUCKET_TIMEOUT = 60 * 60
+UPDATE_BATCH_SIZE = 500
+
+FLUSHED_KEY = 'accounts:activity:flushed'
+
+
+def _bucket(when):
+    return int(when.timestamp()) // ACTIVITY_WINDOW
+
+
+def _counter_key(bucket):
+    return f"accounts:activity:{bucket}"
+
+
+def _slot_key(bucket, slot):
+    return f"accounts:activity:{bucket}:{slot}"
+
+
+def touch(user_id, session_key=None, when=None):
+    """
+    Record that a user (and optionally one of their sessions) was active.
+    Returns False when the touch falls in the throttle window of a previous one.
+    """
+    when = when or timezone.now()
+    if not cache.add(f"accounts:activity:seen:{user_id}:{session_key or ''}", 1, ACTIVITY_WINDOW):
+        return False
+
+    bucket = _bucket(when)
+    counter = _counter_key(bucket)
+    cache.add(counter, 0, BUCKET_TIMEOUT)
+    slot = cache.incr(counter)
+    cache.set(_slot_key(bucket, slot), (str(user_id), session_key, when), BUCKET_TIMEOUT)
+    return True
+
+
+def flush(now=None):
+    """
+    Write the touches of every closed bucket to the database.
+    Returns the number of users updated.
+    """
+    # The bucket before the current one is left open as well, so touches
+    # that were counted but not stored yet are not skipped.
+    last_closed = _bucket(now or timezone.now()) - 2
+    flushed = cache.get(FLUSHED_KEY)
+    first = last_closed - BUCKET_TIMEOUT // ACTIVITY_WINDOW
+    if flushed is not None:
+        first = max(first, flushed + 1)
+
+    users = {}
+    sessions = {}
+    for bucket in range(first, last_closed + 1):
+        slots = cache.get(_counter_key(bucket))
+        if not slots:
+            continue
+        keys = [_slot_key(bucket, slot) for slot in range(1, slots + 1)]
+        for user_id, session_key, when in cache.get_many(keys).values():
+            if user_id not in users or when > users[user_id]:
+                users[user_id] = when
+            key = (user_id, session_key)
+            if session_key and (key not in sessions or when > sessions[key]):
+                sessions[key] = when
+        cache.delete_many(keys + [_counter_key(bucket)])
+
+    with transaction.atomic():
+        _update_latest(User, ['id'], 'last_active', [
+            (user_id, when) for user_id, when in users.items()
+        ])
+        _update_latest(UserSession, ['user', 'session_key'], 'last_activity', [
+            (user_id, session_key, when) for (user_id, session_key), when in sessions.items()
+        ])
+    cache.set(FLUSHED_KEY, last_closed, None)
+    return len(users)
+
+
+def _update_latest(model, key_fields, field_name, rows):
+    """
+    UPDATE ... FROM (VALUES ...) setting field_name of the rows matching the
+    key fields, unless the stored value is already more recent.
+    """
+    fields = [model._meta.get_field(name) for name in key_fields + [field_name]]
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    column = qn(fields[-1].column)
+
+    if connection.vendor == 'postgresql':
+        placeholder = ', '.join(f"CAST(%s AS {field.db_type(connection)})" for field in fields)
+    else:
+        placeholder = ', '.join(['%s'] * len(fields))
+    conditions = ' AND '.join(
+        f"{table}.{qn(field.column)} = v.column{position}"
+        for position, field in enumerate(fields[:-1], start=1)
+    )
+    value = f"v.column{len(fields)}"
+
+    with connection.cursor() as cursor:
+        for offset in range(0, len(rows), UPDATE_BATCH_SIZE):
+            batch = rows[offset:offset + UPDATE_BATCH_SIZE]
+            values = ', '.join([f"({placeholder})"] * len(batch))
+            params = [
+                field.get_db_prep_value(item, connection)
+                for row in batch
+                for field, item in zip(fields, row)
+            ]
+            cursor.execute(
+                f"UPDATE {table} SET {column} = {value} "
+                f"FROM (VALUES {values}) AS v "
+                f"WHERE {conditions} AND ({table}.{column} IS NULL OR {table}.{column} < {value})",
+                params
+            )
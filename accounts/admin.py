@@ -5,4 +5,22 @@ admin.site.register(User)
 admin.site.register(UserFollowing)
 admin.site.register(RegistrationRequest)
 admin.site.register(UserProfile)
-admin.site.register(UserProjects)
\ No newline at end of file
+admin.site.register(UserProjects)
+
+@admin.register(ApiKey)
+class ApiKeyAdmin(admin.ModelAdmin):
+    list_display = ('name', 'prefix', 'user', 'is_active', 'expires_at', 'last_used_at', 'usage_count')
+    list_filter = ('is_active',)
+    search_fields = ('name', 'prefix', 'user__username', 'user__email')
+    readonly_fields = ('prefix', 'created_at', 'last_used_at', 'usage_count')
+    exclude = ('hashed_secret',)
+    actions = ['revoke_keys']
+    
+    def has_add_permission(self, request):
+        # The secret is shown only once: use `manage.py create_api_key`
+        return False
+    
+    @admin.action(description="Revoke selected API keys")
+    def revoke_keys(self, request, queryset):
+        for api_key in queryset.filter(is_active=True):
+            api_key.revoke()
@@ -0,0 +1,123 @@
+# accounts/api_keys.py
+"""
+Verification of API keys with a per-process cache.
+
+Verified keys are kept in a bounded TTL LRU, so a machine client reusing
+its key costs no query. Revoking or editing a key bumps a version in the
+shared cache, which empties the LRU of every process. Usage counters are
+buffered in memory and written in batches.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from core.cache import TTLCache, VersionedLocalCache
+from core.instrumentation import count_cache
+
+from .models import ApiKey
+
+logger = logging.getLogger(__name__)
+
+API_KEY_CACHE_SIZE = getattr(settings, 'API_KEY_CACHE_SIZE', 1024)
+# Bounds how long a deactivated user keeps access through a cached key
+API_KEY_CACHE_TTL = getattr(settings, 'API_KEY_CACHE_TTL', 60)
+USAGE_FLUSH_INTERVAL = 30
+USAGE_FLUSH_SIZE = 1000
+
+verified_keys = VersionedLocalCache(
+    'accounts:api_keys',
+    lambda: TTLCache(API_KEY_CACHE_SIZE, API_KEY_CACHE_TTL)
+)
+
+
+class InvalidApiKey(Exception):
+    """Raised when an API key is malformed, unknown, revoked or expired."""
+
+
+def authenticate_key(raw_key):
+    """Return the ApiKey (with its user) matching raw_key or raise InvalidApiKey."""
+    prefix, _, secret = raw_key.partition('.')
+    if not prefix or not secret:
+        raise InvalidApiKey("Malformed API key.")
+
+    cache = verified_keys.get()
+    api_key = cache.get(prefix)
+    count_cache(api_key is not None)
+    if api_key is None:
+        api_key = ApiKey.objects.select_related('user').filter(
+            prefix=prefix,
+            is_active=True
+        ).first()
+        if api_key is None:
+            raise InvalidApiKey("Invalid API key.")
+
+    if not api_key.check_secret(secret):
+        raise InvalidApiKey("Invalid API key.")
+    if api_key.is_expired() or not api_key.user.is_active:
+        cache.pop(prefix)
+        raise InvalidApiKey("API key expired or user inactive.")
+
+    cache.set(prefix, api_key)
+    usage.record(api_key.pk)
+    return api_key
+
+
+def invalidate_verified_keys():
+    """Forget the verified keys of every process once the change commits."""
+    verified_keys.invalidate_on_commit()
+
+
+class UsageBuffer:
+    """Per-process use counts of API keys, written in batches."""
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def record(self, key_id):
+        with self._lock:
+            self._counts[key_id] += 1
+            due = (
+                len(self._counts) >= USAGE_FLUSH_SIZE
+                or time.monotonic() - self._last_flush >= USAGE_FLUSH_INTERVAL
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        """
+        Add the buffered counts to ApiKey.usage_count in one UPDATE.
+        Failures are logged and the counts kept for the next flush, so a
+        database error never fails the request that triggered it.
+        """
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+            self._last_flush = time.monotonic()
+        if not counts:
+            return 0
+        try:
+            ApiKey.objects.filter(pk__in=counts).update(
+                usage_count=F('usage_count') + Case(
+                    *[When(pk=key_id, then=Value(count)) for key_id, count in counts.items()],
+                    output_field=IntegerField()
+                ),
+                last_used_at=timezone.now()
+            )
+        except Exception:
+            logger.exception("Failed to write the usage counts of %d API keys", len(counts))
+            with self._lock:
+                self._counts.update(counts)
+            return 0
+        return len(counts)
+
+
+usage = UsageBuffer()
+# Counts recorded since the last flush would otherwise be lost on shutdown
+atexit.register(usage.flush)
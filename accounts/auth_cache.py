@@ -0,0 +1,78 @@
+# accounts/auth_cache.py
+"""
+Shared cache of the users resolved by JWT authentication.
+
+Each entry holds the field values of the user and its profile, together
+with the token version it was verified for: the password hash claim of
+SimpleJWT when CHECK_REVOKE_TOKEN is enabled, None otherwise. The password
+hash is never cached: it is left deferred on the users rebuilt from the
+cache. Entries are dropped whenever the user or their profile changes,
+which is what keeps them current.
+"""
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.fields.files import FieldFile
+
+from core.instrumentation import count_cache
+
+from .models import User, UserProfile
+
+AUTH_USER_CACHE_TIMEOUT = 5 * 60
+EXCLUDED_FIELDS = {'password'}
+
+
+def _cache_key(user_id):
+    return f"accounts:auth_user:{user_id}"
+
+
+def _field_values(instance):
+    values = {}
+    for field in instance._meta.concrete_fields:
+        if field.attname in EXCLUDED_FIELDS:
+            continue
+        value = getattr(instance, field.attname)
+        # Pickling a FieldFile would pickle the whole instance with it
+        values[field.attname] = value.name if isinstance(value, FieldFile) else value
+    return values
+
+
+def _from_values(model, values):
+    return model.from_db(DEFAULT_DB_ALIAS, list(values), list(values.values()))
+
+
+def get_user(user_id, version):
+    """Return the cached user verified for this token version, or None."""
+    cached = cache.get(_cache_key(user_id))
+    hit = cached is not None and cached[0] == version
+    count_cache(hit)
+    if not hit:
+        return None
+
+    _, user_values, profile_values = cached
+    user = _from_values(User, user_values)
+    profile = None
+    if profile_values is not None:
+        profile = _from_values(UserProfile, profile_values)
+        profile.user = user
+    User.profile.related.set_cached_value(user, profile)
+    return user
+
+
+def cache_user(user, version):
+    """Store the fields of user and of its profile, which most views touch."""
+    try:
+        profile = user.profile
+    except UserProfile.DoesNotExist:
+        profile = None
+    cache.set(
+        _cache_key(user.pk),
+        (version, _field_values(user), _field_values(profile) if profile is not None else None),
+        AUTH_USER_CACHE_TIMEOUT
+    )
+
+
+def invalidate_users(user_ids):
+    """Drop the cached users once the current transaction commits."""
+    keys = [_cache_key(user_id) for user_id in user_ids]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
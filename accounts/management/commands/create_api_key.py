@@ -0,0 +1,30 @@
+# accounts/management/commands/create_api_key.py
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from accounts.models import ApiKey, User
+
+
+class Command(BaseCommand):
+    help = "Create an API key for a user and print it. The key cannot be shown again."
+    
+    def add_arguments(self, parser):
+        parser.add_argument('email', help="E-mail of the user owning the key.")
+        parser.add_argument('name', help="Name of the client using the key.")
+        parser.add_argument('--expires-in-days', type=int, help="Expire the key after this many days.")
+    
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(email=User.objects.normalize_email(options['email']))
+        except User.DoesNotExist:
+            raise CommandError(f"No user with e-mail {options['email']}.")
+        
+        expires_at = None
+        if options['expires_in_days']:
+            expires_at = timezone.now() + timedelta(days=options['expires_in_days'])
+        
+        api_key, raw_key = ApiKey.create_key(user, options['name'], expires_at=expires_at)
+        self.stdout.write(self.style.SUCCESS(f"Created API key {api_key.prefix} for {user.username}:"))
+        self.stdout.write(raw_key)
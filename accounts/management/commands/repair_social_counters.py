@@ -0,0 +1,56 @@
+# accounts/management/commands/repair_social_counters.py
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from accounts.models import User, UserFollowing
+from social.models import Post
+
+
+def _count(queryset, field):
+    """Correlated COUNT of queryset rows whose field points at the outer user."""
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef('pk')})
+            .order_by()
+            .values(field)
+            .annotate(total=Count('pk'))
+            .values('total'),
+            output_field=IntegerField()
+        ),
+        0
+    )
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized followers, following and post counters of users."
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Only report the number of users with wrong counters."
+        )
+    
+    def handle(self, *args, **options):
+        actual = {
+            'followers_count': _count(UserFollowing.objects.all(), 'following_user'),
+            'following_count': _count(UserFollowing.objects.all(), 'user'),
+            'post_count': _count(Post.objects.all(), 'user'),
+        }
+        wrong = User.objects.annotate(
+            **{f'actual_{field}': expression for field, expression in actual.items()}
+        ).filter(
+            ~Q(followers_count=F('actual_followers_count'))
+            | ~Q(following_count=F('actual_following_count'))
+            | ~Q(post_count=F('actual_post_count'))
+        )
+        
+        if options['dry_run']:
+            self.stdout.write(f"{wrong.count()} users have wrong counters.")
+            return
+        
+        repaired = User.objects.filter(
+            pk__in=wrong.values('pk')
+        ).update(**actual)
+        self.stdout.write(self.style.SUCCESS(f"Repaired counters of {repaired} users."))
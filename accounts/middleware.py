@@ -0,0 +1,23 @@
+# accounts/middleware.py
+from . import activity
+
+
+class LastActiveMiddleware:
+    """
+    Record the activity of authenticated users. Touches are coalesced in
+    the cache and written by accounts.tasks.flush_last_active_task, so this
+    adds no database write to the request.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        response = self.get_response(request)
+        
+        # DRF copies the user it authenticated (JWT, API key) onto the request
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            session = getattr(request, 'session', None)
+            activity.touch(user.pk, session.session_key if session is not None else None)
+        
+        return response
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.4 on 2026-10-19 13:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['-points', 'id'], name='accounts_us_points_7f7e49_idx'),
+        ),
+    ]
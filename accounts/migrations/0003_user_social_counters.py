@@ -0,0 +1,57 @@
+# Generated by Django 5.0.4 on 2026-10-19 13:30
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def _count(model, field):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef('pk')})
+            .order_by()
+            .values(field)
+            .annotate(total=Count('pk'))
+            .values('total'),
+            output_field=IntegerField()
+        ),
+        0
+    )
+
+
+def populate_counters(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    UserFollowing = apps.get_model('accounts', 'UserFollowing')
+    Post = apps.get_model('social', 'Post')
+    User.objects.update(
+        followers_count=_count(UserFollowing, 'following_user'),
+        following_count=_count(UserFollowing, 'user'),
+        post_count=_count(Post, 'user'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_points_index'),
+        ('social', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='followers count'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='following_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='following count'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='post count'),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.4 on 2026-10-19 14:50
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_user_social_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApiKey',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100, verbose_name='name')),
+                ('prefix', models.CharField(editable=False, max_length=16, unique=True, verbose_name='prefix')),
+                ('hashed_secret', models.CharField(editable=False, max_length=64, verbose_name='hashed secret')),
+                ('is_active', models.BooleanField(default=True, verbose_name='is active')),
+                ('expires_at', models.DateTimeField(blank=True, null=True, verbose_name='expires at')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='created at')),
+                ('last_used_at', models.DateTimeField(blank=True, editable=False, null=True, verbose_name='last used at')),
+                ('usage_count', models.PositiveBigIntegerField(default=0, editable=False, verbose_name='usage count')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='api_keys', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'API key',
+                'verbose_name_plural': 'API keys',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
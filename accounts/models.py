@@ -1,12 +1,19 @@
+import hashlib
+import hmac
+import secrets
 import uuid
 
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser, BaseUserManager
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.db import models, transaction
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+PROFILE_SUMMARY_CACHE_KEY = 'accounts:profile_summary:{}'
+PROFILE_SUMMARY_CACHE_TIMEOUT = 60 * 60
+
 
 class Tag(models.Model):
     """Tags for categorizing content."""
@@ -77,6 +84,12 @@ class User(AbstractUser):
     date_joined = models.DateTimeField(_('date joined'), default=timezone.now)
     last_active = models.DateTimeField(_('last active'), null=True, blank=True)
     
+    # Denormalized social counters, maintained by accounts.signals
+    # (repair with `manage.py repair_social_counters`)
+    followers_count = models.PositiveIntegerField(_('followers count'), default=0)
+    following_count = models.PositiveIntegerField(_('following count'), default=0)
+    post_count = models.PositiveIntegerField(_('post count'), default=0)
+    
     # Social links
     github_url = models.URLField(_('GitHub URL'), blank=True)
     gitlab_url = models.URLField(_('GitLab URL'), blank=True)
@@ -96,6 +109,10 @@ class User(AbstractUser):
         verbose_name = _('user')
         verbose_name_plural = _('users')
         ordering = ['-date_joined']
+        indexes = [
+            # Global leaderboard order; lets the rank window stop at the page
+            models.Index(fields=['-points', 'id']),
+        ]
     
     def __str__(self):
         return self.username
@@ -112,10 +129,44 @@ class User(AbstractUser):
                 return rank
         return 'C'  # Default rank
     
-    def update_last_active(self):
-        """Update the last active timestamp."""
+    def get_profile_summary(self):
+        """
+        Return the display name and skills shown in the app header, cached
+        until the profile or its skills change.
+        """
+        from core.instrumentation import count_cache
+        
+        key = PROFILE_SUMMARY_CACHE_KEY.format(self.pk)
+        summary = cache.get(key)
+        count_cache(summary is not None)
+        if summary is None:
+            profile = (
+                UserProfile.objects
+                .prefetch_related('skills')
+                .filter(user=self)
+                .first()
+            )
+            summary = {
+                'display_name': profile.display_name if profile else '',
+                'skills': [
+                    {'name': skill.name, 'icon': skill.icon or None, 'type': skill.skill_type}
+                    for skill in (profile.skills.all() if profile else [])
+                ],
+            }
+            cache.set(key, summary, PROFILE_SUMMARY_CACHE_TIMEOUT)
+        return summary
+    
+    def update_last_active(self, immediate=False):
+        """
+        Update the last active timestamp. Unless immediate, the write is
+        coalesced with other activity and happens on the next flush.
+        """
         self.last_active = timezone.now()
-        self.save(update_fields=['last_active'])
+        if immediate:
+            self.save(update_fields=['last_active'])
+        else:
+            from .activity import touch
+            touch(self.pk, when=self.last_active)
         
 
     def update_points(self, amount):
@@ -257,4 +308,60 @@ class UserProjects(models.Model):
         return f"{self.project_name} - {self.user.username}"
     
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+
+
+class ApiKey(models.Model):
+    """
+    API key of a machine client. The key is given out once as
+    "<prefix>.<secret>"; only the prefix and a hash of the secret are stored.
+    """
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='api_keys')
+    name = models.CharField(_('name'), max_length=100)
+    prefix = models.CharField(_('prefix'), max_length=16, unique=True, editable=False)
+    hashed_secret = models.CharField(_('hashed secret'), max_length=64, editable=False)
+    is_active = models.BooleanField(_('is active'), default=True)
+    expires_at = models.DateTimeField(_('expires at'), null=True, blank=True)
+    created_at = models.DateTimeField(_('created at'), auto_now_add=True)
+    # Maintained in batches by api.authentication, so they lag slightly
+    last_used_at = models.DateTimeField(_('last used at'), null=True, blank=True, editable=False)
+    usage_count = models.PositiveBigIntegerField(_('usage count'), default=0, editable=False)
+    
+    class Meta:
+        verbose_name = _('API key')
+        verbose_name_plural = _('API keys')
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.name} ({self.prefix}) for {self.user.username}"
+    
+    @staticmethod
+    def hash_secret(secret):
+        # Secrets are random 256-bit tokens, so a fast hash is sufficient
+        return hashlib.sha256(secret.encode()).hexdigest()
+    
+    @classmethod
+    def create_key(cls, user, name, expires_at=None):
+        """Create a key for user. Returns (api_key, raw_key); raw_key is not stored."""
+        prefix = secrets.token_hex(4)
+        secret = secrets.token_urlsafe(32)
+        api_key = cls.objects.create(
+            user=user,
+            name=name,
+            prefix=prefix,
+            hashed_secret=cls.hash_secret(secret),
+            expires_at=expires_at
+        )
+        return api_key, f"{prefix}.{secret}"
+    
+    def check_secret(self, secret):
+        return hmac.compare_digest(self.hashed_secret, self.hash_secret(secret))
+    
+    def is_expired(self):
+        return self.expires_at is not None and self.expires_at <= timezone.now()
+    
+    def revoke(self):
+        self.is_active = False
+        self.save(update_fields=['is_active'])
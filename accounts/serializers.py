@@ -32,18 +32,19 @@ class LeaderboardUserSerializer(serializers.ModelSerializer):
         ]
 
     def get_rank(self, obj):
-        # Pour de très gros jeux de données, on pourra remplacer par une Window Function
-        all_ids = list(User.objects.order_by('-points').values_list('id', flat=True))
-        return all_ids.index(obj.id) + 1
-  
+        # Annotated by a window function in LeaderboardViewSet.get_queryset
+        return getattr(obj, 'rank', None)
     
     def get_category(self, obj):
         # Utilise votre méthode de modèle get_rank() définie dans User
         return obj.get_rank()
 
     def get_badges(self, obj):
-        # Remplacez par votre vraie logique de badges
-        return ["Master Hacker", "CTF Champion", "Bug Hunter"]
+        # Prefetched by LeaderboardViewSet.get_queryset
+        user_badges = getattr(obj, 'leaderboard_badges', None)
+        if user_badges is None:
+            user_badges = obj.badges.select_related('badge')
+        return [user_badge.badge.name for user_badge in user_badges]
     
     def get_avatar(self, obj):
             request = self.context.get('request')
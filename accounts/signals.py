@@ -0,0 +1,91 @@
+# accounts/signals.py
+from django.core.cache import cache
+from django.db.models import F
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+
+from .api_keys import invalidate_verified_keys
+from .auth_cache import invalidate_users
+from .models import (PROFILE_SUMMARY_CACHE_KEY, ApiKey, Skill, User,
+                     UserFollowing, UserProfile)
+
+
+def _add_to_counter(user_id, field, amount):
+    users = User.objects.filter(pk=user_id)
+    if amount < 0:
+        users = users.filter(**{f'{field}__gte': -amount})
+    users.update(**{field: F(field) + amount})
+    invalidate_users([user_id])
+
+
+@receiver(post_save, sender=UserFollowing)
+def count_follow(sender, instance, created, **kwargs):
+    if created:
+        _add_to_counter(instance.user_id, 'following_count', 1)
+        _add_to_counter(instance.following_user_id, 'followers_count', 1)
+
+
+@receiver(post_delete, sender=UserFollowing)
+def count_unfollow(sender, instance, **kwargs):
+    _add_to_counter(instance.user_id, 'following_count', -1)
+    _add_to_counter(instance.following_user_id, 'followers_count', -1)
+
+
+@receiver(post_save, sender='social.Post')
+def count_post(sender, instance, created, **kwargs):
+    if created:
+        _add_to_counter(instance.user_id, 'post_count', 1)
+
+
+@receiver(post_delete, sender='social.Post')
+def uncount_post(sender, instance, **kwargs):
+    _add_to_counter(instance.user_id, 'post_count', -1)
+
+
+def _invalidate_profile_summaries(user_ids):
+    cache.delete_many([PROFILE_SUMMARY_CACHE_KEY.format(user_id) for user_id in user_ids])
+
+
+@receiver(post_save, sender=UserProfile)
+def invalidate_profile_summary(sender, instance, **kwargs):
+    _invalidate_profile_summaries([instance.user_id])
+
+
+@receiver(m2m_changed, sender=UserProfile.skills.through)
+def invalidate_profile_skills(sender, instance, action, reverse, pk_set, **kwargs):
+    # Clearing is handled before the rows go, while they can still be listed
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        _invalidate_profile_summaries([instance.user_id])
+        return
+    # instance is a Skill and pk_set holds profile ids (None on clear)
+    profiles = UserProfile.objects.filter(pk__in=pk_set) if pk_set else instance.users.all()
+    _invalidate_profile_summaries(profiles.values_list('user_id', flat=True))
+
+
+@receiver(post_save, sender=Skill)
+@receiver(pre_delete, sender=Skill)
+def invalidate_skill_users(sender, instance, **kwargs):
+    _invalidate_profile_summaries(instance.users.values_list('user_id', flat=True))
+
+
+@receiver(post_save, sender=ApiKey)
+@receiver(post_delete, sender=ApiKey)
+def invalidate_api_key(sender, instance, **kwargs):
+    # Revoked or edited keys must stop authenticating in every process
+    invalidate_verified_keys()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_auth_user(sender, instance, **kwargs):
+    # Covers role, password and is_active changes
+    invalidate_users([instance.pk])
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_auth_user_profile(sender, instance, **kwargs):
+    invalidate_users([instance.user_id])
@@ -0,0 +1,14 @@
+# accounts/tasks.py
+from celery import shared_task
+
+from . import activity
+
+
+@shared_task
+def flush_last_active_task():
+    """
+    Write the activity recorded by LastActiveMiddleware to User.last_active
+    and UserSession.last_activity.
+    Should be run every minute.
+    """
+    return activity.flush()
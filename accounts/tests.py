@@ -1,3 +1,166 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from social.models import Post
+
+from . import activity
+from .api_keys import UsageBuffer, authenticate_key
+from .models import ApiKey, User, UserFollowing, UserSession
+
+
+class LeaderboardViewSetTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.users = [
+            User.objects.create_user(username=f'user{index}', email=f'user{index}@example.com',
+                                     password='password', points=points)
+            for index, points in enumerate([50, 100, 100, 10])
+        ]
+        self.client.force_authenticate(self.users[3])
+
+    def test_list_ranks_ties(self):
+        response = self.client.get(reverse('leader-list'))
+        self.assertEqual(response.status_code, 200)
+        results = response.data.get('results', response.data)
+        self.assertEqual([row['rank'] for row in results], [1, 1, 3, 4])
+        self.assertEqual(
+            {row['id']: row['rank'] for row in results},
+            {str(user.id): rank for user, rank in zip(self.users, [3, 1, 1, 4])}
+        )
+
+    def test_detail_rank(self):
+        for user, rank in zip(self.users, [3, 1, 1, 4]):
+            response = self.client.get(reverse('leader-detail', args=[user.pk]))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['rank'], rank)
+
+
+class SocialCountersTest(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', email='alice@example.com', password='password')
+        self.bob = User.objects.create_user(username='bob', email='bob@example.com', password='password')
+
+    def assertCounters(self, user, followers, following, posts):
+        user.refresh_from_db()
+        self.assertEqual((user.followers_count, user.following_count, user.post_count),
+                         (followers, following, posts))
+
+    def test_follow_and_unfollow(self):
+        follow = UserFollowing.objects.create(user=self.alice, following_user=self.bob)
+        self.assertCounters(self.alice, 0, 1, 0)
+        self.assertCounters(self.bob, 1, 0, 0)
+
+        follow.delete()
+        self.assertCounters(self.alice, 0, 0, 0)
+        self.assertCounters(self.bob, 0, 0, 0)
+
+    def test_post_count(self):
+        post = Post.objects.create(user=self.alice, content='Hello')
+        Post.objects.create(user=self.alice, content='World')
+        self.assertCounters(self.alice, 0, 0, 2)
+
+        post.delete()
+        self.assertCounters(self.alice, 0, 0, 1)
+
+    def test_counters_never_go_negative(self):
+        User.objects.filter(pk=self.alice.pk).update(post_count=0)
+        Post.objects.bulk_create([Post(user=self.alice, content='Uncounted')])
+        Post.objects.get(user=self.alice).delete()
+        self.assertCounters(self.alice, 0, 0, 0)
+
+    def test_repair_social_counters(self):
+        UserFollowing.objects.create(user=self.alice, following_user=self.bob)
+        Post.objects.create(user=self.bob, content='Hello')
+        User.objects.update(followers_count=5, following_count=5, post_count=5)
+
+        call_command('repair_social_counters', stdout=StringIO())
+        self.assertCounters(self.alice, 0, 1, 0)
+        self.assertCounters(self.bob, 1, 0, 1)
+
+
+class ActivityTrackingTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='alice', email='alice@example.com', password='password')
+        self.session = UserSession.objects.create(
+            user=self.user, session_key='session', ip_address='127.0.0.1',
+            user_agent='test', device_type='desktop'
+        )
+        self.start = timezone.now() - timedelta(minutes=10)
+        User.objects.filter(pk=self.user.pk).update(last_active=self.start)
+        UserSession.objects.filter(pk=self.session.pk).update(last_activity=self.start)
+
+    def test_touch_is_throttled(self):
+        self.assertTrue(activity.touch(self.user.pk, 'session'))
+        self.assertFalse(activity.touch(self.user.pk, 'session'))
+        # Each session has its own window
+        self.assertTrue(activity.touch(self.user.pk, 'other'))
+
+    def test_flush_writes_closed_buckets(self):
+        when = timezone.now()
+        activity.touch(self.user.pk, 'session', when=when)
+
+        # The bucket is still open
+        self.assertEqual(activity.flush(now=when), 0)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_active, self.start)
+
+        later = when + timedelta(seconds=3 * activity.ACTIVITY_WINDOW)
+        self.assertEqual(activity.flush(now=later), 1)
+        self.user.refresh_from_db()
+        self.session.refresh_from_db()
+        self.assertEqual(self.user.last_active, when)
+        self.assertEqual(self.session.last_activity, when)
+
+        # Buckets are only written once
+        self.assertEqual(activity.flush(now=later), 0)
+
+    def test_flush_never_moves_backwards(self):
+        earlier = self.start - timedelta(minutes=5)
+        activity.touch(self.user.pk, when=earlier)
+        self.assertEqual(activity.flush(now=timezone.now() + timedelta(seconds=3 * activity.ACTIVITY_WINDOW)), 1)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_active, self.start)
+
+
+class ApiKeyUsageTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', email='alice@example.com', password='password')
+        self.api_key, self.raw_key = ApiKey.create_key(self.user, 'ci')
+
+    def test_flush_adds_counts(self):
+        buffer = UsageBuffer()
+        for _ in range(3):
+            buffer.record(self.api_key.pk)
+        self.assertEqual(buffer.flush(), 1)
+
+        self.api_key.refresh_from_db()
+        self.assertEqual(self.api_key.usage_count, 3)
+        self.assertIsNotNone(self.api_key.last_used_at)
+
+    def test_failed_flush_keeps_counts(self):
+        buffer = UsageBuffer()
+        buffer.record(self.api_key.pk)
+        with mock.patch.object(ApiKey.objects, 'filter', side_effect=DatabaseError('down')), \
+                self.assertLogs('accounts.api_keys', 'ERROR'):
+            self.assertEqual(buffer.flush(), 0)
+            # A flush due while recording does not fail the caller either
+            with mock.patch('accounts.api_keys.USAGE_FLUSH_INTERVAL', 0):
+                buffer.record(self.api_key.pk)
+
+        self.assertEqual(buffer.flush(), 1)
+        self.api_key.refresh_from_db()
+        self.assertEqual(self.api_key.usage_count, 2)
 
-# Create your tests here.
+    def test_authenticate_key(self):
+        with mock.patch('accounts.api_keys.usage', UsageBuffer()):
+            self.assertEqual(authenticate_key(self.raw_key), self.api_key)
@@ -3,11 +3,12 @@ import secrets
 import string
 from collections import defaultdict
 
-from django.conf import settings
+from django.apps import apps
 from django.contrib.auth import get_user_model
-from django.core.mail import send_mail
 from django.db import IntegrityError
-from django.db.models import Count, Q
+from django.db.models import (Count, F, IntegerField, OuterRef, Prefetch, Q,
+                              Subquery, Window)
+from django.db.models.functions import Coalesce, Rank
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, permissions, status, viewsets
@@ -17,27 +18,53 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from core.mail import queue_mail
+
 from .models import (RegistrationRequest, User, UserFollowing, UserProfile,
                      UserProjects, UserSession)
 from .permissions import IsOwnerOrReadOnly, IsUserOrAdmin
 from .serializers import *
 
+# Most recent badges shown on each leaderboard row
+LEADERBOARD_BADGES = 3
+
 
 class LeaderboardViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = LeaderboardUserSerializer
 
     def get_queryset(self):
-        return (
+        # Correlated subquery rather than a JOIN + GROUP BY over every user,
+        # so only the rows of the requested page are counted.
+        ChallengeSubmission = apps.get_model('ctf', 'ChallengeSubmission')
+        completed = (
+            ChallengeSubmission.objects
+            .filter(user=OuterRef('pk'), is_correct=True)
+            .order_by()
+            .values('user')
+            .annotate(total=Count('pk'))
+            .values('total')
+        )
+        UserBadge = apps.get_model('gamification', 'UserBadge')
+        queryset = (
             User.objects
-            .annotate(
-                num_completed=Count(
-                'challenge_submissions',
-                filter=Q(challenge_submissions__is_correct=True),
-                distinct=True
-                )
-            )        
-            .order_by('-points')
+            .annotate(num_completed=Coalesce(Subquery(completed, output_field=IntegerField()), 0))
+            .prefetch_related(Prefetch(
+                'badges',
+                queryset=UserBadge.objects.select_related('badge').order_by('-earned_at')[:LEADERBOARD_BADGES],
+                to_attr='leaderboard_badges'
+            ))
+            .order_by('-points', 'id')
         )
+        if self.action == 'list':
+            queryset = queryset.annotate(rank=Window(expression=Rank(), order_by=F('points').desc()))
+        return queryset
+
+    def get_object(self):
+        # A window function only sees the rows left after the pk filter, so
+        # the rank of a single user is counted against every other user.
+        user = super().get_object()
+        user.rank = User.objects.filter(points__gt=user.points).count() + 1
+        return user
 
 class UserProfileDetailsViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
@@ -282,13 +309,11 @@ def initiate_registration(request):
         defaults={'code': code, 'created_at': timezone.now()}
     )
     
-    # Envoyer le code par email (à remplacer par une tâche asynchrone en production)
-    send_mail(
+    # Envoyer le code par email (livré en arrière-plan par core.tasks.send_queued_mail_task)
+    queue_mail(
         'Votre code de vérification HackITech',
         f'Votre code de vérification est : {code}',
-        settings.DEFAULT_FROM_EMAIL,
         [email],
-        fail_silently=False,
     )
     
     return Response({"message": "Code de vérification envoyé par email"})
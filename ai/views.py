@@ -1,9 +1,10 @@
 import json
 import logging
-import time
 
 from ai.chatgpt import GenerateModule  # Importez votre classe GenerateModule
 from ai.chatgpt import ChatGPTService
+from api.throttling import (AnonymousRateThrottle, BurstRateThrottle,
+                            ChatStreamThrottle, SustainedRateThrottle)
 from django.http import (HttpResponseBadRequest, JsonResponse,
                          StreamingHttpResponse)
 from django.shortcuts import get_object_or_404, render
@@ -12,7 +13,8 @@ from django.views import View
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods, require_POST
 from learn.models import Course, Module
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import (api_view, permission_classes,
+                                       throttle_classes)
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
@@ -25,14 +27,11 @@ module_generator = GenerateModule()
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+# ChatStreamThrottle : 2 secondes entre les requêtes, partagé entre les workers
+@throttle_classes([BurstRateThrottle, SustainedRateThrottle, AnonymousRateThrottle, ChatStreamThrottle])
 def chat_stream(request):
     prompt = request.data.get('prompt')
     context = request.data.get('context', {})
-    last_request = request.session.get('last_ai_request')
-    if last_request and time.time() - last_request < 2:  # 2 secondes entre les requêtes
-        return Response({"error": "Attendez avant de faire une nouvelle demande"}, status=429)
-    
-    request.session['last_ai_request'] = time.time()
     def event_stream():
         service = ChatGPTService()
         try:
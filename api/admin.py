@@ -1,3 +1,17 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import ApiRequest
+
+
+@admin.register(ApiRequest)
+class ApiRequestAdmin(admin.ModelAdmin):
+    list_display = ('timestamp', 'method', 'path', 'status_code', 'execution_time', 'user_id', 'ip_address')
+    list_filter = ('method', 'status_code')
+    search_fields = ('path',)
+    date_hierarchy = 'timestamp'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -1,9 +1,10 @@
 # api/authentication.py
 from django.utils.translation import gettext_lazy as _
-from rest_framework.authentication import (BasicAuthentication,
-                                           SessionAuthentication)
+from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
 
 
 class CustomJWTAuthentication(JWTAuthentication):
@@ -15,21 +16,44 @@ class CustomJWTAuthentication(JWTAuthentication):
             return super().authenticate(request)
         except AuthenticationFailed as e:
             raise AuthenticationFailed(_('Invalid token or expired token.'))
+    
+    def get_user(self, validated_token):
+        """
+        Resolve the user from the shared cache; the database is only read
+        when the user changed since it was cached.
+        """
+        from accounts import auth_cache
+        
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+        
+        # Only set when SIMPLE_JWT['CHECK_REVOKE_TOKEN'] is enabled
+        version = validated_token.get(api_settings.REVOKE_TOKEN_CLAIM)
+        user = auth_cache.get_user(user_id, version)
+        if user is None:
+            user = super().get_user(validated_token)
+            auth_cache.cache_user(user, version)
+        return user
 
 
-class ApiKeyAuthentication(BasicAuthentication):
+class ApiKeyAuthentication(BaseAuthentication):
     """
-    Custom authentication for API keys.
+    Authentication for machine clients sending "X-API-Key: <prefix>.<secret>".
+    Recently verified keys are served from a per-process cache.
     """
     def authenticate(self, request):
-        api_key = request.META.get('HTTP_X_API_KEY')
-        if not api_key:
+        raw_key = request.META.get('HTTP_X_API_KEY')
+        if not raw_key:
             return None
         
-        # Validate API key against database
+        from accounts.api_keys import InvalidApiKey, authenticate_key
         try:
-            from accounts.models import ApiKey
-            api_key_obj = ApiKey.objects.get(key=api_key, is_active=True)
-            return (api_key_obj.user, None)
-        except:
-            return None
\ No newline at end of file
+            api_key = authenticate_key(raw_key)
+        except InvalidApiKey:
+            raise AuthenticationFailed(_('Invalid or expired API key.'))
+        return (api_key.user, api_key)
+    
+    def authenticate_header(self, request):
+        return 'X-API-Key'
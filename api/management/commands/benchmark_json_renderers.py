@@ -0,0 +1,78 @@
+# api/management/commands/benchmark_json_renderers.py
+import io
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+
+DEFAULT_PATHS = [
+    '/api/accounts/leaderboard/?page_size=100',
+    '/api/social/posts/?page_size=100',
+    '/api/learn/courses/?page_size=100',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the stock JSONRenderer/JSONParser with the orjson based "
+        "FastJSONRenderer/FastJSONParser on the payloads of API endpoints."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', default=DEFAULT_PATHS, help="API paths to fetch payloads from.")
+        parser.add_argument('--user', help="E-mail of the user to request as (default: first superuser).")
+        parser.add_argument('--iterations', type=int, default=200)
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        if options['user']:
+            user = User.objects.filter(email=options['user']).first()
+            if user is None:
+                raise CommandError(f"No user with e-mail {options['user']}.")
+        else:
+            user = User.objects.filter(is_superuser=True, is_active=True).first()
+
+        client = APIClient()
+        if user is not None:
+            client.force_authenticate(user)
+
+        iterations = options['iterations']
+        for path in options['paths']:
+            response = client.get(path, HTTP_ACCEPT='application/json')
+            if response.status_code != 200:
+                self.stderr.write(f"{path}: HTTP {response.status_code}, skipped")
+                continue
+            data = response.data
+
+            stock = JSONRenderer().render(data)
+            fast = FastJSONRenderer().render(data)
+            if json.loads(stock) != json.loads(fast):
+                self.stderr.write(self.style.ERROR(f"{path}: renderers disagree"))
+
+            stock_render = self._time(lambda: JSONRenderer().render(data), iterations)
+            fast_render = self._time(lambda: FastJSONRenderer().render(data), iterations)
+            stock_parse = self._time(lambda: JSONParser().parse(io.BytesIO(stock)), iterations)
+            fast_parse = self._time(lambda: FastJSONParser().parse(io.BytesIO(stock)), iterations)
+
+            self.stdout.write(
+                f"{path} ({len(stock) / 1024:.1f} KB, identical bytes: {stock == fast})\n"
+                f"  render: stock {stock_render:.3f} ms, fast {fast_render:.3f} ms "
+                f"({stock_render / fast_render:.1f}x)\n"
+                f"  parse:  stock {stock_parse:.3f} ms, fast {fast_parse:.3f} ms "
+                f"({stock_parse / fast_parse:.1f}x)"
+            )
+
+    def _time(self, function, iterations):
+        """Average duration of function in milliseconds."""
+        start = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        return (time.perf_counter() - start) * 1000 / iterations
+
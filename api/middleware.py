@@ -1,74 +1,92 @@
 # api/middleware.py
+import ipaddress
 import json
 import time
 
+from django.http.request import RawPostDataException
 from django.utils import timezone
 
-from .models import ApiRequest
+from . import request_log
 
 
 class ApiRequestMiddleware:
     """
     Middleware to track API requests.
+    Records are buffered and written in the background by api.request_log.
     """
     def __init__(self, get_response):
         self.get_response = get_response
-    
+        self.config = request_log.get_config()
+
     def __call__(self, request):
         # Skip non-API requests
-        if not request.path.startswith('/api/'):
+        if not self.config['ENABLED'] or not request.path.startswith('/api/'):
             return self.get_response(request)
-        
+
+        sample_body = request_log.should_sample_body(self.config['BODY_SAMPLE_RATE'])
+        if sample_body and self._has_json_body(request):
+            # Read the body now so it is still available after the view parsed it
+            request.body
+
         # Record start time
-        start_time = time.time()
-        
+        start_time = time.perf_counter()
+
         # Process request
         response = self.get_response(request)
-        
+
         # Calculate execution time
-        execution_time = (time.time() - start_time) * 1000  # Convert to milliseconds
-        
-        # Only log if this is an API request
-        if request.path.startswith('/api/'):
-            try:
-                # Get request data
-                request_data = None
-                if request.method in ['POST', 'PUT', 'PATCH']:
-                    if hasattr(request, 'data'):
-                        request_data = request.data
-                    else:
-                        try:
-                            request_data = json.loads(request.body.decode('utf-8'))
-                        except:
-                            pass
-                
-                # Get response data
-                response_data = None
-                if hasattr(response, 'data'):
-                    response_data = response.data
-                
-                # Create API request record
-                ApiRequest.objects.create(
-                    user=request.user if request.user.is_authenticated else None,
-                    path=request.path,
-                    method=request.method,
-                    status_code=response.status_code,
-                    ip_address=self._get_client_ip(request),
-                    user_agent=request.META.get('HTTP_USER_AGENT', ''),
-                    request_data=request_data,
-                    response_data=response_data,
-                    execution_time=execution_time
-                )
-            except Exception as e:
-                # Log error but don't interrupt the request
-                print(f"Error logging API request: {e}")
-        
+        execution_time = (time.perf_counter() - start_time) * 1000  # Convert to milliseconds
+
+        request_data = response_data = None
+        if sample_body or response.status_code >= 500:
+            max_bytes = self.config['BODY_MAX_BYTES']
+            request_data = request_log.capture_body(self._get_request_data(request), max_bytes)
+            response_data = request_log.capture_body(getattr(response, 'data', None), max_bytes)
+
+        user = getattr(request, 'user', None)
+        request_log.buffer.append({
+            'user_id': user.pk if user is not None and user.is_authenticated else None,
+            'timestamp': timezone.now(),
+            'path': request.path[:255],
+            'method': request.method,
+            'status_code': response.status_code,
+            'ip_address': self._get_client_ip(request),
+            'user_agent': request.META.get('HTTP_USER_AGENT', '')[:255],
+            'request_data': request_data,
+            'response_data': response_data,
+            'execution_time': execution_time,
+        })
+
         return response
-    
+
+    def _has_json_body(self, request):
+        try:
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            return False
+        return (
+            request.method in ['POST', 'PUT', 'PATCH']
+            and request.content_type == 'application/json'
+            and 0 < length <= self.config['BODY_MAX_BYTES']
+        )
+
+    def _get_request_data(self, request):
+        if not self._has_json_body(request):
+            return None
+        try:
+            return json.loads(request.body)
+        except (RawPostDataException, ValueError):
+            # The body stream was consumed by the view without being kept
+            return None
+
     def _get_client_ip(self, request):
         x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
         if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
+            ip = x_forwarded_for.split(',')[0].strip()
         else:
             ip = request.META.get('REMOTE_ADDR')
-        return ip
\ No newline at end of file
+        # X-Forwarded-For is client controlled and stored in an inet column
+        try:
+            return str(ipaddress.ip_address(ip))
+        except ValueError:
+            return None
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.4 on 2026-10-19 15:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApiRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField(verbose_name='timestamp')),
+                ('path', models.CharField(max_length=255, verbose_name='path')),
+                ('method', models.CharField(max_length=10, verbose_name='method')),
+                ('status_code', models.PositiveSmallIntegerField(verbose_name='status code')),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True, verbose_name='IP address')),
+                ('user_agent', models.CharField(blank=True, max_length=255, verbose_name='user agent')),
+                ('request_data', models.JSONField(blank=True, null=True, verbose_name='request data')),
+                ('response_data', models.JSONField(blank=True, null=True, verbose_name='response data')),
+                ('execution_time', models.FloatField(verbose_name='execution time (ms)')),
+                ('user', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'API request',
+                'verbose_name_plural': 'API requests',
+                'ordering': ['-timestamp'],
+                'indexes': [models.Index(fields=['timestamp'], name='api_apirequ_timesta_69a2cc_idx')],
+            },
+        ),
+    ]
@@ -1,3 +1,42 @@
+from django.conf import settings
 from django.db import models
+from django.utils.translation import gettext_lazy as _
 
-# Create your models here.
+
+class ApiRequest(models.Model):
+    """
+    Log of an API request, written in batches by api.request_log.
+    Rows older than API_REQUEST_LOG['RETENTION_DAYS'] are pruned daily.
+    """
+    
+    # No foreign key constraint: log rows are inserted in bulk from a
+    # background thread and must not slow down or block user deletion.
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DO_NOTHING,
+        null=True,
+        blank=True,
+        db_constraint=False,
+        related_name='+'
+    )
+    timestamp = models.DateTimeField(_('timestamp'))
+    path = models.CharField(_('path'), max_length=255)
+    method = models.CharField(_('method'), max_length=10)
+    status_code = models.PositiveSmallIntegerField(_('status code'))
+    ip_address = models.GenericIPAddressField(_('IP address'), null=True, blank=True)
+    user_agent = models.CharField(_('user agent'), max_length=255, blank=True)
+    # Only kept for a sample of the requests, see API_REQUEST_LOG
+    request_data = models.JSONField(_('request data'), null=True, blank=True)
+    response_data = models.JSONField(_('response data'), null=True, blank=True)
+    execution_time = models.FloatField(_('execution time (ms)'))
+    
+    class Meta:
+        verbose_name = _('API request')
+        verbose_name_plural = _('API requests')
+        ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['timestamp']),
+        ]
+    
+    def __str__(self):
+        return f"{self.method} {self.path} {self.status_code}"
@@ -1,6 +1,15 @@
 # api/pagination.py
-from rest_framework.pagination import (LimitOffsetPagination,
-                                       PageNumberPagination)
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (BasePagination, LimitOffsetPagination,
+                                       PageNumberPagination, _positive_int)
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class StandardResultsSetPagination(PageNumberPagination):
@@ -17,4 +26,128 @@ class LargeResultsSetPagination(PageNumberPagination):
 
 class FlexiblePagination(LimitOffsetPagination):
     default_limit = 25
-    max_limit = 100
\ No newline at end of file
+    max_limit = 100
+
+
+class KeysetCursorPagination(BasePagination):
+    """
+    Forward-only keyset pagination for append-mostly tables.
+
+    Rows are ordered by `ordering`, whose last field must be unique, and the
+    cursor holds the ordering values of the last row of the page. Each page
+    is a single indexed range query: no COUNT(*) and no OFFSET scan, and
+    rows inserted while paging do not shift the following pages.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 25
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = queryset.order_by(*self.ordering)
+        lookup = 'lt' if self.ordering[0].startswith('-') else 'gt'
+
+        def fetch(after, limit):
+            rows = queryset
+            if after is not None:
+                rows = rows.filter(reduce(or_, (
+                    Q(**dict(zip(self.fields[:i], after[:i])), **{f"{field}__{lookup}": after[i]})
+                    for i, field in enumerate(self.fields)
+                )))
+            return list(rows[:limit])
+
+        return self.paginate_rows(fetch, queryset.model, request)
+
+    def paginate_rows(self, fetch, model, request):
+        """
+        Paginate a source that is not a queryset, such as a cache or a store.
+        fetch(after, limit) returns up to limit model instances following the
+        decoded cursor values after, or the first ones when after is None.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.fields = [field.lstrip('-') for field in self.ordering]
+
+        rows = fetch(self.decode_cursor(request, model), self.page_size + 1)
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def decode_cursor(self, request, model):
+        """Return the ordering values encoded in the cursor parameter, or None."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = urlsafe_b64decode(encoded.encode()).decode().split('|')
+            if len(values) != len(self.fields):
+                raise ValueError
+            return [
+                model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, instance):
+        values = [
+            instance._meta.get_field(field).value_to_string(instance)
+            for field in self.fields
+        ]
+        return urlsafe_b64encode('|'.join(values).encode()).decode()
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                },
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Number of results to return per page.',
+                'schema': {'type': 'integer'},
+            },
+        ]
@@ -1,20 +1,53 @@
 # api/renderers.py
-import json
-
 from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
 
-class PrettyJSONRenderer(JSONRenderer):
+# orjson hook for the types it does not serialize natively
+encoder_default = JSONEncoder().default
+
+
+class FastJSONRenderer(JSONRenderer):
     """
-    Renderer which serializes to JSON with indentation.
+    JSONRenderer using orjson.
+
+    Types orjson does not handle natively (Decimal, lazy strings, timedelta,
+    querysets...) go through DRF's JSONEncoder. Data orjson rejects, such as
+    integers past 64 bits, and indented output, only produced when a client
+    asks for it, use the stock renderer.
+
+    Floats are not always written like the stock renderer does: 1e16 gives
+    1e16 instead of 1e+16, and NaN or infinities give null where the stock
+    renderer raises ValueError.
     """
+    options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS if orjson else 0
+
     def render(self, data, accepted_media_type=None, renderer_context=None):
-        if renderer_context and renderer_context.get('indent'):
-            indent = renderer_context.get('indent')
-        else:
-            indent = 4
-        
-        return json.dumps(data, indent=indent, ensure_ascii=False).encode('utf-8')
+        if data is None:
+            return b''
+
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=encoder_default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same escaping as JSONRenderer, for embedding in <script> tags
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class PrettyJSONRenderer(JSONRenderer):
+    """
+    Renderer which serializes to JSON with indentation: 4 spaces, unless
+    the accepted media type or the renderer context asks for another one.
+    """
+    def get_indent(self, accepted_media_type, renderer_context):
+        return super().get_indent(accepted_media_type, renderer_context) or 4
 
 
 class AdminBrowsableAPIRenderer(BrowsableAPIRenderer):
@@ -25,6 +58,6 @@ class AdminBrowsableAPIRenderer(BrowsableAPIRenderer):
         if renderer_context and renderer_context.get('request'):
             request = renderer_context.get('request')
             if not request.user.is_staff:
-                return JSONRenderer().render(data, accepted_media_type, renderer_context)
+                return FastJSONRenderer().render(data, accepted_media_type, renderer_context)
         
-        return super().render(data, accepted_media_type, renderer_context)
\ No newline at end of file
+        return super().render(data, accepted_media_type, renderer_context)
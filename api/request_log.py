@@ -0,0 +1,161 @@
+# api/request_log.py
+"""
+Non-blocking API request log.
+
+The middleware only appends a record to a bounded in-process buffer; a
+daemon thread writes the buffer to ApiRequest with bulk_create. When the
+buffer is full new records are dropped and counted instead of waiting for
+the database. On shutdown the thread is stopped and the buffer flushed.
+"""
+import atexit
+import json
+import logging
+import random
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'BUFFER_SIZE': 10000,
+    'BATCH_SIZE': 500,
+    'FLUSH_INTERVAL': 2,
+    # Share of requests whose bodies are logged; server errors always are
+    'BODY_SAMPLE_RATE': 0.01,
+    'BODY_MAX_BYTES': 4096,
+    'RETENTION_DAYS': 30,
+}
+
+REDACTED_FIELDS = {'password', 'password1', 'password2', 'code', 'token', 'access', 'refresh', 'secret'}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'API_REQUEST_LOG', {})}
+
+
+def _redact(data):
+    if isinstance(data, dict):
+        return {
+            key: '***' if key in REDACTED_FIELDS else _redact(value)
+            for key, value in data.items()
+        }
+    if isinstance(data, list):
+        return [_redact(item) for item in data]
+    return data
+
+
+def capture_body(data, max_bytes):
+    """Return data redacted and made JSON-safe, or a preview if too large."""
+    if data is None:
+        return None
+    try:
+        text = json.dumps(_redact(data), default=str)
+    except (TypeError, ValueError):
+        return None
+    if len(text) > max_bytes:
+        return {'truncated': True, 'size': len(text), 'preview': text[:max_bytes]}
+    return json.loads(text)
+
+
+def should_sample_body(rate):
+    return random.random() < rate
+
+
+class RequestLogBuffer:
+    """Bounded buffer of ApiRequest field dicts with a background writer."""
+
+    def __init__(self, size, batch_size, flush_interval):
+        self.size = size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._records = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def append(self, record):
+        """Queue a record; never blocks on the database."""
+        with self._lock:
+            if len(self._records) >= self.size:
+                self.dropped += 1
+                return False
+            self._records.append(record)
+            full_batch = len(self._records) >= self.batch_size
+            if not self._stopped.is_set() and (self._thread is None or not self._thread.is_alive()):
+                self._start()
+        if full_batch:
+            self._wakeup.set()
+        return True
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name='api-request-log', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._stopped.is_set():
+                break
+            # This thread's connection outlives requests: apply CONN_MAX_AGE
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to write the API request log")
+            finally:
+                close_old_connections()
+
+    def stop(self, timeout=5):
+        """Stop the writer thread, then write what is left in this thread."""
+        self._stopped.set()
+        self._wakeup.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout)
+        return self.flush()
+
+    def _pop_batch(self):
+        with self._lock:
+            count = min(self.batch_size, len(self._records))
+            return [self._records.popleft() for _ in range(count)]
+
+    def flush(self):
+        """Write every buffered record. Returns the number written."""
+        from .models import ApiRequest
+
+        with self._lock:
+            dropped, self.dropped = self.dropped, 0
+        if dropped:
+            logger.warning("API request log buffer full: dropped %d records", dropped)
+
+        written = 0
+        while True:
+            batch = self._pop_batch()
+            if not batch:
+                return written
+            try:
+                ApiRequest.objects.bulk_create([ApiRequest(**record) for record in batch])
+            except Exception:
+                with self._lock:
+                    self.dropped += len(batch)
+                raise
+            written += len(batch)
+
+
+_config = get_config()
+buffer = RequestLogBuffer(_config['BUFFER_SIZE'], _config['BATCH_SIZE'], _config['FLUSH_INTERVAL'])
+
+
+@atexit.register
+def _flush_at_exit():
+    try:
+        buffer.stop()
+    except Exception:
+        logger.exception("Failed to write the API request log at exit")
@@ -0,0 +1,110 @@
+# api/serializers.py
+from functools import lru_cache
+
+from django.utils.module_loading import import_string
+from rest_framework.permissions import SAFE_METHODS
+
+
+def _query_names(request, param):
+    """Return the comma separated names of a query parameter, or None."""
+    value = request.query_params.get(param)
+    if not value:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()} or None
+
+
+@lru_cache(maxsize=None)
+def _default_field_names(serializer_class):
+    """Names of the fields a serializer class renders without ?fields=."""
+    return frozenset(serializer_class().fields)
+
+
+class SparseFieldsetMixin:
+    """
+    Sparse fieldsets and expandable relations for the serializer of a view.
+
+    On read requests, `?fields=id,title` only keeps the listed fields, so
+    the SerializerMethodFields that are not requested are never computed.
+    `?expand=name` adds, or replaces, the fields listed in
+    Meta.expandable_fields as `{name: (serializer class or path, kwargs)}`.
+
+    Meta.select_related_fields and Meta.prefetch_related_fields map field
+    names to the lookups they need; prefetch_queryset() only applies those
+    of the fields the request renders, without building a serializer.
+    """
+    fields_query_param = 'fields'
+    expand_query_param = 'expand'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        # Only the serializers built by a view, not nested or ad hoc ones
+        if 'view' in self.context and request is not None and request.method in SAFE_METHODS:
+            self.apply_sparse_fieldset(request)
+
+    def apply_sparse_fieldset(self, request):
+        expand = _query_names(request, self.expand_query_param) or set()
+        expandable = getattr(self.Meta, 'expandable_fields', {})
+        for name in expand & expandable.keys():
+            serializer_class, kwargs = expandable[name]
+            if isinstance(serializer_class, str):
+                serializer_class = import_string(serializer_class)
+            self.fields[name] = serializer_class(**kwargs)
+
+        requested = _query_names(request, self.fields_query_param)
+        if requested is not None:
+            for name in set(self.fields) - requested - expand:
+                self.fields.pop(name)
+
+    @classmethod
+    def rendered_field_names(cls, request):
+        """Names of the fields rendered for request, as apply_sparse_fieldset() keeps them."""
+        expand = _query_names(request, cls.expand_query_param) or set()
+        names = _default_field_names(cls) | (expand & getattr(cls.Meta, 'expandable_fields', {}).keys())
+        requested = _query_names(request, cls.fields_query_param)
+        if requested is not None:
+            names &= requested | expand
+        return names
+
+    @classmethod
+    def prefetch_queryset(cls, queryset, request):
+        """Add the select/prefetch_related lookups of the fields rendered for request."""
+        select_related = getattr(cls.Meta, 'select_related_fields', {})
+        prefetch_related = getattr(cls.Meta, 'prefetch_related_fields', {})
+        # Sorted so that the lookups are applied in a stable order
+        names = sorted(cls.rendered_field_names(request))
+
+        lookups = [lookup for name in names for lookup in select_related.get(name, ())]
+        if lookups:
+            queryset = queryset.select_related(*lookups)
+        lookups = [lookup for name in names for lookup in prefetch_related.get(name, ())]
+        if lookups:
+            queryset = queryset.prefetch_related(*lookups)
+        return queryset
+
+
+def sparse_fieldset(data, request):
+    """Apply ?fields= to already serialized data, such as a cached dict."""
+    requested = _query_names(request, SparseFieldsetMixin.fields_query_param)
+    if requested is None:
+        return data
+    return {name: value for name, value in data.items() if name in requested}
+
+
+class SparseFieldsetViewMixin:
+    """
+    View mixin fetching the relations of the fields the serializer renders
+    on list and retrieve. Custom actions call prefetch_for_fields().
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action in ('list', 'retrieve'):
+            queryset = self.prefetch_for_fields(queryset)
+        return queryset
+
+    def prefetch_for_fields(self, queryset):
+        serializer_class = self.get_serializer_class()
+        if issubclass(serializer_class, SparseFieldsetMixin):
+            queryset = serializer_class.prefetch_queryset(queryset, self.request)
+        return queryset
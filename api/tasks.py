@@ -0,0 +1,30 @@
+# api/tasks.py
+from datetime import timedelta
+
+from django.utils import timezone
+
+from celery import shared_task
+
+from .models import ApiRequest
+from .request_log import get_config
+
+PRUNE_BATCH_SIZE = 10000
+
+
+@shared_task
+def prune_api_requests_task():
+    """
+    Delete API request logs older than API_REQUEST_LOG['RETENTION_DAYS'],
+    in batches to keep each transaction short.
+    Should be run daily.
+    """
+    cutoff = timezone.now() - timedelta(days=get_config()['RETENTION_DAYS'])
+    deleted = 0
+    while True:
+        batch = list(
+            ApiRequest.objects.filter(timestamp__lt=cutoff).values_list('pk', flat=True)[:PRUNE_BATCH_SIZE]
+        )
+        if not batch:
+            return deleted
+        # Nothing cascades from ApiRequest, so this is a single DELETE
+        deleted += ApiRequest.objects.filter(pk__in=batch).delete()[0]
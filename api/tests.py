@@ -1,3 +1,287 @@
-from django.test import TestCase
+import uuid
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed, NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts import auth_cache
+from accounts.models import User, UserProfile
+from social.models import Post
+
+from .authentication import CustomJWTAuthentication
+from .middleware import ApiRequestMiddleware
+from .pagination import KeysetCursorPagination
+from .renderers import FastJSONRenderer, PrettyJSONRenderer
+from .models import ApiRequest
+from .request_log import RequestLogBuffer
+from .throttling import (BaseThrottleStore, FlagSubmissionThrottle,
+                         InMemoryThrottleStore, get_throttle_store)
+
+
+class CustomJWTAuthenticationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='alice', email='alice@example.com', password='password')
+        UserProfile.objects.get_or_create(user=self.user, defaults={'job_title': 'Pentester'})
+        self.authentication = CustomJWTAuthentication()
+
+    def test_cached_user(self):
+        token = AccessToken.for_user(self.user)
+        self.authentication.get_user(token)
+
+        with self.assertNumQueries(0):
+            user = self.authentication.get_user(token)
+            self.assertEqual(user, self.user)
+            self.assertEqual(user.username, 'alice')
+            self.assertEqual(user.profile.user_id, self.user.pk)
+
+    def test_password_is_not_cached(self):
+        token = AccessToken.for_user(self.user)
+        self.authentication.get_user(token)
+
+        cached = cache.get(auth_cache._cache_key(self.user.pk))
+        self.assertNotIn('password', cached[1])
+        user = self.authentication.get_user(token)
+        self.assertIn('password', user.get_deferred_fields())
+        self.assertTrue(user.check_password('password'))
+
+    def test_user_change_drops_cached_user(self):
+        token = AccessToken.for_user(self.user)
+        self.authentication.get_user(token)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        self.assertIsNone(cache.get(auth_cache._cache_key(self.user.pk)))
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.get_user(token)
+
+
+class ApiRequestMiddlewareTest(TestCase):
+    def test_disabled_under_tests(self):
+        with mock.patch('api.request_log.buffer') as buffer:
+            self.client.get('/api/unknown/')
+        buffer.append.assert_not_called()
+
+    def test_records_request(self):
+        with override_settings(API_REQUEST_LOG={**settings.API_REQUEST_LOG, 'ENABLED': True}), \
+                mock.patch('api.request_log.buffer') as buffer:
+            self.client.get('/api/unknown/', REMOTE_ADDR='10.0.0.1')
+        buffer.append.assert_called_once()
+        record = buffer.append.call_args.args[0]
+        self.assertEqual((record['path'], record['method'], record['status_code']), ('/api/unknown/', 'GET', 404))
+        self.assertEqual(record['ip_address'], '10.0.0.1')
+
+    def test_client_ip_is_validated(self):
+        middleware = ApiRequestMiddleware(lambda request: None)
+        factory = RequestFactory()
+        cases = [
+            ({'HTTP_X_FORWARDED_FOR': '203.0.113.7, 10.0.0.1'}, '203.0.113.7'),
+            ({'HTTP_X_FORWARDED_FOR': 'not-an-ip, 10.0.0.1'}, None),
+            ({'HTTP_X_FORWARDED_FOR': '2001:db8::1'}, '2001:db8::1'),
+            ({'REMOTE_ADDR': ''}, None),
+        ]
+        for meta, expected in cases:
+            with self.subTest(meta=meta):
+                self.assertEqual(middleware._get_client_ip(factory.get('/api/', **meta)), expected)
+
+
+class RequestLogBufferTest(TestCase):
+    def record(self):
+        return {
+            'user_id': None,
+            'timestamp': timezone.now(),
+            'path': '/api/',
+            'method': 'GET',
+            'status_code': 200,
+            'ip_address': None,
+            'user_agent': '',
+            'request_data': None,
+            'response_data': None,
+            'execution_time': 1.0,
+        }
+
+    def test_stop_flushes_and_ends_the_thread(self):
+        buffer = RequestLogBuffer(size=10, batch_size=10, flush_interval=60)
+        buffer.append(self.record())
+        thread = buffer._thread
+        self.assertTrue(thread.is_alive())
+
+        self.assertEqual(buffer.stop(), 1)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(ApiRequest.objects.count(), 1)
+
+        # No writer is started once stopped
+        buffer.append(self.record())
+        self.assertIs(buffer._thread, thread)
+
+    def test_full_buffer_drops_records(self):
+        buffer = RequestLogBuffer(size=1, batch_size=10, flush_interval=60)
+        self.assertTrue(buffer.append(self.record()))
+        self.assertFalse(buffer.append(self.record()))
+        self.assertEqual(buffer.dropped, 1)
+        buffer.stop()
+
+
+class GCRATest(SimpleTestCase):
+    def test_burst_then_interval(self):
+        # 10 hits per 60s: one every 6s, at most 5 in a row
+        interval, burst = 6, 5
+        tat = None
+        for _ in range(burst):
+            tat, wait = BaseThrottleStore._gcra(tat, 100, interval, burst)
+            self.assertIsNotNone(tat)
+        self.assertEqual(BaseThrottleStore._gcra(tat, 100, interval, burst), (None, 6))
+        self.assertEqual(BaseThrottleStore._gcra(tat, 104, interval, burst), (None, 2))
+
+        tat, wait = BaseThrottleStore._gcra(tat, 106, interval, burst)
+        self.assertIsNotNone(tat)
+        self.assertIsNone(BaseThrottleStore._gcra(tat, 106, interval, burst)[0])
+
+    def test_full_burst_after_idle(self):
+        store = InMemoryThrottleStore()
+        with mock.patch('api.throttling.time.time', return_value=1000):
+            self.assertEqual([store.hit('key', 10, 60, 5)[0] for _ in range(6)], [True] * 5 + [False])
+        with mock.patch('api.throttling.time.time', return_value=1030):
+            self.assertEqual([store.hit('key', 10, 60, 5)[0] for _ in range(6)], [True] * 5 + [False])
+
+
+class ThrottledView(APIView):
+    authentication_classes = []
+    permission_classes = []
+    throttle_classes = [FlagSubmissionThrottle]
+
+    def post(self, request):
+        return Response({'ok': True})
+
+
+@override_settings(THROTTLE_STORE={'BACKEND': 'api.throttling.InMemoryThrottleStore'})
+class ThrottleResponseTest(SimpleTestCase):
+    def setUp(self):
+        get_throttle_store.cache_clear()
+        self.factory = APIRequestFactory()
+
+    def test_too_many_requests(self):
+        view = ThrottledView.as_view()
+        with mock.patch('api.throttling.time.time', return_value=1000):
+            statuses = [view(self.factory.post('/', REMOTE_ADDR='10.0.0.1')).status_code for _ in range(5)]
+            response = view(self.factory.post('/', REMOTE_ADDR='10.0.0.1'))
+            # Other clients have their own limit
+            other = view(self.factory.post('/', REMOTE_ADDR='10.0.0.2'))
+
+        self.assertEqual(statuses, [200] * 5)
+        self.assertEqual(response.status_code, 429)
+        # 10/min: the next attempt is allowed 6 seconds later
+        self.assertEqual(response['Retry-After'], '6')
+        self.assertEqual(other.status_code, 200)
+
+    def test_store_failure_fails_open(self):
+        view = ThrottledView.as_view()
+        with mock.patch.object(InMemoryThrottleStore, 'hit', side_effect=ConnectionError), \
+                self.assertLogs('api.throttling', 'WARNING'):
+            response = view(self.factory.post('/', REMOTE_ADDR='10.0.0.1'))
+        self.assertEqual(response.status_code, 200)
+
+
+class FastJSONRendererTest(SimpleTestCase):
+    def assertRendersLikeStock(self, data):
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_same_output(self):
+        self.assertRendersLikeStock({
+            'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'name': 'Zoë \u2028',
+            'score': Decimal('1.50'),
+            'ratio': 0.5,
+            'joined': datetime(2026, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc),
+            'tags': ['a', 'b'],
+            'empty': None,
+        })
+
+    def test_falls_back_on_unsupported_data(self):
+        self.assertRendersLikeStock({'big': 2 ** 64})
+
+    def test_float_formatting_differs(self):
+        self.assertEqual(FastJSONRenderer().render({'value': 1e16}), b'{"value":1e16}')
+        self.assertEqual(JSONRenderer().render({'value': 1e16}), b'{"value":1e+16}')
+
+
+class PrettyJSONRendererTest(SimpleTestCase):
+    def test_indent(self):
+        data = {'price': Decimal('1.50')}
+        renderer = PrettyJSONRenderer()
+        self.assertEqual(renderer.render(data), b'{\n    "price": 1.5\n}')
+        self.assertEqual(
+            renderer.render(data, 'application/json; indent=2'),
+            b'{\n  "price": 1.5\n}'
+        )
+        self.assertEqual(renderer.render(data, renderer_context={'indent': 1}), b'{\n "price": 1.5\n}')
+        self.assertEqual(renderer.render(None), b'')
+
+
+class KeysetCursorPaginationTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', email='alice@example.com', password='password')
+        Post.objects.bulk_create([Post(user=self.user, content=str(index)) for index in range(7)])
+        # Three posts share their created_at, so only the id breaks the tie
+        now = timezone.now()
+        posts = list(Post.objects.order_by('content'))
+        for index, post in enumerate(posts):
+            post.created_at = now if index < 3 else now - timedelta(minutes=index)
+        Post.objects.bulk_update(posts, ['created_at'])
+        self.expected = [post.pk for post in Post.objects.order_by('-created_at', '-id')]
+
+    def paginate(self, url):
+        paginator = KeysetCursorPagination()
+        page = paginator.paginate_queryset(Post.objects.all(), Request(APIRequestFactory().get(url)))
+        return paginator, page
+
+    def test_pages_round_trip(self):
+        seen = []
+        url = '/posts/?page_size=2'
+        while url:
+            paginator, page = self.paginate(url)
+            self.assertLessEqual(len(page), 2)
+            seen.extend(post.pk for post in page)
+            url = paginator.get_next_link()
+        self.assertEqual(seen, self.expected)
+
+    def test_response_shape(self):
+        paginator, page = self.paginate('/posts/?page_size=5')
+        response = paginator.get_paginated_response([post.content for post in page])
+        self.assertEqual(set(response.data), {'next', 'results'})
+        self.assertIn('cursor=', response.data['next'])
+
+        paginator, page = self.paginate(response.data['next'])
+        self.assertEqual(len(page), 2)
+        self.assertIsNone(paginator.get_next_link())
+
+    def test_page_size_cutoff(self):
+        Post.objects.bulk_create([Post(user=self.user, content='more') for _ in range(120)])
+        self.assertEqual(len(self.paginate('/posts/?page_size=1000')[1]), KeysetCursorPagination.max_page_size)
+        self.assertEqual(len(self.paginate('/posts/?page_size=0')[1]), KeysetCursorPagination.page_size)
+        self.assertEqual(len(self.paginate('/posts/?page_size=abc')[1]), KeysetCursorPagination.page_size)
+
+    def test_invalid_cursor(self):
+        for cursor in ['not-base64!', 'bm90IGEgY3Vyc29y', 'fHx8']:
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(NotFound):
+                    self.paginate(f'/posts/?cursor={cursor}')
+
+    def test_invalid_cursor_returns_404(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('post-feed'), {'cursor': 'bm90IGEgY3Vyc29y'})
+        self.assertEqual(response.status_code, 404)
@@ -1,17 +1,186 @@
 # api/throttling.py
-from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
+import logging
+import threading
+import time
+from functools import lru_cache
 
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from rest_framework.throttling import (AnonRateThrottle, SimpleRateThrottle,
+                                       UserRateThrottle)
 
-class BurstRateThrottle(UserRateThrottle):
+logger = logging.getLogger(__name__)
+
+DEFAULT_THROTTLE_STORE = 'api.throttling.InMemoryThrottleStore'
+
+
+class BaseThrottleStore:
+    """
+    Generic cell rate algorithm (GCRA) limiter: a key may be hit `limit`
+    times per `period` seconds, with at most `burst` hits in a row.
+    Each key only stores its theoretical arrival time (TAT).
+    """
+
+    def hit(self, key, limit, period, burst):
+        """
+        Count a hit on key. Returns (allowed, wait) where wait is the number
+        of seconds until the next hit would be allowed.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def _gcra(tat, now, interval, burst):
+        """Return (new_tat or None when denied, wait) for a hit at now."""
+        tat = max(tat if tat is not None else now, now)
+        new_tat = tat + interval
+        allow_at = new_tat - interval * burst
+        if now < allow_at:
+            return None, allow_at - now
+        return new_tat, 0
+
+
+class InMemoryThrottleStore(BaseThrottleStore):
+    """Process-local store used by tests and single-process development."""
+
+    def __init__(self, **options):
+        self._tats = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, period, burst):
+        now = time.time()
+        with self._lock:
+            new_tat, wait = self._gcra(self._tats.get(key), now, period / limit, burst)
+            if new_tat is None:
+                return False, wait
+            self._tats[key] = new_tat
+            # Forget keys that are back to a full burst
+            if len(self._tats) > 10000:
+                self._tats = {k: v for k, v in self._tats.items() if v > now}
+        return True, 0
+
+
+# GCRA in one atomic step, using the Redis clock so that every worker agrees
+# on the time. Times are in milliseconds to stay exact as Lua numbers.
+GCRA_SCRIPT = """
+local interval = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+local allow_at = new_tat - interval * burst
+if now < allow_at then
+    return {0, tostring(allow_at - now)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil(new_tat - now))
+return {1, '0'}
+"""
+
+
+class RedisThrottleStore(BaseThrottleStore):
+    """
+    Store shared by every worker; each hit is a single script call, O(1).
+    """
+
+    def __init__(self, url='redis://localhost:6379/0', key_prefix='throttle', **options):
+        import redis
+
+        self.client = redis.Redis.from_url(url, **options)
+        self.key_prefix = key_prefix
+        self.script = self.client.register_script(GCRA_SCRIPT)
+
+    def hit(self, key, limit, period, burst):
+        allowed, wait = self.script(
+            keys=[f"{self.key_prefix}:{key}"],
+            args=[period * 1000 / limit, burst]
+        )
+        return bool(allowed), float(wait) / 1000
+
+
+@lru_cache(maxsize=None)
+def get_throttle_store():
+    """Return the process-wide store configured by settings.THROTTLE_STORE."""
+    config = getattr(settings, 'THROTTLE_STORE', {})
+    backend = import_string(config.get('BACKEND', DEFAULT_THROTTLE_STORE))
+    return backend(**config.get('OPTIONS', {}))
+
+
+@receiver(setting_changed)
+def reset_throttle_store(setting, **kwargs):
+    if setting == 'THROTTLE_STORE':
+        get_throttle_store.cache_clear()
+
+
+class GCRAThrottleMixin:
+    """
+    Replace the cache-backed request history of DRF's SimpleRateThrottle by
+    a GCRA check in the throttle store. `burst` defaults to the whole rate.
+    """
+    burst = None
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        try:
+            allowed, self._wait = get_throttle_store().hit(
+                self.key,
+                self.num_requests,
+                self.duration,
+                self.burst or self.num_requests
+            )
+        except Exception:
+            # Fail open: an unavailable store must not take the API down
+            logger.warning("Throttle store unavailable", exc_info=True)
+            return True
+        return allowed
+
+    def wait(self):
+        return self._wait or None
+
+
+class BurstRateThrottle(GCRAThrottleMixin, UserRateThrottle):
     scope = 'burst'
     rate = '60/min'  # 60 requests per minute
 
 
-class SustainedRateThrottle(UserRateThrottle):
+class SustainedRateThrottle(GCRAThrottleMixin, UserRateThrottle):
     scope = 'sustained'
     rate = '1000/day'  # 1000 requests per day
 
 
-class AnonymousRateThrottle(AnonRateThrottle):
+class AnonymousRateThrottle(GCRAThrottleMixin, AnonRateThrottle):
     scope = 'anon'
-    rate = '20/min'  # 20 requests per minute for anonymous users
\ No newline at end of file
+    rate = '20/min'  # 20 requests per minute for anonymous users
+
+
+class UserOrIpRateThrottle(GCRAThrottleMixin, SimpleRateThrottle):
+    """Throttle authenticated users by id and anonymous clients by IP."""
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class FlagSubmissionThrottle(UserOrIpRateThrottle):
+    scope = 'flag_submission'
+    rate = '10/min'  # 10 flag attempts per minute, 5 in a row
+    burst = 5
+
+
+class ChatStreamThrottle(UserOrIpRateThrottle):
+    scope = 'chat_stream'
+    rate = '30/min'  # one AI request every 2 seconds
+    burst = 1
@@ -11,7 +11,6 @@ from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import (TokenObtainPairView,
                                             TokenRefreshView)
-from social.models import Post
 
 
 class AdminTokenRefreshView(TokenRefreshView):
@@ -90,29 +89,25 @@ def api_user_info(request):
     Return information about the authenticated user.
     """
     user = request.user
-    followers_count = UserFollowing.objects.filter(following_user=user).count()
-    following_count = UserFollowing.objects.filter(user=user).count()
-    post_count = Post.objects.filter(user=user).count()
+    # Counters are denormalized on the user and the profile part is cached
+    summary = user.get_profile_summary()
     
     avatar = request.build_absolute_uri(user.photo.url) if user.photo else request.build_absolute_uri(settings.DEFAULT_AVATAR_URL)    
     data = {
         'id': user.id,
         'username': user.username,
-        'name': user.profile.display_name,
+        'name': summary['display_name'],
         'email': user.email,
         'avatar': avatar,
         'role': user.role,
         'points': user.points,
-        'skills':              [
-            {'name': skill.name, 'icon': skill.icon.url if skill.icon else None, 'type': skill.skill_type}
-            for skill in user.profile.skills.all()
-        ],
+        'skills': summary['skills'],
         'is_staff': user.is_staff,
         'is_active': user.is_active,
         'date_joined': user.date_joined,
         'last_login': user.last_login,
-        'followers_count': followers_count,
-        'following_count': following_count,
-        'post_count': post_count,
+        'followers_count': user.followers_count,
+        'following_count': user.following_count,
+        'post_count': user.post_count,
     }
     return Response(data)
\ No newline at end of file
@@ -6,6 +6,9 @@ from rest_framework import filters, permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from api.throttling import (BurstRateThrottle, FlagSubmissionThrottle,
+                            SustainedRateThrottle)
+
 from .models import (Challenge, ChallengeCompletion, ChallengeRating, Hint,
                      Resource, Submission, UserHint)
 from .permissions import IsChallengeCreatorOrReadOnly, IsOwnerOrStaff
@@ -60,7 +63,11 @@ class ChallengeViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
     
-    @action(detail=True, methods=['post'])
+    @action(
+        detail=True,
+        methods=['post'],
+        throttle_classes=[BurstRateThrottle, SustainedRateThrottle, FlagSubmissionThrottle]
+    )
     def submit_flag(self, request, pk=None):
         challenge = self.get_object()
         
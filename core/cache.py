@@ -0,0 +1,108 @@
+# core/cache.py
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.db import connection, transaction
+
+
+class VersionedLocalCache:
+    """
+    Process-local copy of a value that is expensive to build (for example a
+    whole small table), invalidated across processes through a version
+    token stored in the shared cache.
+
+    Reading costs one cache lookup and no database query; invalidate()
+    forces every process to rebuild the value on its next read.
+    """
+
+    def __init__(self, key, loader):
+        self.version_key = f"{key}:version"
+        self.loader = loader
+        self._value = None
+        self._version = None
+        self._lock = threading.Lock()
+        self._pending = threading.local()
+
+    def _current_version(self):
+        version = cache.get(self.version_key)
+        if version is None:
+            cache.add(self.version_key, uuid.uuid4().hex, None)
+            version = cache.get(self.version_key)
+        return version
+
+    def get(self):
+        if getattr(self._pending, 'dirty', False):
+            if connection.in_atomic_block:
+                # This thread changed the source data in a transaction that
+                # is still open: only it can see the change, so don't cache.
+                return self.loader()
+            self._pending.dirty = False
+            self._version = None
+
+        version = self._current_version()
+        if version is None or version != self._version:
+            with self._lock:
+                if version is None or version != self._version:
+                    self._value = self.loader()
+                    self._version = version
+        return self._value
+
+    def invalidate(self):
+        cache.set(self.version_key, uuid.uuid4().hex, None)
+        with self._lock:
+            self._version = None
+
+    def invalidate_on_commit(self):
+        """
+        Invalidate after the current transaction commits, which is when
+        other processes can see the change.
+        """
+        self._pending.dirty = True
+        transaction.on_commit(self._committed)
+
+    def _committed(self):
+        self._pending.dirty = False
+        self.invalidate()
+
+
+class TTLCache:
+    """
+    Thread-safe, size-bounded LRU mapping whose entries also expire ttl
+    seconds after they were stored.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires, value = item
+            if expires <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,182 @@
+# core/instrumentation.py
+"""
+Lightweight per-request performance instrumentation.
+
+PerformanceMiddleware (core.middleware) opens a RequestMetrics for each
+request; a database execute wrapper adds every query to it and cache
+helpers report their hits with count_cache(). Finished requests feed a
+per-process histogram of each route and are checked against the query
+budgets of settings.PERFORMANCE.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'SERVER_TIMING': True,
+    # Server-Timing goes to staff users and to everyone under DEBUG; True
+    # sends it to every client
+    'EXPOSE_SERVER_TIMING': False,
+    # Queries allowed per request, by URL name; None means unlimited
+    'DEFAULT_QUERY_BUDGET': None,
+    'QUERY_BUDGETS': {},
+    'RAISE_ON_BUDGET': False,
+}
+
+# Upper bounds (ms) of the latency histogram buckets
+LATENCY_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float('inf'))
+
+_current = ContextVar('request_metrics', default=None)
+
+
+@lru_cache(maxsize=None)
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'PERFORMANCE', {})}
+
+
+@receiver(setting_changed)
+def reset_config(setting, **kwargs):
+    if setting == 'PERFORMANCE':
+        get_config.cache_clear()
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised, when RAISE_ON_BUDGET is set, by requests running too many queries."""
+
+
+class RequestMetrics:
+    __slots__ = ('queries', 'db_time', 'cache_hits', 'cache_misses', 'started')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self):
+        total = self.elapsed * 1000
+        db = self.db_time * 1000
+        return ', '.join([
+            f'db;dur={db:.1f};desc="{self.queries} queries"',
+            f'app;dur={max(total - db, 0):.1f}',
+            f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+            f'total;dur={total:.1f}',
+        ])
+
+
+def start_request():
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def count_cache(hit):
+    """Report a lookup of one of our caches for the current request."""
+    metrics = _current.get()
+    if metrics is not None:
+        if hit:
+            metrics.cache_hits += 1
+        else:
+            metrics.cache_misses += 1
+
+
+def query_wrapper(execute, sql, params, many, context):
+    """connection.execute_wrapper() adding queries to the current request."""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += time.perf_counter() - start
+
+
+def check_query_budget(route, metrics, config):
+    budget = config['QUERY_BUDGETS'].get(route, config['DEFAULT_QUERY_BUDGET'])
+    if budget is None or metrics.queries <= budget:
+        return
+    message = f"{route} ran {metrics.queries} queries, over its budget of {budget}"
+    if config['RAISE_ON_BUDGET']:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+class RouteStats:
+    """Per-process request count, latency histogram and query counts by route."""
+
+    def __init__(self):
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    def record(self, route, metrics):
+        elapsed = metrics.elapsed * 1000
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = {
+                    'count': 0,
+                    'buckets': [0] * len(LATENCY_BUCKETS),
+                    'queries': 0,
+                    'max_queries': 0,
+                    'db_time': 0.0,
+                }
+            stats['count'] += 1
+            stats['buckets'][bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+            stats['queries'] += metrics.queries
+            stats['max_queries'] = max(stats['max_queries'], metrics.queries)
+            stats['db_time'] += metrics.db_time * 1000
+
+    @staticmethod
+    def _percentile(buckets, count, fraction):
+        """
+        Upper bound of the bucket holding the given fraction of requests,
+        None past the last finite bucket.
+        """
+        threshold = count * fraction
+        seen = 0
+        for bound, hits in zip(LATENCY_BUCKETS, buckets):
+            seen += hits
+            if seen >= threshold:
+                break
+        return bound if bound != float('inf') else None
+
+    def snapshot(self):
+        with self._lock:
+            routes = {route: {**stats, 'buckets': list(stats['buckets'])} for route, stats in self._routes.items()}
+        return {
+            route: {
+                'count': stats['count'],
+                'p50_ms': self._percentile(stats['buckets'], stats['count'], 0.5),
+                'p95_ms': self._percentile(stats['buckets'], stats['count'], 0.95),
+                'avg_queries': stats['queries'] / stats['count'],
+                'max_queries': stats['max_queries'],
+                'avg_db_ms': stats['db_time'] / stats['count'],
+            }
+            for route, stats in routes.items()
+        }
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+route_stats = RouteStats()
@@ -0,0 +1,135 @@
+# core/mail.py
+"""
+Outbox for outgoing e-mail. Requests only insert an OutgoingEmail row;
+send_queued_mail() delivers pending rows in batches over one connection
+to the e-mail backend and retries failures with exponential backoff.
+
+Rows are claimed in a short transaction, marked 'sending' with a lease in
+next_attempt_at, and sent once it has committed, so no lock is held while
+the backend is slow. A row whose worker died is claimed again when its
+lease runs out.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 6
+RETRY_BASE_DELAY = 60
+SEND_LEASE = timedelta(minutes=10)
+
+
+def queue_mail(subject, message, recipient_list, from_email=None):
+    """
+    Add an e-mail to the outbox and wake the sending task once the current
+    transaction commits. Returns the OutgoingEmail.
+    """
+    email = OutgoingEmail.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=list(recipient_list)
+    )
+    transaction.on_commit(_wake_sender)
+    return email
+
+
+def _wake_sender():
+    from .tasks import send_queued_mail_task
+    try:
+        send_queued_mail_task.delay()
+    except Exception:
+        # The periodic run delivers the e-mail if the broker is unavailable
+        logger.warning("Could not queue send_queued_mail_task", exc_info=True)
+
+
+def _retry_delay(attempts):
+    return timedelta(seconds=RETRY_BASE_DELAY * 2 ** (attempts - 1))
+
+
+def send_queued_mail(batch_size=100):
+    """
+    Send the due e-mails of the outbox, batch_size at a time over a single
+    backend connection. Returns the number of e-mails sent.
+    """
+    sent = 0
+    while True:
+        batch = _claim_batch(batch_size)
+        if not batch:
+            return sent
+        sent += _send_batch(batch)
+        if len(batch) < batch_size:
+            return sent
+
+
+def _claim_batch(batch_size):
+    """Mark up to batch_size due e-mails as sending and return them."""
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True).filter(
+                status__in=['pending', 'sending'],
+                next_attempt_at__lte=now
+            ).order_by('next_attempt_at')[:batch_size]
+        )
+        for email in batch:
+            email.status = 'sending'
+            email.next_attempt_at = now + SEND_LEASE
+        OutgoingEmail.objects.bulk_update(batch, ['status', 'next_attempt_at'])
+    return batch
+
+
+def _send_batch(batch):
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        for email in batch:
+            _record_failure(email, error)
+        OutgoingEmail.objects.bulk_update(batch, ['status', 'attempts', 'next_attempt_at', 'last_error'])
+        return 0
+
+    sent = 0
+    try:
+        for email in batch:
+            message = EmailMessage(
+                email.subject,
+                email.body,
+                email.from_email,
+                email.recipients,
+                connection=connection
+            )
+            try:
+                message.send()
+            except Exception as error:
+                _record_failure(email, error)
+            else:
+                email.status = 'sent'
+                email.sent_at = timezone.now()
+                email.attempts += 1
+                email.last_error = ''
+                sent += 1
+            # Recorded right away: a crash later in the batch must not
+            # send this one again
+            email.save(update_fields=['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at'])
+    finally:
+        connection.close()
+    return sent
+
+
+def _record_failure(email, error):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= MAX_ATTEMPTS:
+        email.status = 'failed'
+        logger.error("Giving up on e-mail %s after %d attempts: %s", email.pk, email.attempts, error)
+    else:
+        email.status = 'pending'
+        email.next_attempt_at = timezone.now() + _retry_delay(email.attempts)
@@ -0,0 +1,46 @@
+# core/middleware.py
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import instrumentation
+
+
+class PerformanceMiddleware:
+    """
+    Measure queries, database time and cache hits of each request, add them
+    as a Server-Timing header for staff users (or under DEBUG) and record
+    them in the route histograms.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        metrics, token = instrumentation.start_request()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(instrumentation.query_wrapper))
+                response = self.get_response(request)
+        finally:
+            instrumentation.end_request(token)
+        
+        match = request.resolver_match
+        route = match.view_name if match else 'unresolved'
+        instrumentation.route_stats.record(route, metrics)
+        # Read on each request so that changes to the setting apply
+        config = instrumentation.get_config()
+        if config['SERVER_TIMING'] and self.expose_server_timing(request, config):
+            response['Server-Timing'] = metrics.server_timing()
+        instrumentation.check_query_budget(route, metrics, config)
+        
+        return response
+    
+    def expose_server_timing(self, request, config):
+        """Timings reveal the backend's work, keep them from other clients."""
+        if config['EXPOSE_SERVER_TIMING'] or settings.DEBUG:
+            return True
+        # Set by AuthenticationMiddleware, and by DRF once a view authenticated
+        user = getattr(request, 'user', None)
+        return user is not None and user.is_staff
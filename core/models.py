@@ -159,4 +159,38 @@ class Audit(models.Model):
             description=description or f"{action} {entity_type}",
             ip_address=ip_address,
             user_agent=user_agent
-        )
\ No newline at end of file
+        )
+
+
+class OutgoingEmail(models.Model):
+    """E-mail waiting in the outbox; delivered by core.tasks.send_queued_mail_task."""
+    
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    subject = models.CharField(_('subject'), max_length=255)
+    body = models.TextField(_('body'))
+    from_email = models.CharField(_('from e-mail'), max_length=254, blank=True)
+    recipients = models.JSONField(_('recipients'), default=list)
+    status = models.CharField(_('status'), max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(_('attempts'), default=0)
+    next_attempt_at = models.DateTimeField(_('next attempt at'), default=timezone.now)
+    last_error = models.TextField(_('last error'), blank=True)
+    created_at = models.DateTimeField(_('created at'), auto_now_add=True)
+    sent_at = models.DateTimeField(_('sent at'), null=True, blank=True)
+    
+    class Meta:
+        verbose_name = _('outgoing e-mail')
+        verbose_name_plural = _('outgoing e-mails')
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.recipients)}"
@@ -4,6 +4,8 @@ from django.utils import timezone
 from celery import shared_task
 from ctf.models import UserChallengeInstance
 
+from .mail import send_queued_mail
+
 
 @shared_task
 def cleanup_expired_instances():
@@ -24,4 +26,10 @@ def health_check_instances():
     for instance in instances:
         if not instance.is_running():
             instance.status = 'error'
-            instance.save()
\ No newline at end of file
+            instance.save()
+
+
+@shared_task
+def send_queued_mail_task():
+    """Envoie les e-mails en attente de l'outbox (relancé chaque minute)"""
+    return send_queued_mail()
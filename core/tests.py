@@ -1,3 +1,166 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from gamification.models import Badge, Leaderboard, Level, Point, UserBadge
+from gamification.services import leaderboard_service
+
+from . import instrumentation
+from .mail import MAX_ATTEMPTS, SEND_LEASE, queue_mail, send_queued_mail
+from .models import OutgoingEmail
+
+
+class OutgoingEmailTest(TestCase):
+    def queue(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            email = queue_mail('Welcome', 'Hello', ['alice@example.com'], from_email='noreply@example.com')
+        self.assertEqual(len(callbacks), 1)
+        return email
+
+    def test_queue_mail_only_inserts(self):
+        email = self.queue()
+        self.assertEqual(email.status, 'pending')
+        self.assertEqual(email.recipients, ['alice@example.com'])
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_send_queued_mail(self):
+        email = self.queue()
+        self.assertEqual(send_queued_mail(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, 'Welcome')
+        self.assertEqual(mail.outbox[0].to, ['alice@example.com'])
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'sent')
+        self.assertEqual(email.attempts, 1)
+        self.assertIsNotNone(email.sent_at)
+
+        # Sent e-mails are not sent again
+        self.assertEqual(send_queued_mail(), 0)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_failures_are_retried_with_backoff(self):
+        email = self.queue()
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=OSError('refused')):
+            self.assertEqual(send_queued_mail(), 0)
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'pending')
+        self.assertEqual(email.attempts, 1)
+        self.assertEqual(email.last_error, 'refused')
+        self.assertGreater(email.next_attempt_at, timezone.now())
+
+        # Not due yet
+        self.assertEqual(send_queued_mail(), 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_rows_claimed_before_sending(self):
+        email = self.queue()
+        statuses = []
+
+        def send(message):
+            # The row is claimed before the backend is called
+            statuses.append(OutgoingEmail.objects.get(pk=email.pk).status)
+            return 1
+
+        with mock.patch('django.core.mail.EmailMessage.send', autospec=True, side_effect=send):
+            self.assertEqual(send_queued_mail(), 1)
+        self.assertEqual(statuses, ['sending'])
+        self.assertEqual(OutgoingEmail.objects.get(pk=email.pk).status, 'sent')
+
+    def test_expired_claim_is_sent_again(self):
+        email = self.queue()
+        OutgoingEmail.objects.filter(pk=email.pk).update(
+            status='sending',
+            next_attempt_at=timezone.now() + SEND_LEASE
+        )
+        self.assertEqual(send_queued_mail(), 0)
+
+        # The worker that claimed it died
+        OutgoingEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(send_queued_mail(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_gives_up_after_max_attempts(self):
+        email = self.queue()
+        OutgoingEmail.objects.filter(pk=email.pk).update(attempts=MAX_ATTEMPTS - 1)
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=OSError('refused')):
+            send_queued_mail()
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'failed')
+        self.assertEqual(email.attempts, MAX_ATTEMPTS)
+
+
+class QueryBudgetTest(TestCase):
+    def setUp(self):
+        Level.objects.create(number=1, name='Beginner', points_required=0)
+        self.leaderboard = Leaderboard.objects.create(name='Points All Time', category='points', period='all_time')
+        badges = [
+            Badge.objects.create(name=f'Badge {index}', description='', icon='badge.png', category='test')
+            for index in range(3)
+        ]
+        self.users = [
+            User.objects.create_user(username=f'user{index}', email=f'user{index}@example.com', password='password')
+            for index in range(5)
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            for index, user in enumerate(self.users):
+                Point.objects.create(user=user, amount=10 * (index + 1), source='test')
+                for badge in badges:
+                    UserBadge.objects.create(user=user, badge=badge)
+        leaderboard_service.process_dirty_users()
+
+        self.user = self.users[0]
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_budgeted_routes(self):
+        board = f"?leaderboard={self.leaderboard.pk}"
+        urls = {
+            'api_user_info': reverse('api_user_info'),
+            'leader-list': reverse('leader-list'),
+            'usergamificationprofile-detail': reverse('usergamificationprofile-detail', args=[self.user.pk]),
+            'usergamificationprofile-my-profile': reverse('usergamificationprofile-my-profile'),
+            'usergamificationprofile-activity': reverse('usergamificationprofile-activity'),
+            'leaderboardentry-around-me': reverse('leaderboardentry-around-me') + board,
+            'leaderboardentry-ranking': reverse('leaderboardentry-ranking') + board,
+        }
+        self.assertEqual(urls.keys(), settings.PERFORMANCE['QUERY_BUDGETS'].keys())
+
+        # TEST_SETTINGS makes an overrun raise QueryBudgetExceeded
+        self.assertTrue(instrumentation.get_config()['RAISE_ON_BUDGET'])
+        for route, url in urls.items():
+            with self.subTest(route=route):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotIn('Server-Timing', response)
+
+    def test_server_timing_exposure(self):
+        url = reverse('api_user_info')
+        self.assertNotIn('Server-Timing', self.client.get(url))
+
+        with override_settings(PERFORMANCE={**settings.PERFORMANCE, 'EXPOSE_SERVER_TIMING': True}):
+            self.assertIn('Server-Timing', self.client.get(url))
+
+        User.objects.filter(pk=self.user.pk).update(is_staff=True)
+        self.client.force_authenticate(User.objects.get(pk=self.user.pk))
+        response = self.client.get(url)
+        self.assertIn('db;', response['Server-Timing'])
+
+    def test_overrun(self):
+        performance = {**settings.PERFORMANCE, 'QUERY_BUDGETS': {'leader-list': 0}}
+        with override_settings(PERFORMANCE=performance):
+            with self.assertRaises(instrumentation.QueryBudgetExceeded), self.assertLogs('django.request', 'ERROR'):
+                self.client.get(reverse('leader-list'))
+
+        with override_settings(PERFORMANCE={**performance, 'RAISE_ON_BUDGET': False}):
+            with self.assertLogs('core.instrumentation', 'WARNING'):
+                response = self.client.get(reverse('leader-list'))
+            self.assertEqual(response.status_code, 200)
@@ -3,7 +3,8 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from .views import (AuditViewSet, CategoryViewSet, FeedbackViewSet,
-                    SettingViewSet, SkillViewSet, TagViewSet)
+                    SettingViewSet, SkillViewSet, TagViewSet,
+                    performance_stats)
 
 router = DefaultRouter()
 router.register(r'tags', TagViewSet)
@@ -15,4 +16,5 @@ router.register(r'audit', AuditViewSet, basename='audit')
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('performance/', performance_stats, name='performance-stats'),
 ]
\ No newline at end of file
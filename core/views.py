@@ -2,11 +2,12 @@
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, permissions, status, viewsets
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 
 from accounts.models import Skill, Tag
 
+from .instrumentation import route_stats
 from .models import Audit, Category, Feedback, Setting
 from .permissions import IsAdminOrReadOnly, IsAdminUser, IsOwnerOrAdmin
 from .serializers import (AuditSerializer, CategorySerializer,
@@ -150,4 +151,14 @@ class AuditViewSet(viewsets.ReadOnlyModelViewSet):
             serializer = self.get_serializer(page, many=True)
             return self.get_paginated_response(serializer.data)
         serializer = self.get_serializer(logs, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        return Response(serializer.data)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def performance_stats(request):
+    """
+    Request count, latency percentiles and queries per route, as seen by the
+    process serving this request.
+    """
+    return Response(route_stats.snapshot())
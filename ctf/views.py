@@ -6,10 +6,14 @@ from django.shortcuts import get_object_or_404, render
 from django.urls import reverse
 from django.views.decorators.http import require_http_methods
 from rest_framework import viewsets
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import (api_view, permission_classes,
+                                       throttle_classes)
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from api.throttling import (BurstRateThrottle, FlagSubmissionThrottle,
+                            SustainedRateThrottle)
+
 from .models import Challenge, ChallengeType, UserChallengeInstance
 from .serializers import *
 from .tasks import start_challenge_task
@@ -36,6 +40,7 @@ from .serializers import FlagSubmissionSerializer
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@throttle_classes([BurstRateThrottle, SustainedRateThrottle, FlagSubmissionThrottle])
 def submit_flag(request):
     try:
         # Extraire le JSON du corps de la requête
@@ -1,10 +1,11 @@
 # gamification/admin.py
 from django.contrib import admin
 
-from .models import (Achievement, Badge, Challenge, Leaderboard,
-                     LeaderboardEntry, Level, LevelUpEvent, Point, Reward,
-                     UserAchievement, UserBadge, UserChallenge, UserLevel,
-                     UserReward)
+from .models import (Achievement, ActivityDay, ActivityStreak, Badge,
+                     Challenge, Leaderboard, LeaderboardEntry,
+                     LeaderboardSnapshot, Level, LevelUpEvent, Point,
+                     PointRollup, Reward, UserAchievement, UserBadge,
+                     UserChallenge, UserLevel, UserReward)
 
 
 @admin.register(Point)
@@ -15,6 +16,26 @@ class PointAdmin(admin.ModelAdmin):
     date_hierarchy = 'created_at'
 
 
+@admin.register(PointRollup)
+class PointRollupAdmin(admin.ModelAdmin):
+    list_display = ('user', 'day', 'points', 'challenges_completed', 'badges_earned')
+    search_fields = ('user__username',)
+    date_hierarchy = 'day'
+
+
+@admin.register(ActivityDay)
+class ActivityDayAdmin(admin.ModelAdmin):
+    list_display = ('user', 'day', 'events', 'sources')
+    search_fields = ('user__username',)
+    date_hierarchy = 'day'
+
+
+@admin.register(ActivityStreak)
+class ActivityStreakAdmin(admin.ModelAdmin):
+    list_display = ('user', 'current_streak', 'longest_streak', 'last_active_day')
+    search_fields = ('user__username',)
+
+
 @admin.register(Level)
 class LevelAdmin(admin.ModelAdmin):
     list_display = ('number', 'name', 'points_required')
@@ -114,4 +135,13 @@ class LeaderboardEntryAdmin(admin.ModelAdmin):
     list_display = ('leaderboard', 'user', 'score', 'rank', 'updated_at')
     list_filter = ('leaderboard', 'rank')
     search_fields = ('user__username',)
-    date_hierarchy = 'updated_at'
\ No newline at end of file
+    date_hierarchy = 'updated_at'
+
+
+@admin.register(LeaderboardSnapshot)
+class LeaderboardSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('leaderboard', 'participants', 'created_at')
+    search_fields = ('leaderboard__name',)
+    date_hierarchy = 'created_at'
+    # The per-user ranks mapping can be huge
+    exclude = ('ranks',)
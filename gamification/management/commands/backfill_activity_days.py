@@ -0,0 +1,20 @@
+# gamification/management/commands/backfill_activity_days.py
+from django.core.management.base import BaseCommand
+
+from gamification.services import activity_service
+
+
+class Command(BaseCommand):
+    help = "Rebuild ActivityDay rows and streaks from points, module completions and submissions."
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            action='append',
+            dest='users',
+            help="Only rebuild activity for this user id (repeatable)."
+        )
+    
+    def handle(self, *args, **options):
+        written = activity_service.rebuild(user_ids=options['users'])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} activity days."))
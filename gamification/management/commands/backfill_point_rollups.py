@@ -0,0 +1,20 @@
+# gamification/management/commands/backfill_point_rollups.py
+from django.core.management.base import BaseCommand
+
+from gamification.services import rollup_service
+
+
+class Command(BaseCommand):
+    help = "Rebuild daily PointRollup rows from points, completed challenges and badges."
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            action='append',
+            dest='users',
+            help="Only rebuild rollups for this user id (repeatable)."
+        )
+    
+    def handle(self, *args, **options):
+        written = rollup_service.backfill(user_ids=options['users'])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} rollup rows."))
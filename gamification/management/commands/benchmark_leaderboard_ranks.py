@@ -0,0 +1,89 @@
+# gamification/management/commands/benchmark_leaderboard_ranks.py
+import random
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from gamification.models import Leaderboard, LeaderboardEntry
+from gamification.services import leaderboard_service
+
+User = get_user_model()
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Benchmark leaderboard rank recomputation on synthetic boards (rolled back afterwards)."
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default='10000,100000,1000000',
+            help="Comma-separated number of entries per benchmarked leaderboard."
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help="Rows per bulk_create batch when seeding data."
+        )
+    
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',') if size]
+        for size in sizes:
+            try:
+                with transaction.atomic():
+                    self._run(size, options['batch_size'])
+                    raise _Rollback()
+            except _Rollback:
+                pass
+    
+    def _run(self, size, batch_size):
+        run_id = uuid.uuid4().hex[:8]
+        leaderboard = Leaderboard.objects.create(
+            name=f"Benchmark {run_id}",
+            category=f"benchmark-{run_id}",
+            period='all_time',
+        )
+        
+        self.stdout.write(f"Seeding {size} entries...")
+        for offset in range(0, size, batch_size):
+            count = min(batch_size, size - offset)
+            users = User.objects.bulk_create([
+                User(
+                    email=f"bench-{run_id}-{offset + i}@example.com",
+                    username=f"bench-{run_id}-{offset + i}",
+                    password='!',
+                )
+                for i in range(count)
+            ], batch_size=batch_size)
+            LeaderboardEntry.objects.bulk_create([
+                LeaderboardEntry(
+                    leaderboard=leaderboard,
+                    user=user,
+                    score=random.randint(0, size // 10 or 1),
+                )
+                for user in users
+            ], batch_size=batch_size)
+        
+        start = time.perf_counter()
+        leaderboard_service.update_leaderboard_ranks(leaderboard)
+        full = time.perf_counter() - start
+        
+        # Re-ranking after a single score change is the common case on award.
+        entry = LeaderboardEntry.objects.filter(leaderboard=leaderboard).order_by('?').first()
+        entry.score += 1
+        entry.save(update_fields=['score'])
+        start = time.perf_counter()
+        leaderboard_service.update_leaderboard_ranks(leaderboard)
+        incremental = time.perf_counter() - start
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"{size} entries: initial ranking {full * 1000:.1f} ms, "
+            f"re-rank after one change {incremental * 1000:.1f} ms"
+        ))
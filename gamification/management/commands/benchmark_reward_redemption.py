@@ -0,0 +1,103 @@
+# gamification/management/commands/benchmark_reward_redemption.py
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from gamification.models import Level, Point, Reward, UserLevel, UserReward
+from gamification.services import reward_service
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark concurrent redemption of a limited reward. Synthetic data is "
+        "committed (each redeemer needs its own connection) and deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--redeemers', type=int, default=1000, help="Number of users redeeming at once.")
+        parser.add_argument('--stock', type=int, default=100, help="Quantity available of the reward.")
+        parser.add_argument('--cost', type=int, default=50, help="Points cost of the reward.")
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=50,
+            help="Concurrent database connections; keep below the server's max_connections."
+        )
+
+    def handle(self, *args, **options):
+        run_id = uuid.uuid4().hex[:8]
+        redeemers = options['redeemers']
+        cost = options['cost']
+
+        level = Level.objects.order_by('number').first()
+        created_level = level is None
+        if created_level:
+            level = Level.objects.create(number=1, name=f"Benchmark {run_id}", points_required=0)
+
+        self.stdout.write(f"Seeding {redeemers} redeemers...")
+        users = User.objects.bulk_create([
+            User(email=f"redeem-{run_id}-{i}@example.com", username=f"redeem-{run_id}-{i}", password='!')
+            for i in range(redeemers)
+        ])
+        UserLevel.objects.bulk_create(
+            [UserLevel(user=user, level=level, total_points=cost) for user in users],
+            ignore_conflicts=True
+        )
+        UserLevel.objects.filter(user__in=users).update(total_points=cost)
+        reward = Reward.objects.create(
+            name=f"Benchmark {run_id}",
+            description="Benchmark reward",
+            points_cost=cost,
+            quantity_available=options['stock']
+        )
+
+        def redeem(user):
+            start = time.perf_counter()
+            try:
+                reward_service.redeem_reward(user, reward)
+                succeeded = True
+            except reward_service.RedemptionError:
+                succeeded = False
+            finally:
+                connection.close()
+            return succeeded, time.perf_counter() - start
+
+        try:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+                results = list(executor.map(redeem, users))
+            elapsed = time.perf_counter() - start
+
+            latencies = sorted(latency for _, latency in results)
+            successes = sum(1 for succeeded, _ in results if succeeded)
+            reward.refresh_from_db()
+            redemptions = UserReward.objects.filter(reward=reward).count()
+            overdrawn = UserLevel.objects.filter(user__in=users, total_points__lt=0).count()
+
+            self.stdout.write(
+                f"{redeemers} redeemers, stock {options['stock']}: {successes} redeemed "
+                f"in {elapsed * 1000:.1f} ms ({redeemers / elapsed:.0f} req/s), "
+                f"p50 {statistics.median(latencies) * 1000:.1f} ms, "
+                f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f} ms"
+            )
+            if redemptions != min(redeemers, options['stock']) or reward.quantity_available < 0 or overdrawn:
+                self.stderr.write(self.style.ERROR(
+                    f"Inconsistent result: {redemptions} redemptions, "
+                    f"{reward.quantity_available} left, {overdrawn} overdrawn balances"
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS("No oversell and no overdrawn balance."))
+        finally:
+            UserReward.objects.filter(reward=reward).delete()
+            Point.objects.filter(user__in=users).delete()
+            reward.delete()
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+            if created_level:
+                level.delete()
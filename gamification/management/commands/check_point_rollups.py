@@ -0,0 +1,40 @@
+# gamification/management/commands/check_point_rollups.py
+from django.core.management.base import BaseCommand, CommandError
+
+from gamification.services import rollup_service
+
+
+class Command(BaseCommand):
+    help = "Compare daily PointRollup rows with the source tables."
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            action='append',
+            dest='users',
+            help="Only check rollups for this user id (repeatable)."
+        )
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help="Rebuild rollups of users with mismatches."
+        )
+    
+    def handle(self, *args, **options):
+        mismatches = rollup_service.find_inconsistencies(user_ids=options['users'])
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS("Rollups are consistent."))
+            return
+        
+        for user_id, day, expected, stored in mismatches:
+            self.stdout.write(f"{user_id} {day}: expected {expected}, stored {stored}")
+        
+        if options['fix']:
+            user_ids = sorted({user_id for user_id, _, _, _ in mismatches})
+            rollup_service.backfill(user_ids=user_ids)
+            self.stdout.write(self.style.SUCCESS(
+                f"Rebuilt rollups for {len(user_ids)} users."
+            ))
+            return
+        
+        raise CommandError(f"{len(mismatches)} inconsistent rollup rows.")
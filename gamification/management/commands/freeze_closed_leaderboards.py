@@ -0,0 +1,21 @@
+# gamification/management/commands/freeze_closed_leaderboards.py
+from django.core.management.base import BaseCommand
+
+from gamification.models import Leaderboard
+from gamification.services import leaderboard_service
+
+
+class Command(BaseCommand):
+    help = "Move the entries of closed leaderboards without a snapshot into snapshots."
+    
+    def handle(self, *args, **options):
+        leaderboards = Leaderboard.objects.filter(
+            is_active=False,
+            snapshot__isnull=True
+        )
+        frozen = 0
+        for leaderboard in leaderboards.iterator():
+            snapshot = leaderboard_service.freeze_leaderboard(leaderboard)
+            frozen += 1
+            self.stdout.write(f"{leaderboard.name}: {snapshot.participants} entries frozen")
+        self.stdout.write(self.style.SUCCESS(f"Froze {frozen} leaderboards."))
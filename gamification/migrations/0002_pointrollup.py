@@ -0,0 +1,34 @@
+# Generated by Django 5.0.4 on 2026-10-19 06:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gamification', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PointRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Day')),
+                ('points', models.PositiveIntegerField(default=0, verbose_name='Points earned')),
+                ('challenges_completed', models.PositiveIntegerField(default=0, verbose_name='Challenges completed')),
+                ('badges_earned', models.PositiveIntegerField(default=0, verbose_name='Badges earned')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='point_rollups', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Point Rollup',
+                'verbose_name_plural': 'Point Rollups',
+                'ordering': ['-day'],
+                'indexes': [models.Index(fields=['day', 'user'], name='gamificatio_day_9761d6_idx')],
+                'unique_together': {('user', 'day')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.4 on 2026-10-19 11:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gamification', '0002_pointrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardSnapshot',
+            fields=[
+                ('leaderboard', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='snapshot', serialize=False, to='gamification.leaderboard', verbose_name='Leaderboard')),
+                ('top_entries', models.JSONField(default=list, help_text='[user_id, score, rank] of the best ranked users, in rank order.', verbose_name='Top entries')),
+                ('ranks', models.JSONField(default=dict, help_text='{user_id: [score, rank]} for every participant.', verbose_name='Ranks')),
+                ('participants', models.PositiveIntegerField(default=0, verbose_name='Participants')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created at')),
+            ],
+            options={
+                'verbose_name': 'Leaderboard Snapshot',
+                'verbose_name_plural': 'Leaderboard Snapshots',
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.4 on 2026-10-19 11:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gamification', '0003_leaderboardsnapshot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['leaderboard', '-score', 'user'], name='gamificatio_leaderb_689c28_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['leaderboard', 'rank'], name='gamificatio_leaderb_b02db0_idx'),
+        ),
+    ]
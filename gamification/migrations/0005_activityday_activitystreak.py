@@ -0,0 +1,46 @@
+# Generated by Django 5.0.4 on 2026-10-19 12:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('gamification', '0004_leaderboardentry_keyset_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityStreak',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='activity_streak', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='User')),
+                ('current_streak', models.PositiveIntegerField(default=0, verbose_name='Current streak')),
+                ('longest_streak', models.PositiveIntegerField(default=0, verbose_name='Longest streak')),
+                ('last_active_day', models.DateField(blank=True, null=True, verbose_name='Last active day')),
+            ],
+            options={
+                'verbose_name': 'Activity Streak',
+                'verbose_name_plural': 'Activity Streaks',
+            },
+        ),
+        migrations.CreateModel(
+            name='ActivityDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Day')),
+                ('events', models.PositiveIntegerField(default=0, verbose_name='Events')),
+                ('sources', models.PositiveSmallIntegerField(default=0, help_text='Bitmask of the kinds of activity recorded this day.', verbose_name='Sources')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity_days', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Activity Day',
+                'verbose_name_plural': 'Activity Days',
+                'ordering': ['-day'],
+                'unique_together': {('user', 'day')},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.4 on 2026-10-19 12:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gamification', '0005_activityday_activitystreak'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='point',
+            name='gamificatio_user_id_59f015_idx',
+        ),
+        migrations.AddIndex(
+            model_name='point',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='gamificatio_user_id_86628e_idx'),
+        ),
+    ]
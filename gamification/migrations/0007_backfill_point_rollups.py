@@ -0,0 +1,56 @@
+# Generated by Django 5.0.4 on 2026-10-19 14:10
+
+from collections import defaultdict
+
+from django.db import migrations
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+ROLLUP_FIELDS = ('points', 'challenges_completed', 'badges_earned')
+
+
+def backfill_rollups(apps, schema_editor):
+    """
+    Rebuild PointRollup from the source tables, so that period and all-time
+    leaderboards, which are scored from rollups, keep their existing scores.
+    """
+    Point = apps.get_model('gamification', 'Point')
+    PointRollup = apps.get_model('gamification', 'PointRollup')
+    UserBadge = apps.get_model('gamification', 'UserBadge')
+    UserChallenge = apps.get_model('gamification', 'UserChallenge')
+
+    sources = [
+        ('points', Point.objects.filter(amount__gt=0), 'created_at', Sum('amount')),
+        ('challenges_completed', UserChallenge.objects.filter(status='completed', completed_at__isnull=False), 'completed_at', Count('id')),
+        ('badges_earned', UserBadge.objects.all(), 'earned_at', Count('id')),
+    ]
+
+    totals = defaultdict(lambda: dict.fromkeys(ROLLUP_FIELDS, 0))
+    for field, query, date_field, aggregate in sources:
+        rows = query.order_by().annotate(
+            rollup_day=TruncDate(date_field)
+        ).values('user_id', 'rollup_day').annotate(
+            total=aggregate
+        ).values_list('user_id', 'rollup_day', 'total')
+        for user_id, day, total in rows.iterator():
+            totals[(user_id, day)][field] = total or 0
+
+    PointRollup.objects.all().delete()
+    PointRollup.objects.bulk_create(
+        [
+            PointRollup(user_id=user_id, day=day, **values)
+            for (user_id, day), values in totals.items()
+        ],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gamification', '0006_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
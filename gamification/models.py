@@ -3,7 +3,7 @@ import uuid
 
 from django.conf import settings
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
@@ -43,7 +43,8 @@ class Point(models.Model):
         verbose_name_plural = _("Points")
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['user', 'created_at']),
+            # Also serves keyset pagination of a user's history
+            models.Index(fields=['user', 'created_at', 'id']),
             models.Index(fields=['source']),
         ]
     
@@ -51,6 +52,120 @@ class Point(models.Model):
         return f"{self.user.username}: {self.amount} points from {self.source}"
 
 
+class PointRollup(models.Model):
+    """
+    Per-user, per-day activity totals used to score periodic leaderboards
+    without scanning Point, UserChallenge and UserBadge.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='point_rollups',
+        verbose_name=_("User")
+    )
+    day = models.DateField(
+        verbose_name=_("Day")
+    )
+    points = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Points earned")
+    )
+    challenges_completed = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Challenges completed")
+    )
+    badges_earned = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Badges earned")
+    )
+    
+    class Meta:
+        verbose_name = _("Point Rollup")
+        verbose_name_plural = _("Point Rollups")
+        unique_together = ['user', 'day']
+        ordering = ['-day']
+        indexes = [
+            models.Index(fields=['day', 'user']),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} on {self.day}: {self.points} points"
+
+
+class ActivityDay(models.Model):
+    """
+    One row per user and day with activity, appended by the point, module
+    completion and submission paths. Serves streaks and activity heatmaps
+    without scanning the source tables of other apps.
+    """
+    # Bits of the sources field
+    SOURCE_POINTS = 1
+    SOURCE_MODULE = 2
+    SOURCE_CTF_SUBMISSION = 4
+    SOURCE_CHALLENGE_SUBMISSION = 8
+    
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='activity_days',
+        verbose_name=_("User")
+    )
+    day = models.DateField(
+        verbose_name=_("Day")
+    )
+    events = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Events")
+    )
+    sources = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name=_("Sources"),
+        help_text=_("Bitmask of the kinds of activity recorded this day.")
+    )
+    
+    class Meta:
+        verbose_name = _("Activity Day")
+        verbose_name_plural = _("Activity Days")
+        unique_together = ['user', 'day']
+        ordering = ['-day']
+    
+    def __str__(self):
+        return f"{self.user.username} on {self.day}: {self.events} events"
+
+
+class ActivityStreak(models.Model):
+    """
+    Running daily streak of a user, advanced on the first activity of each day.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='activity_streak',
+        verbose_name=_("User")
+    )
+    current_streak = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Current streak")
+    )
+    longest_streak = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Longest streak")
+    )
+    last_active_day = models.DateField(
+        null=True,
+        blank=True,
+        verbose_name=_("Last active day")
+    )
+    
+    class Meta:
+        verbose_name = _("Activity Streak")
+        verbose_name_plural = _("Activity Streaks")
+    
+    def __str__(self):
+        return f"{self.user.username}: {self.current_streak} days"
+
+
 class Level(models.Model):
     """
     Levels that users can achieve based on points.
@@ -129,34 +244,37 @@ class UserLevel(models.Model):
     
     def calculate_points_to_next_level(self):
         """Calculate points needed to reach the next level."""
-        try:
-            next_level = Level.objects.filter(
-                number__gt=self.level.number
-            ).order_by('number').first()
-            
-            if next_level:
-                return next_level.points_required - self.total_points
-            return 0
-        except Level.DoesNotExist:
+        from .services.level_service import get_level_table
+        
+        if self.level_id is None:
             return 0
+        
+        table = get_level_table()
+        # Fall back to the relation if the level is newer than the table
+        current_level = table.get(self.level_id) or self.level
+        
+        next_level = table.next_after(current_level.number)
+        if next_level:
+            return next_level.points_required - self.total_points
+        return 0
     
     def update_level(self):
         """Update user level based on total points."""
-        current_level = self.level
+        from .services.level_service import get_level_table
+        
+        current_level_id = self.level_id
         
         # Find the highest level the user qualifies for
-        new_level = Level.objects.filter(
-            points_required__lte=self.total_points
-        ).order_by('-number').first()
+        new_level = get_level_table().for_points(self.total_points)
         
-        if new_level and new_level != current_level:
+        if new_level and new_level.pk != current_level_id:
             self.level = new_level
             self.save()
             
             # Create level up event
             LevelUpEvent.objects.create(
-                user=self.user,
-                from_level=current_level,
+                user_id=self.user_id,
+                from_level_id=current_level_id,
                 to_level=new_level
             )
             
@@ -447,12 +565,34 @@ class UserChallenge(models.Model):
         return f"{self.user.username} - {self.challenge.title} ({self.get_status_display()})"
     
     def complete(self):
-        """Mark the challenge as completed and award rewards."""
-        if self.status != 'completed':
+        """
+        Mark the challenge as completed and award rewards.
+        
+        The status is switched with a conditional UPDATE, so when several
+        requests complete the same challenge concurrently only one of them
+        awards the rewards.
+        """
+        from .services import achievement_service, profile_service, rollup_service
+        
+        now = timezone.now()
+        with transaction.atomic():
+            completed = UserChallenge.objects.filter(
+                pk=self.pk
+            ).exclude(
+                status='completed'
+            ).update(
+                status='completed',
+                progress_percentage=100,
+                completed_at=now
+            )
+            if not completed:
+                return False
+            
             self.status = 'completed'
             self.progress_percentage = 100
-            self.completed_at = timezone.now()
-            self.save()
+            self.completed_at = now
+            
+            rollup_service.record_challenge_completed(self)
             
             # Award points
             if self.challenge.points_reward > 0:
@@ -470,35 +610,79 @@ class UserChallenge(models.Model):
                     badge=self.challenge.badge_reward
                 )
             
-            return True
-        return False
+            # The UPDATE above bypasses the post_save receivers
+            achievement_service.check_challenge_achievements(self.user)
+            profile_service.invalidate_profiles([self.user_id])
+        
+        return True
     
-    def update_progress(self, progress_data):
-        """Update the progress of the challenge."""
-        self.progress.update(progress_data)
+    def update_progress(self, progress_data, increment=False):
+        """
+        Update the progress of the challenge.
+        
+        With increment=True the values are added to the current counters
+        instead of replacing them. The row is locked for the read-modify-write
+        so concurrent progress events are not lost, and only the progress
+        columns are written. Criteria are re-evaluated only when a changed key
+        is part of them; each criterion counts in proportion to how close its
+        value is to the required one.
+        
+        Raises ValueError when an increment is not a number.
+        """
+        if increment and any(
+            isinstance(value, bool) or not isinstance(value, (int, float))
+            for value in progress_data.values()
+        ):
+            raise ValueError("Progress increments must be numbers.")
         
-        # Calculate progress percentage based on completion criteria
-        criteria = self.challenge.completion_criteria
-        if criteria:
-            completed = 0
-            total = len(criteria)
+        with transaction.atomic():
+            # Both columns are read under the lock: the in-memory instance may
+            # be stale when another request updated the row meanwhile.
+            progress, self.progress_percentage = UserChallenge.objects.select_for_update(
+            ).values_list('progress', 'progress_percentage').get(pk=self.pk)
+            progress = progress or {}
             
-            for key, required_value in criteria.items():
-                current_value = self.progress.get(key, 0)
-                if current_value >= required_value:
-                    completed += 1
+            changed = {}
+            for key, value in progress_data.items():
+                if increment:
+                    value = progress.get(key, 0) + value
+                if progress.get(key) != value:
+                    changed[key] = value
+            if not changed:
+                self.progress = progress
+                return self.progress_percentage
+            progress.update(changed)
+            self.progress = progress
             
-            self.progress_percentage = int((completed / total) * 100)
+            criteria = self.challenge.completion_criteria
+            if criteria and any(key in criteria for key in changed):
+                self.progress_percentage = int(sum(
+                    _criterion_fraction(progress.get(key, 0), required)
+                    for key, required in criteria.items()
+                ) * 100 / len(criteria))
+            
+            UserChallenge.objects.filter(pk=self.pk).update(
+                progress=progress,
+                progress_percentage=self.progress_percentage
+            )
             
             # Auto-complete if 100%
             if self.progress_percentage >= 100:
                 self.complete()
-            else:
-                self.save()
         
         return self.progress_percentage
 
 
+def _criterion_fraction(current, required):
+    """How far a progress value is towards a criterion, between 0 and 1."""
+    try:
+        if current >= required:
+            return 1.0
+        return max(current / required, 0.0) if required > 0 else 0.0
+    except TypeError:
+        return 0.0
+
+
 class Achievement(models.Model):
     """
     Achievements that users can unlock.
@@ -584,21 +768,25 @@ class UserAchievement(models.Model):
         super().save(*args, **kwargs)
         
         if is_new:
-            # Award points
-            if self.achievement.points_reward > 0:
-                Point.objects.create(
-                    user=self.user,
-                    amount=self.achievement.points_reward,
-                    source='achievement',
-                    description=f"Unlocked achievement: {self.achievement.name}"
-                )
-            
-            # Award badge if applicable
-            if self.achievement.badge_reward:
-                UserBadge.objects.get_or_create(
-                    user=self.user,
-                    badge=self.achievement.badge_reward
-                )
+            self.grant_rewards()
+    
+    def grant_rewards(self):
+        """Award the achievement's points and badge to the user."""
+        # Award points
+        if self.achievement.points_reward > 0:
+            Point.objects.create(
+                user=self.user,
+                amount=self.achievement.points_reward,
+                source='achievement',
+                description=f"Unlocked achievement: {self.achievement.name}"
+            )
+        
+        # Award badge if applicable
+        if self.achievement.badge_reward:
+            UserBadge.objects.get_or_create(
+                user=self.user,
+                badge=self.achievement.badge_reward
+            )
 
 
 class Reward(models.Model):
@@ -827,9 +1015,51 @@ class LeaderboardEntry(models.Model):
         ordering = ['-score']
         indexes = [
             models.Index(fields=['leaderboard', 'score']),
+            # Keyset pagination on (score desc, user)
+            models.Index(fields=['leaderboard', '-score', 'user']),
+            models.Index(fields=['leaderboard', 'rank']),
             models.Index(fields=['user']),
             models.Index(fields=['rank']),
         ]
     
     def __str__(self):
-        return f"{self.user.username} - {self.score} points on {self.leaderboard.name}"
\ No newline at end of file
+        return f"{self.user.username} - {self.score} points on {self.leaderboard.name}"
+
+
+class LeaderboardSnapshot(models.Model):
+    """
+    Frozen standings of a closed leaderboard. Replaces its LeaderboardEntry
+    rows so the live entry table only holds active boards.
+    """
+    leaderboard = models.OneToOneField(
+        Leaderboard,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='snapshot',
+        verbose_name=_("Leaderboard")
+    )
+    top_entries = models.JSONField(
+        default=list,
+        verbose_name=_("Top entries"),
+        help_text=_("[user_id, score, rank] of the best ranked users, in rank order.")
+    )
+    ranks = models.JSONField(
+        default=dict,
+        verbose_name=_("Ranks"),
+        help_text=_("{user_id: [score, rank]} for every participant.")
+    )
+    participants = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Participants")
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_("Created at")
+    )
+    
+    class Meta:
+        verbose_name = _("Leaderboard Snapshot")
+        verbose_name_plural = _("Leaderboard Snapshots")
+    
+    def __str__(self):
+        return f"Snapshot of {self.leaderboard.name}"
@@ -2,6 +2,8 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
+from api.serializers import SparseFieldsetMixin
+
 from .models import (Achievement, Badge, Challenge, Leaderboard,
                      LeaderboardEntry, Level, Point, Reward, UserAchievement,
                      UserBadge, UserChallenge, UserLevel, UserReward)
@@ -10,6 +12,8 @@ User = get_user_model()
 
 
 class UserSerializer(serializers.ModelSerializer):
+    profile_image = serializers.ImageField(source='photo', read_only=True)
+    
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 'profile_image']
@@ -22,6 +26,19 @@ class PointSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
+class PointAwardItemSerializer(serializers.Serializer):
+    user_id = serializers.UUIDField()
+    amount = serializers.IntegerField(min_value=1)
+    source = serializers.CharField(max_length=100, required=False)
+    description = serializers.CharField(required=False, allow_blank=True, default='')
+
+
+class BulkPointAwardSerializer(serializers.Serializer):
+    source = serializers.CharField(max_length=100, default='admin')
+    description = serializers.CharField(required=False, allow_blank=True, default='')
+    awards = PointAwardItemSerializer(many=True, allow_empty=False, max_length=10000)
+
+
 class LevelSerializer(serializers.ModelSerializer):
     class Meta:
         model = Level
@@ -160,12 +177,19 @@ class LeaderboardDetailSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'entries']
     
     def get_entries(self, obj):
-        # Get top entries
-        entries = obj.entries.order_by('rank')[:100]
+        # Get top entries; active boards are ranked live by the leaderboard store
+        from .services import leaderboard_service
+        if obj.is_active:
+            entries = leaderboard_service.get_top_entries(obj, limit=100)
+        else:
+            # Closed boards are frozen into a snapshot once their entries are moved out
+            entries = leaderboard_service.get_snapshot_entries(obj, limit=100)
+            if entries is None:
+                entries = obj.entries.select_related('user').order_by('rank')[:100]
         return LeaderboardEntrySerializer(entries, many=True).data
 
 
-class UserGamificationProfileSerializer(serializers.ModelSerializer):
+class UserGamificationProfileSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     level = serializers.SerializerMethodField()
     badges = serializers.SerializerMethodField()
     achievements = serializers.SerializerMethodField()
@@ -181,36 +205,46 @@ class UserGamificationProfileSerializer(serializers.ModelSerializer):
             'points_history', 'leaderboard_positions'
         ]
     
+    # Upper bound on each list of the profile; the full lists are available
+    # from the dedicated endpoints.
+    LIST_LIMIT = 100
+    
     def get_level(self, obj):
-        try:
-            return UserLevelSerializer(obj.level).data
-        except:
+        # Related managers below reuse obj as the related user, so the nested
+        # UserSerializer does not query it again.
+        user_level = UserLevel.objects.select_related('level').filter(user=obj).first()
+        if user_level is None:
             return None
+        user_level.user = obj
+        return UserLevelSerializer(user_level).data
     
     def get_badges(self, obj):
-        badges = UserBadge.objects.filter(user=obj)
+        badges = obj.badges.select_related('badge')[:self.LIST_LIMIT]
         return UserBadgeSerializer(badges, many=True).data
     
     def get_achievements(self, obj):
-        achievements = UserAchievement.objects.filter(user=obj)
+        achievements = obj.achievements.select_related(
+            'achievement__badge_reward'
+        )[:self.LIST_LIMIT]
         return UserAchievementSerializer(achievements, many=True).data
     
     def get_challenges(self, obj):
-        challenges = UserChallenge.objects.filter(
-            user=obj, 
+        challenges = obj.challenges.filter(
             status='completed'
-        )
+        ).select_related('challenge__badge_reward').order_by('-completed_at')[:self.LIST_LIMIT]
         return UserChallengeSerializer(challenges, many=True).data
     
     def get_points_history(self, obj):
         # Get recent points history
-        points = Point.objects.filter(user=obj).order_by('-created_at')[:10]
+        points = obj.point_records.order_by('-created_at')[:10]
         return PointSerializer(points, many=True).data
     
     def get_leaderboard_positions(self, obj):
-        # Get user's positions in active leaderboards
-        entries = LeaderboardEntry.objects.filter(
-            user=obj,
-            leaderboard__is_active=True
+        # Live positions in active leaderboards, as my_positions returns them
+        from .services import leaderboard_service
+        
+        entries = leaderboard_service.get_user_positions(
+            obj,
+            Leaderboard.objects.filter(is_active=True)
         )
-        return LeaderboardEntrySerializer(entries, many=True).data
\ No newline at end of file
+        return LeaderboardEntrySerializer(entries, many=True).data
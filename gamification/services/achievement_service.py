@@ -1,86 +1,172 @@
 # gamification/services/achievement_service.py
-from django.db.models import Count
+from bisect import bisect_right
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+
+from core.cache import VersionedLocalCache
 
 from ..models import Achievement, UserAchievement, UserBadge, UserChallenge
+from . import profile_service
 
+# Criteria key -> function(user) returning the user's current value.
+# Achievement.criteria maps any of these keys to the minimum value required;
+# an achievement unlocks once every one of its criteria is met.
+METRICS = {}
 
-def check_level_achievements(user, level):
-    """Check if user has unlocked any level-based achievements."""
-    # Find achievements that require reaching a certain level
-    level_achievements = Achievement.objects.filter(
-        criteria__has_key='min_level',
+
+def register_metric(key):
+    """Register a function computing a criteria metric for a user."""
+    def decorator(func):
+        METRICS[key] = func
+        return func
+    return decorator
+
+
+@register_metric('min_level')
+def _user_level_number(user):
+    try:
+        return user.level.level.number
+    except Exception:
+        return 0
+
+
+@register_metric('badges_count')
+def _user_badges_count(user):
+    return UserBadge.objects.filter(user=user).count()
+
+
+@register_metric('challenges_completed')
+def _user_challenges_completed(user):
+    return UserChallenge.objects.filter(user=user, status='completed').count()
+
+
+class AchievementIndex:
+    """
+    Achievements compiled by criteria metric, with thresholds sorted so that
+    the achievements reachable at a given value are found by bisection.
+    """
+
+    def __init__(self, achievements):
+        self.achievements = {}
+        self.requirements = {}
+        by_metric = defaultdict(list)
+
+        for achievement in achievements:
+            requirements = {}
+            for key, threshold in (achievement.criteria or {}).items():
+                if key not in METRICS:
+                    # Unknown criteria can never be evaluated, so never unlock
+                    requirements = None
+                    break
+                try:
+                    requirements[key] = float(threshold)
+                except (TypeError, ValueError):
+                    requirements = None
+                    break
+            if not requirements:
+                continue
+
+            self.achievements[achievement.pk] = achievement
+            self.requirements[achievement.pk] = requirements
+            for key, threshold in requirements.items():
+                by_metric[key].append((threshold, achievement.pk))
+
+        self.thresholds = {}
+        self.achievement_ids = {}
+        for key, pairs in by_metric.items():
+            pairs.sort(key=lambda pair: pair[0])
+            self.thresholds[key] = [threshold for threshold, _ in pairs]
+            self.achievement_ids[key] = [pk for _, pk in pairs]
+
+    def reachable(self, key, value):
+        """Ids of achievements whose threshold for key is at most value."""
+        return self.achievement_ids.get(key, [])[:bisect_right(self.thresholds.get(key, []), value)]
+
+
+def _build_index():
+    return AchievementIndex(Achievement.objects.select_related('badge_reward'))
+
+
+achievement_index = VersionedLocalCache('gamification:achievement_index', _build_index)
+
+
+def invalidate_index():
+    """Rebuild the achievement index in every process on next use."""
+    achievement_index.invalidate_on_commit()
+
+
+def evaluate_achievements(user, metrics=None, known_values=None):
+    """
+    Unlock every achievement the user now qualifies for.
+
+    Only achievements with a criterion in metrics (all metrics if None) are
+    considered. known_values may provide metric values the caller already
+    has, sparing their queries. Returns the newly created UserAchievements.
+    """
+    index = achievement_index.get()
+    values = dict(known_values or {})
+
+    def value_of(key):
+        if key not in values:
+            values[key] = METRICS[key](user)
+        return values[key]
+
+    candidates = set()
+    for key in (metrics or index.thresholds.keys()):
+        if key in index.thresholds:
+            candidates.update(index.reachable(key, value_of(key)))
+    if not candidates:
+        return []
+
+    unlocked = set(
+        UserAchievement.objects.filter(user=user).values_list('achievement_id', flat=True)
     )
-    
-    for achievement in level_achievements:
-        # Skip if already unlocked
-        if UserAchievement.objects.filter(user=user, achievement=achievement).exists():
-            continue
-        
-        min_level = achievement.criteria.get('min_level')
-        if level.number >= min_level:
-            UserAchievement.objects.create(
-                user=user,
-                achievement=achievement
+    earned = [
+        index.achievements[pk]
+        for pk in sorted(candidates - unlocked)
+        if all(value_of(key) >= threshold for key, threshold in index.requirements[pk].items())
+    ]
+    if not earned:
+        return []
+
+    new_records = [UserAchievement(user=user, achievement=achievement) for achievement in earned]
+    try:
+        with transaction.atomic():
+            created = UserAchievement.objects.bulk_create(new_records)
+    except IntegrityError:
+        # A concurrent evaluation unlocked some of them first; save() grants rewards
+        return [
+            user_achievement
+            for user_achievement, was_created in (
+                UserAchievement.objects.get_or_create(user=user, achievement=achievement)
+                for achievement in earned
             )
+            if was_created
+        ]
+
+    # bulk_create skips the post_save receiver dropping the cached profile
+    profile_service.invalidate_profiles([user.pk])
+    for user_achievement in created:
+        user_achievement.grant_rewards()
+    return created
+
+
+def check_level_achievements(user, level):
+    """Check if user has unlocked any level-based achievements."""
+    return evaluate_achievements(user, ['min_level'], {'min_level': level.number})
 
 
 def check_badge_achievements(user):
     """Check if user has unlocked any badge-based achievements."""
-    # Count user badges
-    badge_count = UserBadge.objects.filter(user=user).count()
-    
-    # Find achievements that require collecting badges
-    badge_achievements = Achievement.objects.filter(
-        criteria__has_key='badges_count',
-    )
-    
-    for achievement in badge_achievements:
-        # Skip if already unlocked
-        if UserAchievement.objects.filter(user=user, achievement=achievement).exists():
-            continue
-        
-        required_count = achievement.criteria.get('badges_count')
-        if badge_count >= required_count:
-            UserAchievement.objects.create(
-                user=user,
-                achievement=achievement
-            )
+    return evaluate_achievements(user, ['badges_count'])
 
 
 def check_challenge_achievements(user):
     """Check if user has unlocked any challenge-based achievements."""
-    # Count completed challenges
-    completed_challenges = UserChallenge.objects.filter(
-        user=user, 
-        status='completed'
-    ).count()
-    
-    # Find achievements that require completing challenges
-    challenge_achievements = Achievement.objects.filter(
-        criteria__has_key='challenges_completed',
-    )
-    
-    for achievement in challenge_achievements:
-        # Skip if already unlocked
-        if UserAchievement.objects.filter(user=user, achievement=achievement).exists():
-            continue
-        
-        required_count = achievement.criteria.get('challenges_completed')
-        if completed_challenges >= required_count:
-            UserAchievement.objects.create(
-                user=user,
-                achievement=achievement
-            )
+    return evaluate_achievements(user, ['challenges_completed'])
 
 
 def check_all_achievements(user):
     """Check all possible achievements for a user."""
-    # Get user level
-    try:
-        user_level = user.level
-        check_level_achievements(user, user_level.level)
-    except:
-        pass
-    
-    check_badge_achievements(user)
-    check_challenge_achievements(user)
\ No newline at end of file
+    return evaluate_achievements(user)
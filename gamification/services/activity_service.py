@@ -0,0 +1,192 @@
+# gamification/services/activity_service.py
+from collections import defaultdict
+from datetime import timedelta
+
+from django.apps import apps
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, IntegerField, Value, When
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from ..models import ActivityDay, ActivityStreak
+
+# Source bit -> (model label, user field, timestamp field) used to rebuild
+# activity days from the tables of the apps reporting activity.
+ACTIVITY_SOURCES = {
+    ActivityDay.SOURCE_POINTS: ('gamification.Point', 'user_id', 'created_at'),
+    ActivityDay.SOURCE_MODULE: ('learn.ModuleCompletion', 'user_id', 'completed_at'),
+    ActivityDay.SOURCE_CTF_SUBMISSION: ('ctf.ChallengeSubmission', 'user_id', 'submission_time'),
+    ActivityDay.SOURCE_CHALLENGE_SUBMISSION: ('challenges.Submission', 'user_id', 'submission_time'),
+}
+
+
+def _day(value):
+    return timezone.localdate(value) if value else timezone.localdate()
+
+
+def record_activity(user_id, source, when=None):
+    """
+    Count an activity event of a user. The first event of a day appends a
+    new ActivityDay row and advances the user's streak.
+    """
+    day = _day(when)
+    rows = ActivityDay.objects.filter(user_id=user_id, day=day)
+    updates = {'events': F('events') + 1, 'sources': F('sources').bitor(source)}
+    if rows.update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            ActivityDay.objects.create(user_id=user_id, day=day, events=1, sources=source)
+    except IntegrityError:
+        # Another event of the same day created the row first
+        rows.update(**updates)
+        return
+    advance_streak(user_id, day)
+
+
+def record_activity_many(events_by_user, source, when=None):
+    """
+    Count activity events of many users on the same day, such as points
+    awarded in bulk, with a few set-wise queries.
+    """
+    day = _day(when)
+    user_ids = list(events_by_user)
+    if not user_ids:
+        return
+    with transaction.atomic():
+        ActivityDay.objects.bulk_create(
+            [ActivityDay(user_id=user_id, day=day, events=0, sources=0) for user_id in user_ids],
+            ignore_conflicts=True
+        )
+        # Rows without events are the ones just inserted: their users start
+        # a new active day
+        new_days = list(
+            ActivityDay.objects.select_for_update().filter(
+                day=day,
+                user_id__in=user_ids,
+                events=0
+            ).values_list('user_id', flat=True)
+        )
+        ActivityDay.objects.filter(day=day, user_id__in=user_ids).update(
+            events=F('events') + Case(
+                *[When(user_id=user_id, then=Value(events)) for user_id, events in events_by_user.items()],
+                default=Value(0),
+                output_field=IntegerField()
+            ),
+            sources=F('sources').bitor(source)
+        )
+    for user_id in new_days:
+        advance_streak(user_id, day)
+
+
+def advance_streak(user_id, day):
+    """Extend or restart the user's streak with a newly active day."""
+    with transaction.atomic():
+        streak, _ = ActivityStreak.objects.select_for_update().get_or_create(user_id=user_id)
+        last = streak.last_active_day
+        if last is not None and day <= last:
+            # Late event for a past day; rebuild() accounts for it
+            return
+        if last == day - timedelta(days=1):
+            streak.current_streak += 1
+        else:
+            streak.current_streak = 1
+        streak.longest_streak = max(streak.longest_streak, streak.current_streak)
+        streak.last_active_day = day
+        streak.save()
+
+
+def get_streak(user):
+    """
+    Return the user's current streak, longest streak and last active day.
+    The current streak counts as broken once a whole day has been missed.
+    """
+    streak = ActivityStreak.objects.filter(user=user).first()
+    if streak is None or streak.last_active_day is None:
+        return {'current_streak': 0, 'longest_streak': 0, 'last_active_day': None}
+
+    yesterday = timezone.localdate() - timedelta(days=1)
+    return {
+        'current_streak': streak.current_streak if streak.last_active_day >= yesterday else 0,
+        'longest_streak': streak.longest_streak,
+        'last_active_day': streak.last_active_day,
+    }
+
+
+def get_heatmap(user, days=365):
+    """Return the user's active days of the last days days, oldest first."""
+    start = timezone.localdate() - timedelta(days=days - 1)
+    return list(
+        ActivityDay.objects.filter(
+            user=user,
+            day__gte=start
+        ).order_by('day').values('day', 'events', 'sources')
+    )
+
+
+def _streaks(days):
+    """Current run ending at the last day and longest run of sorted days."""
+    current = longest = 0
+    previous = None
+    for day in days:
+        current = current + 1 if previous == day - timedelta(days=1) else 1
+        longest = max(longest, current)
+        previous = day
+    return current, longest
+
+
+def rebuild(user_ids=None, batch_size=5000):
+    """
+    Rebuild activity days and streaks from the source tables.
+    Returns the number of ActivityDay rows written.
+    """
+    activity = defaultdict(lambda: [0, 0])
+    for source, (label, user_field, time_field) in ACTIVITY_SOURCES.items():
+        queryset = apps.get_model(label).objects.all()
+        if user_ids is not None:
+            queryset = queryset.filter(**{f"{user_field}__in": user_ids})
+        if label == 'gamification.Point':
+            # Spending points is not activity
+            queryset = queryset.filter(amount__gt=0)
+        rows = queryset.annotate(
+            activity_day=TruncDate(time_field)
+        ).order_by().values_list(user_field, 'activity_day').annotate(events=Count('pk'))
+        for user_id, day, events in rows.iterator():
+            totals = activity[(user_id, day)]
+            totals[0] += events
+            totals[1] |= source
+
+    days_by_user = defaultdict(list)
+    for user_id, day in activity:
+        days_by_user[user_id].append(day)
+
+    streaks = []
+    for user_id, days in days_by_user.items():
+        days.sort()
+        current, longest = _streaks(days)
+        streaks.append(ActivityStreak(
+            user_id=user_id,
+            current_streak=current,
+            longest_streak=longest,
+            last_active_day=days[-1]
+        ))
+
+    with transaction.atomic():
+        days_to_delete = ActivityDay.objects.all()
+        streaks_to_delete = ActivityStreak.objects.all()
+        if user_ids is not None:
+            days_to_delete = days_to_delete.filter(user_id__in=user_ids)
+            streaks_to_delete = streaks_to_delete.filter(user_id__in=user_ids)
+        days_to_delete.delete()
+        streaks_to_delete.delete()
+
+        ActivityDay.objects.bulk_create(
+            [
+                ActivityDay(user_id=user_id, day=day, events=events, sources=sources)
+                for (user_id, day), (events, sources) in activity.items()
+            ],
+            batch_size=batch_size
+        )
+        ActivityStreak.objects.bulk_create(streaks, batch_size=batch_size)
+
+    return len(activity)
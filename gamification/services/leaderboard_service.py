@@ -1,10 +1,17 @@
 # gamification/services/leaderboard_service.py
+from bisect import bisect_right
 from datetime import timedelta
 
-from django.db.models import Sum
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import Count, F, Sum, Window
+from django.db.models.fields.json import KeyTransform
+from django.db.models.functions import Rank
 from django.utils import timezone
 
-from ..models import Leaderboard, LeaderboardEntry, Point
+from ..models import Leaderboard, LeaderboardEntry, LeaderboardSnapshot, Point
+from . import rollup_service
+from .leaderboard_store import get_leaderboard_store
 
 
 def get_date_range_for_period(period):
@@ -81,88 +88,443 @@ def create_periodic_leaderboards():
 
 
 def update_user_leaderboards(user):
-    """Update all active leaderboards for a user."""
+    """
+    Update all active leaderboards for a user.
+    
+    Scores are written to the leaderboard store only; the LeaderboardEntry
+    table is refreshed from the store by sync_leaderboard_from_store.
+    """
+    update_leaderboards_for_users([user.pk])
+
+
+def update_leaderboards_for_users(user_ids):
+    """
+    Recompute the scores of several users on every active leaderboard.
+    
+    Each leaderboard costs one grouped query regardless of how many users
+    are updated, so callers should batch users together where they can.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    
+    store = get_leaderboard_store()
     # Get all active leaderboards
     active_leaderboards = Leaderboard.objects.filter(is_active=True)
     
     for leaderboard in active_leaderboards:
-        # Calculate score based on category and period
-        score = calculate_user_score(
-            user, 
-            leaderboard.category, 
-            leaderboard.start_date, 
+        # Calculate scores based on category and period
+        scores = calculate_user_scores(
+            user_ids,
+            leaderboard.category,
+            leaderboard.start_date,
             leaderboard.end_date
         )
         
-        # Update or create leaderboard entry
-        entry, created = LeaderboardEntry.objects.update_or_create(
+        ensure_store_loaded(leaderboard, store)
+        for user_id in user_ids:
+            store.set_score(leaderboard.pk, user_id, scores.get(str(user_id), 0))
+
+
+def mark_users_dirty(user_ids):
+    """Queue users for the next process_dirty_leaderboards_task run."""
+    get_leaderboard_store().mark_dirty(user_ids)
+
+
+def process_dirty_users(batch_size=1000):
+    """
+    Recompute leaderboard scores for every user queued by mark_users_dirty.
+    Returns the number of users processed.
+    """
+    store = get_leaderboard_store()
+    processed = 0
+    while True:
+        user_ids = store.pop_dirty(batch_size)
+        if not user_ids:
+            return processed
+        try:
+            update_leaderboards_for_users(user_ids)
+        except Exception:
+            # Put the batch back so the next run retries it
+            store.mark_dirty(user_ids)
+            raise
+        processed += len(user_ids)
+
+
+def ensure_store_loaded(leaderboard, store=None):
+    """Seed the store from the LeaderboardEntry table if the board is missing."""
+    store = store or get_leaderboard_store()
+    if not store.exists(leaderboard.pk):
+        store.load(leaderboard.pk, dict(
+            LeaderboardEntry.objects.filter(
+                leaderboard=leaderboard
+            ).values_list('user_id', 'score')
+        ))
+    return store
+
+
+def sync_leaderboard_from_store(leaderboard):
+    """
+    Write scores and ranks from the store back to the LeaderboardEntry table
+    so that history, admin and SQL reporting see up to date data.
+    """
+    store = get_leaderboard_store()
+    if not store.exists(leaderboard.pk):
+        return 0
+    
+    User = get_user_model()
+    entries = store.all_entries(leaderboard.pk)
+    synced = 0
+    for offset in range(0, len(entries), RANK_UPDATE_BATCH_SIZE):
+        batch = entries[offset:offset + RANK_UPDATE_BATCH_SIZE]
+        # Users may have been deleted since their score was recorded.
+        existing = {
+            str(pk) for pk in User.objects.filter(
+                pk__in=[entry.user_id for entry in batch]
+            ).values_list('pk', flat=True)
+        }
+        LeaderboardEntry.objects.bulk_create(
+            [
+                LeaderboardEntry(
+                    leaderboard=leaderboard,
+                    user_id=entry.user_id,
+                    score=entry.score,
+                    rank=entry.rank
+                )
+                for entry in batch if entry.user_id in existing
+            ],
+            update_conflicts=True,
+            unique_fields=['leaderboard', 'user'],
+            update_fields=['score', 'rank', 'updated_at'],
+        )
+        synced += len(existing)
+    return synced
+
+
+def _hydrate_entries(leaderboard, store_entries):
+    """
+    Build LeaderboardEntry instances carrying live score and rank from the
+    store, reusing persisted rows where they exist.
+    """
+    user_ids = [entry.user_id for entry in store_entries]
+    persisted = {
+        str(entry.user_id): entry
+        for entry in LeaderboardEntry.objects.filter(
             leaderboard=leaderboard,
+            user_id__in=user_ids
+        ).select_related('user')
+    }
+    missing = [user_id for user_id in user_ids if user_id not in persisted]
+    users = {
+        str(pk): user
+        for pk, user in get_user_model().objects.in_bulk(missing).items()
+    } if missing else {}
+    
+    entries = []
+    for store_entry in store_entries:
+        entry = persisted.get(store_entry.user_id)
+        if entry is None:
+            user = users.get(store_entry.user_id)
+            if user is None:
+                continue
+            entry = LeaderboardEntry(user=user)
+        entry.leaderboard = leaderboard
+        entry.score = store_entry.score
+        entry.rank = store_entry.rank
+        entries.append(entry)
+    return entries
+
+
+def get_top_entries(leaderboard, limit=100):
+    """Return the top entries of a leaderboard, read from the store."""
+    store = ensure_store_loaded(leaderboard)
+    return _hydrate_entries(leaderboard, store.top(leaderboard.pk, limit))
+
+
+def get_entries_around(leaderboard, user, radius):
+    """
+    Return the user's entry with up to radius neighbours above and below.
+    
+    Active boards are read live from the store; closed boards only keep the
+    user's own frozen position.
+    """
+    if leaderboard.is_active:
+        store = ensure_store_loaded(leaderboard)
+        return _hydrate_entries(leaderboard, store.around(leaderboard.pk, user.pk, radius))
+    position = get_snapshot_position(leaderboard, user)
+    return [position] if position else []
+
+
+def get_entries_page(leaderboard, limit, after=None):
+    """
+    Return up to limit entries ordered by score descending, starting after
+    the (score, user_id) key of the previous page's last entry.
+    
+    Active boards are read live from the store, like get_entries_around,
+    and closed boards from their snapshot. Seeking on the key keeps deep
+    pages as cheap as the first one.
+    """
+    if not leaderboard.is_active:
+        return get_snapshot_page(leaderboard, limit, after)
+    
+    store = ensure_store_loaded(leaderboard)
+    entries = []
+    # Users deleted since their score was recorded are skipped, so keep
+    # reading until the page is full or the board is exhausted.
+    while len(entries) < limit:
+        wanted = limit - len(entries)
+        chunk = store.page(leaderboard.pk, after, wanted)
+        entries.extend(_hydrate_entries(leaderboard, chunk))
+        if len(chunk) < wanted:
+            break
+        after = (chunk[-1].score, chunk[-1].user_id)
+    return entries
+
+
+def get_user_positions(user, leaderboards):
+    """Return the user's live entry on each of the given leaderboards."""
+    store = get_leaderboard_store()
+    leaderboards = list(leaderboards)
+    persisted = {
+        entry.leaderboard_id: entry
+        for entry in LeaderboardEntry.objects.filter(
             user=user,
-            defaults={'score': score}
+            leaderboard__in=leaderboards
         )
-        
-        # Update ranks for this leaderboard
-        update_leaderboard_ranks(leaderboard)
+    }
+    
+    positions = []
+    for leaderboard in leaderboards:
+        ensure_store_loaded(leaderboard, store)
+        store_entry = store.get_entry(leaderboard.pk, user.pk)
+        if store_entry is None:
+            continue
+        entry = persisted.get(leaderboard.pk) or LeaderboardEntry()
+        entry.leaderboard = leaderboard
+        entry.user = user
+        entry.score = store_entry.score
+        entry.rank = store_entry.rank
+        positions.append(entry)
+    return positions
 
 
 def calculate_user_score(user, category, start_date=None, end_date=None):
     """Calculate user score for a specific category and time period."""
-    if category == 'points':
-        # Sum points in the given period
-        query = Point.objects.filter(user=user, amount__gt=0)
-        if start_date:
-            query = query.filter(created_at__gte=start_date)
-        if end_date:
-            query = query.filter(created_at__lt=end_date)
-        
-        return query.aggregate(total=Sum('amount'))['total'] or 0
+    scores = calculate_user_scores([user.pk], category, start_date, end_date)
+    return scores.get(str(user.pk), 0)
+
+
+def _score_queryset(category, start_date=None, end_date=None):
+    """
+    Return a (queryset, aggregate) pair scoring users for a category, or
+    (None, None) for unknown categories.
+    """
+    from ..models import UserBadge, UserChallenge
     
+    if category == 'points':
+        query, date_field, aggregate = Point.objects.filter(amount__gt=0), 'created_at', Sum('amount')
     elif category == 'challenges':
-        # Count completed challenges in the given period
-        from ..models import UserChallenge
-        query = UserChallenge.objects.filter(
-            user=user, 
-            status='completed'
-        )
-        if start_date:
-            query = query.filter(completed_at__gte=start_date)
-        if end_date:
-            query = query.filter(completed_at__lt=end_date)
-        
-        return query.count()
-    
+        query, date_field, aggregate = UserChallenge.objects.filter(status='completed'), 'completed_at', Count('id')
     elif category == 'badges':
-        # Count badges earned in the given period
-        from ..models import UserBadge
-        query = UserBadge.objects.filter(user=user)
-        if start_date:
-            query = query.filter(earned_at__gte=start_date)
-        if end_date:
-            query = query.filter(earned_at__lt=end_date)
-        
-        return query.count()
+        query, date_field, aggregate = UserBadge.objects.all(), 'earned_at', Count('id')
+    else:
+        return None, None
+    
+    if start_date:
+        query = query.filter(**{f'{date_field}__gte': start_date})
+    if end_date:
+        query = query.filter(**{f'{date_field}__lt': end_date})
+    return query, aggregate
+
+
+def calculate_user_scores(user_ids, category, start_date=None, end_date=None):
+    """
+    Calculate scores of several users in one grouped query.
+    Returns a {str(user_id): score} mapping; users without activity are omitted.
+    """
+    if rollup_service.covers_whole_days(start_date, end_date):
+        # Period boards start at midnight, so daily rollups answer them exactly
+        return rollup_service.rollup_scores(user_ids, category, start_date, end_date)
+    
+    query, aggregate = _score_queryset(category, start_date, end_date)
+    if query is None:
+        return {}
     
-    return 0
+    rows = query.filter(
+        user_id__in=user_ids
+    ).order_by().values('user_id').annotate(score=aggregate).values_list('user_id', 'score')
+    return {str(user_id): score or 0 for user_id, score in rows}
+
+
+RANK_UPDATE_BATCH_SIZE = 5000
+
+RANK_UPDATE_SQL = """
+    UPDATE {table} AS entry
+    SET rank = ranked.new_rank
+    FROM (
+        SELECT id, RANK() OVER (ORDER BY score DESC) AS new_rank
+        FROM {table}
+        WHERE leaderboard_id = %s
+    ) AS ranked
+    WHERE entry.id = ranked.id
+      AND entry.rank IS DISTINCT FROM ranked.new_rank
+"""
 
 
 def update_leaderboard_ranks(leaderboard):
-    """Update ranks for all entries in a leaderboard."""
-    # Get all entries ordered by score
+    """
+    Update ranks for all entries in a leaderboard.
+    
+    Entries with the same score share a rank and the next score skips
+    ahead (1, 1, 3), which is exactly what RANK() computes. On PostgreSQL
+    the whole board is re-ranked by one UPDATE; other backends compute the
+    ranks with a window annotation and write back the changed rows only.
+    """
+    if connection.vendor == 'postgresql':
+        table = connection.ops.quote_name(LeaderboardEntry._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(RANK_UPDATE_SQL.format(table=table), [leaderboard.pk])
+        return
+    
     entries = LeaderboardEntry.objects.filter(
         leaderboard=leaderboard
-    ).order_by('-score')
+    ).annotate(
+        new_rank=Window(expression=Rank(), order_by=F('score').desc())
+    ).only('id', 'rank')
     
-    # Update ranks
-    current_rank = 1
-    previous_score = None
+    changed = []
+    with transaction.atomic():
+        for entry in entries.iterator(chunk_size=RANK_UPDATE_BATCH_SIZE):
+            if entry.rank != entry.new_rank:
+                entry.rank = entry.new_rank
+                changed.append(entry)
+            if len(changed) >= RANK_UPDATE_BATCH_SIZE:
+                LeaderboardEntry.objects.bulk_update(changed, ['rank'])
+                changed = []
+        if changed:
+            LeaderboardEntry.objects.bulk_update(changed, ['rank'])
+
+
+SNAPSHOT_TOP_SIZE = 100
+
+
+def freeze_leaderboard(leaderboard):
+    """
+    Fold the entries of a closed leaderboard into a LeaderboardSnapshot and
+    delete them from the live LeaderboardEntry table.
     
-    for i, entry in enumerate(entries):
-        # If score is the same as previous, assign the same rank
-        if previous_score is not None and entry.score == previous_score:
-            entry.rank = current_rank
-        else:
-            entry.rank = i + 1
-            current_rank = i + 1
+    The snapshot keeps the top SNAPSHOT_TOP_SIZE positions ready to serve and
+    the score and rank of every participant, keyed by user id.
+    """
+    with transaction.atomic():
+        update_leaderboard_ranks(leaderboard)
+        
+        rows = LeaderboardEntry.objects.filter(
+            leaderboard=leaderboard
+        ).order_by('rank', 'user_id').values_list('user_id', 'score', 'rank')
+        
+        top_entries = []
+        ranks = {}
+        for user_id, score, rank in rows.iterator(chunk_size=RANK_UPDATE_BATCH_SIZE):
+            ranks[str(user_id)] = [score, rank]
+            if len(top_entries) < SNAPSHOT_TOP_SIZE:
+                top_entries.append([str(user_id), score, rank])
+        
+        snapshot, _ = LeaderboardSnapshot.objects.update_or_create(
+            leaderboard=leaderboard,
+            defaults={
+                'top_entries': top_entries,
+                'ranks': ranks,
+                'participants': len(ranks),
+            }
+        )
         
-        previous_score = entry.score
-        entry.save(update_fields=['rank'])
\ No newline at end of file
+        # A single DELETE: going through the ORM would load every row to
+        # send post_delete signals nothing needs for a closed board.
+        table = connection.ops.quote_name(LeaderboardEntry._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {table} WHERE leaderboard_id = %s", [leaderboard.pk])
+    
+    return snapshot
+
+
+def _snapshot_entries(leaderboard, rows):
+    """Build unsaved LeaderboardEntry instances from [user_id, score, rank] rows."""
+    users = get_user_model().objects.in_bulk([user_id for user_id, _, _ in rows])
+    users = {str(pk): user for pk, user in users.items()}
+    return [
+        LeaderboardEntry(leaderboard=leaderboard, user=users[user_id], score=score, rank=rank)
+        for user_id, score, rank in rows
+        if user_id in users
+    ]
+
+
+def get_snapshot_entries(leaderboard, limit=SNAPSHOT_TOP_SIZE):
+    """
+    Return the frozen top entries of a closed leaderboard, or None if the
+    board has no snapshot.
+    """
+    top_entries = LeaderboardSnapshot.objects.filter(
+        leaderboard=leaderboard
+    ).values_list('top_entries', flat=True).first()
+    if top_entries is None:
+        return None
+    return _snapshot_entries(leaderboard, top_entries[:limit])
+
+
+def get_snapshot_page(leaderboard, limit, after=None):
+    """
+    Return up to limit frozen entries of a closed leaderboard ordered by
+    score descending then user id, starting after the (score, user_id) key.
+    
+    Pages within the stored top entries only read that column; deeper pages
+    read the ranks of every participant.
+    """
+    snapshot = LeaderboardSnapshot.objects.filter(
+        leaderboard=leaderboard
+    ).values_list('top_entries', 'participants').first()
+    if snapshot is None:
+        return []
+    rows, participants = snapshot
+    
+    def sort_key(row):
+        return (-row[1], row[0])
+    
+    def start_of(rows):
+        if after is None:
+            return 0
+        return bisect_right(rows, (-int(after[0]), str(after[1])), key=sort_key)
+    
+    start = start_of(rows)
+    if start + limit > len(rows) and participants > len(rows):
+        ranks = LeaderboardSnapshot.objects.filter(
+            leaderboard=leaderboard
+        ).values_list('ranks', flat=True).get()
+        rows = sorted(
+            ([user_id, score, rank] for user_id, (score, rank) in ranks.items()),
+            key=sort_key
+        )
+        start = start_of(rows)
+    
+    entries = []
+    while start < len(rows) and len(entries) < limit:
+        chunk = rows[start:start + limit - len(entries)]
+        entries.extend(_snapshot_entries(leaderboard, chunk))
+        start += len(chunk)
+    return entries
+
+
+def get_snapshot_position(leaderboard, user):
+    """
+    Return the user's frozen entry on a closed leaderboard, or None.
+    
+    Only the user's key is extracted from the ranks column, so the database
+    does not send the whole mapping.
+    """
+    position = LeaderboardSnapshot.objects.filter(
+        leaderboard=leaderboard
+    ).values_list(KeyTransform(str(user.pk), 'ranks'), flat=True).first()
+    if not position:
+        return None
+    score, rank = position
+    return LeaderboardEntry(leaderboard=leaderboard, user=user, score=score, rank=rank)
@@ -0,0 +1,346 @@
+# gamification/services/leaderboard_store.py
+import threading
+from bisect import bisect_left, bisect_right, insort
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+DEFAULT_LEADERBOARD_STORE = 'gamification.services.leaderboard_store.InMemoryLeaderboardStore'
+
+
+class StoreEntry:
+    """A ranked position read from a leaderboard store."""
+    __slots__ = ('user_id', 'score', 'rank')
+
+    def __init__(self, user_id, score, rank):
+        self.user_id = user_id
+        self.score = score
+        self.rank = rank
+
+    def __repr__(self):
+        return f"StoreEntry(user_id={self.user_id!r}, score={self.score}, rank={self.rank})"
+
+
+def _rank_window(items, first_index, first_rank):
+    """
+    Turn a contiguous slice of (member, score) pairs, sorted by descending
+    score, into StoreEntry objects with competition ranks (1, 1, 3).
+    """
+    entries = []
+    rank = first_rank
+    previous_score = None
+    for offset, (member, score) in enumerate(items):
+        if previous_score is not None and score != previous_score:
+            rank = first_index + offset + 1
+        entries.append(StoreEntry(member, score, rank))
+        previous_score = score
+    return entries
+
+
+class BaseLeaderboardStore:
+    """
+    Sorted-set leaderboard storage keyed by leaderboard id.
+
+    Members are user ids as strings and scores are integers. Ranks follow
+    the same rules as LeaderboardEntry.rank: equal scores share a rank.
+    """
+
+    def exists(self, board_id):
+        raise NotImplementedError
+
+    def load(self, board_id, scores):
+        """Replace the content of a board with a {user_id: score} mapping."""
+        raise NotImplementedError
+
+    def set_score(self, board_id, user_id, score):
+        raise NotImplementedError
+
+    def incr_score(self, board_id, user_id, amount):
+        """Add amount to the user's score (ZINCRBY) and return the new score."""
+        raise NotImplementedError
+
+    def get_score(self, board_id, user_id):
+        raise NotImplementedError
+
+    def get_rank(self, board_id, user_id):
+        """Return the user's competition rank, or None if not on the board."""
+        raise NotImplementedError
+
+    def get_entry(self, board_id, user_id):
+        score = self.get_score(board_id, user_id)
+        if score is None:
+            return None
+        return StoreEntry(str(user_id), score, self.get_rank(board_id, user_id))
+
+    def top(self, board_id, limit):
+        raise NotImplementedError
+
+    def around(self, board_id, user_id, radius):
+        """Return the user's entry with up to radius neighbours on each side."""
+        raise NotImplementedError
+
+    def page(self, board_id, after, limit):
+        """
+        Return up to limit entries following the (score, user_id) key of the
+        previous page's last entry, or the first ones when after is None.
+        Equal scores keep the store's own, stable, member order.
+        """
+        raise NotImplementedError
+
+    def all_entries(self, board_id):
+        return self.top(board_id, None)
+
+    def count(self, board_id):
+        raise NotImplementedError
+
+    def remove(self, board_id, user_id):
+        raise NotImplementedError
+
+    def clear(self, board_id):
+        raise NotImplementedError
+
+    def mark_dirty(self, user_ids):
+        """Record users whose leaderboard scores need to be recomputed."""
+        raise NotImplementedError
+
+    def pop_dirty(self, limit):
+        """Remove and return up to limit user ids recorded by mark_dirty."""
+        raise NotImplementedError
+
+
+class InMemoryLeaderboardStore(BaseLeaderboardStore):
+    """
+    Process-local store used by tests and single-process development.
+    """
+
+    def __init__(self, **options):
+        self._scores = {}
+        self._ordered = {}
+        self._dirty = set()
+        self._lock = threading.RLock()
+
+    def _board(self, board_id):
+        return (
+            self._scores.setdefault(board_id, {}),
+            self._ordered.setdefault(board_id, []),
+        )
+
+    def exists(self, board_id):
+        return board_id in self._scores
+
+    def load(self, board_id, scores):
+        with self._lock:
+            self._scores[board_id] = {str(user_id): int(score) for user_id, score in scores.items()}
+            self._ordered[board_id] = sorted(
+                (-score, member) for member, score in self._scores[board_id].items()
+            )
+
+    def set_score(self, board_id, user_id, score):
+        member = str(user_id)
+        with self._lock:
+            scores, ordered = self._board(board_id)
+            previous = scores.get(member)
+            if previous is not None:
+                del ordered[bisect_left(ordered, (-previous, member))]
+            scores[member] = int(score)
+            insort(ordered, (-int(score), member))
+
+    def incr_score(self, board_id, user_id, amount):
+        with self._lock:
+            score = (self.get_score(board_id, user_id) or 0) + int(amount)
+            self.set_score(board_id, user_id, score)
+            return score
+
+    def get_score(self, board_id, user_id):
+        return self._scores.get(board_id, {}).get(str(user_id))
+
+    def get_rank(self, board_id, user_id):
+        score = self.get_score(board_id, user_id)
+        if score is None:
+            return None
+        return bisect_left(self._ordered[board_id], (-score, '')) + 1
+
+    def top(self, board_id, limit):
+        with self._lock:
+            ordered = self._ordered.get(board_id, [])
+            window = ordered if limit is None else ordered[:limit]
+            return _rank_window([(member, -score) for score, member in window], 0, 1)
+
+    def around(self, board_id, user_id, radius):
+        with self._lock:
+            score = self.get_score(board_id, user_id)
+            if score is None:
+                return []
+            ordered = self._ordered[board_id]
+            position = bisect_left(ordered, (-score, str(user_id)))
+            start = max(position - radius, 0)
+            window = ordered[start:position + radius + 1]
+            first_rank = bisect_left(ordered, (window[0][0], '')) + 1
+            return _rank_window([(member, -s) for s, member in window], start, first_rank)
+
+    def page(self, board_id, after, limit):
+        with self._lock:
+            ordered = self._ordered.get(board_id, [])
+            start = 0
+            if after is not None:
+                start = bisect_right(ordered, (-int(after[0]), str(after[1])))
+            window = ordered[start:start + limit]
+            if not window:
+                return []
+            first_rank = bisect_left(ordered, (window[0][0], '')) + 1
+            return _rank_window([(member, -s) for s, member in window], start, first_rank)
+
+    def count(self, board_id):
+        return len(self._scores.get(board_id, {}))
+
+    def remove(self, board_id, user_id):
+        member = str(user_id)
+        with self._lock:
+            scores, ordered = self._board(board_id)
+            previous = scores.pop(member, None)
+            if previous is not None:
+                del ordered[bisect_left(ordered, (-previous, member))]
+
+    def clear(self, board_id):
+        with self._lock:
+            self._scores.pop(board_id, None)
+            self._ordered.pop(board_id, None)
+
+    def mark_dirty(self, user_ids):
+        with self._lock:
+            self._dirty.update(str(user_id) for user_id in user_ids)
+
+    def pop_dirty(self, limit):
+        with self._lock:
+            popped = [self._dirty.pop() for _ in range(min(limit, len(self._dirty)))]
+        return popped
+
+
+class RedisLeaderboardStore(BaseLeaderboardStore):
+    """
+    Store backed by Redis sorted sets; rank lookups are O(log n).
+
+    Scores are stored negated and read in ascending order, so that equal
+    scores come by ascending member like in the other stores and snapshots
+    (ZREVRANGE would return them by descending member).
+    """
+
+    def __init__(self, url='redis://localhost:6379/0', key_prefix='leaderboard', **options):
+        import redis
+
+        self.client = redis.Redis.from_url(url, decode_responses=True, **options)
+        self.key_prefix = key_prefix
+
+    def _key(self, board_id):
+        return f"{self.key_prefix}:{board_id}"
+
+    def _board_key(self, board_id):
+        # Versioned, boards written with positive scores are not read back
+        return self._key(f"neg:{board_id}")
+
+    def exists(self, board_id):
+        return bool(self.client.exists(self._board_key(board_id)))
+
+    def load(self, board_id, scores):
+        key = self._board_key(board_id)
+        pipe = self.client.pipeline()
+        pipe.delete(key)
+        if scores:
+            pipe.zadd(key, {str(user_id): -int(score) for user_id, score in scores.items()})
+        pipe.execute()
+
+    def set_score(self, board_id, user_id, score):
+        self.client.zadd(self._board_key(board_id), {str(user_id): -int(score)})
+
+    def incr_score(self, board_id, user_id, amount):
+        return -int(self.client.zincrby(self._board_key(board_id), -int(amount), str(user_id)))
+
+    def get_score(self, board_id, user_id):
+        score = self.client.zscore(self._board_key(board_id), str(user_id))
+        return None if score is None else -int(score)
+
+    def _rank_for_score(self, key, score):
+        return self.client.zcount(key, '-inf', f"({-score}") + 1
+
+    def _range(self, key, start, stop):
+        items = self.client.zrange(key, start, stop, withscores=True)
+        return [(member, -int(score)) for member, score in items]
+
+    def get_rank(self, board_id, user_id):
+        score = self.get_score(board_id, user_id)
+        if score is None:
+            return None
+        return self._rank_for_score(self._board_key(board_id), score)
+
+    def top(self, board_id, limit):
+        if limit is not None and limit <= 0:
+            return []
+        stop = -1 if limit is None else limit - 1
+        return _rank_window(self._range(self._board_key(board_id), 0, stop), 0, 1)
+
+    def around(self, board_id, user_id, radius):
+        key = self._board_key(board_id)
+        position = self.client.zrank(key, str(user_id))
+        if position is None:
+            return []
+        start = max(position - radius, 0)
+        items = self._range(key, start, position + radius)
+        first_rank = self._rank_for_score(key, items[0][1])
+        return _rank_window(items, start, first_rank)
+
+    def page(self, board_id, after, limit):
+        key = self._board_key(board_id)
+        position = 0
+        if after is not None:
+            score, member = int(after[0]), str(after[1])
+            # Start at the cursor's score and skip the equal scores up to the
+            # cursor's member, which come by ascending member.
+            position = self.client.zcount(key, '-inf', f"({-score}")
+            while True:
+                ties = self._range(key, position, position + limit - 1)
+                skipped = 0
+                for tie_member, tie_score in ties:
+                    if tie_score != score or tie_member > member:
+                        break
+                    skipped += 1
+                position += skipped
+                if skipped < len(ties) or not ties:
+                    break
+        items = self._range(key, position, position + limit - 1)
+        if not items:
+            return []
+        return _rank_window(items, position, self._rank_for_score(key, items[0][1]))
+
+    def count(self, board_id):
+        return self.client.zcard(self._board_key(board_id))
+
+    def remove(self, board_id, user_id):
+        self.client.zrem(self._board_key(board_id), str(user_id))
+
+    def clear(self, board_id):
+        self.client.delete(self._board_key(board_id))
+
+    def mark_dirty(self, user_ids):
+        members = [str(user_id) for user_id in user_ids]
+        if members:
+            self.client.sadd(self._key('dirty'), *members)
+
+    def pop_dirty(self, limit):
+        return self.client.spop(self._key('dirty'), limit) or []
+
+
+@lru_cache(maxsize=None)
+def get_leaderboard_store():
+    """Return the process-wide store configured by settings.LEADERBOARD_STORE."""
+    config = getattr(settings, 'LEADERBOARD_STORE', {})
+    backend = import_string(config.get('BACKEND', DEFAULT_LEADERBOARD_STORE))
+    return backend(**config.get('OPTIONS', {}))
+
+
+@receiver(setting_changed)
+def reset_leaderboard_store(setting, **kwargs):
+    if setting == 'LEADERBOARD_STORE':
+        get_leaderboard_store.cache_clear()
@@ -0,0 +1,60 @@
+# gamification/services/level_service.py
+from bisect import bisect_right
+
+from core.cache import VersionedLocalCache
+
+from ..models import Level
+
+
+class LevelTable:
+    """
+    Immutable snapshot of the Level table answering level lookups with
+    bisection instead of queries.
+    """
+
+    def __init__(self, levels):
+        self.levels = sorted(levels, key=lambda level: level.number)
+        self.numbers = [level.number for level in self.levels]
+        self.by_pk = {level.pk: level for level in self.levels}
+
+        # Highest level number reachable with a given amount of points,
+        # even if points_required is not monotonic in the level number.
+        by_points = sorted(self.levels, key=lambda level: level.points_required)
+        self.thresholds = [level.points_required for level in by_points]
+        self.best_reachable = []
+        best = None
+        for level in by_points:
+            if best is None or level.number > best.number:
+                best = level
+            self.best_reachable.append(best)
+
+    def get(self, pk):
+        return self.by_pk.get(pk)
+
+    def first(self):
+        return self.levels[0] if self.levels else None
+
+    def next_after(self, number):
+        """The level following the given level number, or None."""
+        position = bisect_right(self.numbers, number)
+        return self.levels[position] if position < len(self.levels) else None
+
+    def for_points(self, points):
+        """The highest level the given total of points qualifies for."""
+        position = bisect_right(self.thresholds, points)
+        return self.best_reachable[position - 1] if position else None
+
+
+level_table = VersionedLocalCache(
+    'gamification:level_table',
+    lambda: LevelTable(Level.objects.all())
+)
+
+
+def get_level_table():
+    return level_table.get()
+
+
+def invalidate_level_table():
+    """Reload the level table in every process on next use."""
+    level_table.invalidate_on_commit()
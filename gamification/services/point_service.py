@@ -1,5 +1,13 @@
 # gamification/services/point_service.py
-from ..models import Point, UserLevel
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from ..models import ActivityDay, LevelUpEvent, Point, UserLevel
+from . import activity_service, rollup_service
+from .level_service import get_level_table
 
 
 def award_points(user, amount, source, description=""):
@@ -54,4 +62,121 @@ def get_user_point_history(user, limit=None, source=None):
     if limit:
         query = query[:limit]
     
-    return query
\ No newline at end of file
+    return query
+
+
+BULK_BATCH_SIZE = 1000
+
+
+def bulk_award_points(awards, default_source='admin', default_description=""):
+    """
+    Award points to many users at once, e.g. to distribute event prizes.
+    
+    awards is an iterable of (user_id, amount, source, description) tuples;
+    source and description may be omitted or None. Points are inserted with
+    bulk_create and totals and levels are updated set-wise instead of going
+    through the per-Point post_save cascade. Leaderboard and achievement
+    re-evaluation is queued once per affected user.
+    
+    Returns the created Point records. Raises ValueError on invalid input.
+    """
+    from django.contrib.auth import get_user_model
+    
+    points = []
+    for award in awards:
+        user_id, amount, *rest = award
+        source = (rest[0] if rest else None) or default_source
+        description = (rest[1] if len(rest) > 1 else None) or default_description
+        amount = int(amount)
+        if amount <= 0:
+            raise ValueError(f"Amount must be positive for user {user_id}.")
+        points.append(Point(user_id=user_id, amount=amount, source=source, description=description))
+    if not points:
+        return []
+    
+    user_ids = {str(point.user_id) for point in points}
+    existing = {
+        str(pk) for pk in get_user_model().objects.filter(
+            pk__in=user_ids
+        ).values_list('pk', flat=True)
+    }
+    missing = user_ids - existing
+    if missing:
+        raise ValueError(f"Unknown users: {', '.join(sorted(missing))}")
+    
+    with transaction.atomic():
+        points = Point.objects.bulk_create(points, batch_size=BULK_BATCH_SIZE)
+        
+        awarded = defaultdict(int)
+        for point in points:
+            awarded[str(point.user_id)] += point.amount
+        rollup_service.increment_many(timezone.localdate(), 'points', awarded)
+        
+        # bulk_create sends no post_save, so record the activity here
+        activity = Counter(str(point.user_id) for point in points)
+        activity_service.record_activity_many(activity, ActivityDay.SOURCE_POINTS)
+        
+        _update_user_levels(list(awarded))
+        
+        affected = list(awarded)
+        transaction.on_commit(lambda: _queue_reevaluation(affected))
+    
+    return points
+
+
+def _update_user_levels(user_ids):
+    """Recompute total points and levels of the given users set-wise."""
+    table = get_level_table()
+    first_level = table.first()
+    if first_level is not None:
+        UserLevel.objects.bulk_create(
+            [UserLevel(user_id=user_id, level=first_level) for user_id in user_ids],
+            batch_size=BULK_BATCH_SIZE,
+            ignore_conflicts=True
+        )
+    
+    # Lock the rows before summing, so that an award committed meanwhile is
+    # part of the totals instead of being overwritten by a stale one
+    user_levels = list(
+        UserLevel.objects.select_for_update().filter(user_id__in=user_ids).order_by('pk')
+    )
+    totals = {
+        str(user_id): total or 0
+        for user_id, total in Point.objects.filter(
+            user_id__in=user_ids
+        ).order_by().values('user_id').annotate(
+            total=Sum('amount')
+        ).values_list('user_id', 'total')
+    }
+    
+    now = timezone.now()
+    level_ups = []
+    for user_level in user_levels:
+        user_level.total_points = max(totals.get(str(user_level.user_id), 0), 0)
+        new_level = table.for_points(user_level.total_points)
+        if new_level and new_level.pk != user_level.level_id:
+            level_ups.append(LevelUpEvent(
+                user_id=user_level.user_id,
+                from_level_id=user_level.level_id,
+                to_level=new_level
+            ))
+            user_level.level = new_level
+        user_level.points_to_next_level = user_level.calculate_points_to_next_level()
+        user_level.updated_at = now
+    
+    UserLevel.objects.bulk_update(
+        user_levels,
+        ['total_points', 'level', 'points_to_next_level', 'updated_at'],
+        batch_size=BULK_BATCH_SIZE
+    )
+    LevelUpEvent.objects.bulk_create(level_ups, batch_size=BULK_BATCH_SIZE)
+
+
+def _queue_reevaluation(user_ids):
+    from ..tasks import check_user_achievements_task
+    from . import leaderboard_service, profile_service
+    
+    leaderboard_service.mark_users_dirty(user_ids)
+    profile_service.invalidate_profiles(user_ids)
+    for offset in range(0, len(user_ids), BULK_BATCH_SIZE):
+        check_user_achievements_task.delay(user_ids[offset:offset + BULK_BATCH_SIZE])
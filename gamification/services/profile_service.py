@@ -0,0 +1,32 @@
+# gamification/services/profile_service.py
+from django.core.cache import cache
+from django.db import transaction
+
+from core.instrumentation import count_cache
+
+# Leaderboard ranks and edits to badge, achievement or level definitions do
+# not invalidate profiles; they show up once the cached copy expires.
+PROFILE_CACHE_TIMEOUT = 300
+
+
+def _cache_key(user_id):
+    return f"gamification:profile:{user_id}"
+
+
+def get_profile(user):
+    """Return the serialized gamification profile of a user, cached."""
+    key = _cache_key(user.pk)
+    data = cache.get(key)
+    count_cache(data is not None)
+    if data is None:
+        from ..serializers import UserGamificationProfileSerializer
+        data = UserGamificationProfileSerializer(user).data
+        cache.set(key, data, PROFILE_CACHE_TIMEOUT)
+    return data
+
+
+def invalidate_profiles(user_ids):
+    """Drop the cached profiles of the given users once the change commits."""
+    keys = [_cache_key(user_id) for user_id in user_ids]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,93 @@
+# gamification/services/reward_service.py
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+
+from ..models import Point, Reward, UserLevel, UserReward
+from .level_service import get_level_table
+
+
+class RedemptionError(ValueError):
+    """Raised when a reward cannot be redeemed."""
+
+
+def _available_rewards(now=None):
+    now = now or timezone.now()
+    return Reward.objects.filter(
+        is_active=True,
+        start_date__lte=now
+    ).filter(
+        Q(end_date__isnull=True) | Q(end_date__gt=now)
+    )
+
+
+def redeem_reward(user, reward):
+    """
+    Redeem a reward for a user.
+
+    The points balance and the remaining stock are both claimed with
+    conditional UPDATEs, so concurrent redeemers can neither overdraw a
+    balance nor oversell a limited reward, and no row is locked longer than
+    the few statements of one short transaction. The contended reward row is
+    updated last to keep its lock time minimal.
+
+    Returns the created UserReward. Raises RedemptionError otherwise.
+    """
+    cost = reward.points_cost
+
+    with transaction.atomic():
+        if cost:
+            # Users on the last level have no next level: their distance stays 0
+            table = get_level_table()
+            last_levels = [level.pk for level in table.levels if table.next_after(level.number) is None]
+            debited = UserLevel.objects.filter(
+                user=user,
+                total_points__gte=cost
+            ).update(
+                total_points=F('total_points') - cost,
+                points_to_next_level=Case(
+                    When(level_id__in=last_levels, then=Value(0)),
+                    default=F('points_to_next_level') + cost
+                ),
+                updated_at=timezone.now()
+            )
+            if not debited:
+                raise RedemptionError(
+                    f"You don't have enough points. Required: {cost}, "
+                    f"Available: {_balance(user)}"
+                )
+            # Ledger entry matching the debit. Both records are inserted with
+            # bulk_create to skip the UserReward and Point signals, which would
+            # debit the balance a second time and recompute it with a SUM.
+            Point.objects.bulk_create([Point(
+                user=user,
+                amount=-cost,
+                source='reward_redemption',
+                description=f"Redeemed reward: {reward.name}"
+            )])
+
+        user_reward, = UserReward.objects.bulk_create([UserReward(
+            user=user,
+            reward=reward,
+            points_spent=cost,
+            status='pending'
+        )])
+
+        available = _available_rewards().filter(pk=reward.pk)
+        claimed = available.filter(quantity_available__gt=0).update(
+            quantity_available=F('quantity_available') - 1
+        )
+        if not claimed and not available.filter(quantity_available__lt=0).exists():
+            # Sold out or no longer available: undo the debit as well
+            raise RedemptionError("This reward is not available.")
+
+        from . import leaderboard_service, profile_service
+        profile_service.invalidate_profiles([user.pk])
+        if cost:
+            transaction.on_commit(lambda: leaderboard_service.mark_users_dirty([user.pk]))
+
+    return user_reward
+
+
+def _balance(user):
+    return UserLevel.objects.filter(user=user).values_list('total_points', flat=True).first() or 0
@@ -0,0 +1,179 @@
+# gamification/services/rollup_service.py
+from collections import defaultdict
+from datetime import time
+
+from django.db import IntegrityError, transaction
+from django.db.models import (Case, Count, F, IntegerField, Sum, Value,
+                              When)
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from ..models import Point, PointRollup, UserBadge, UserChallenge
+
+ROLLUP_FIELDS = ('points', 'challenges_completed', 'badges_earned')
+
+# Leaderboard category -> PointRollup column
+CATEGORY_FIELDS = {
+    'points': 'points',
+    'challenges': 'challenges_completed',
+    'badges': 'badges_earned',
+}
+
+
+def _day(value):
+    return timezone.localdate(value) if value else timezone.localdate()
+
+
+def increment(user_id, day, **amounts):
+    """Atomically add amounts to the user's rollup row for the given day."""
+    amounts = {field: value for field, value in amounts.items() if value}
+    if not amounts:
+        return
+    
+    rows = PointRollup.objects.filter(user_id=user_id, day=day)
+    updates = {field: F(field) + value for field, value in amounts.items()}
+    if rows.update(**updates) or any(value < 0 for value in amounts.values()):
+        return
+    try:
+        with transaction.atomic():
+            PointRollup.objects.create(user_id=user_id, day=day, **amounts)
+    except IntegrityError:
+        # Another writer created the row first
+        rows.update(**updates)
+
+
+def increment_many(day, field, amounts_by_user, batch_size=1000):
+    """
+    Add amounts to one rollup column of many users for the same day.
+    Missing rows are inserted empty, ignoring the ones a concurrent writer
+    created first, then every row is incremented in place.
+    """
+    items = list(amounts_by_user.items())
+    with transaction.atomic():
+        PointRollup.objects.bulk_create(
+            [PointRollup(user_id=user_id, day=day) for user_id, _ in items],
+            batch_size=batch_size,
+            ignore_conflicts=True
+        )
+        for start in range(0, len(items), batch_size):
+            batch = items[start:start + batch_size]
+            PointRollup.objects.filter(
+                day=day,
+                user_id__in=[user_id for user_id, _ in batch]
+            ).update(**{
+                field: F(field) + Case(
+                    *[When(user_id=user_id, then=Value(amount)) for user_id, amount in batch],
+                    default=Value(0),
+                    output_field=IntegerField()
+                )
+            })
+
+
+def record_points(point, sign=1):
+    if point.amount > 0:
+        increment(point.user_id, _day(point.created_at), points=sign * point.amount)
+
+
+def record_challenge_completed(user_challenge, sign=1):
+    increment(user_challenge.user_id, _day(user_challenge.completed_at), challenges_completed=sign)
+
+
+def record_badge_earned(user_badge, sign=1):
+    increment(user_badge.user_id, _day(user_badge.earned_at), badges_earned=sign)
+
+
+def covers_whole_days(start_date=None, end_date=None):
+    """Rollups can only answer ranges that start and end at local midnight."""
+    return all(
+        value is None or timezone.localtime(value).time() == time.min
+        for value in (start_date, end_date)
+    )
+
+
+def rollup_scores(user_ids, category, start_date=None, end_date=None):
+    """
+    Return {str(user_id): score} for a category summed from daily rollups.
+    The range must satisfy covers_whole_days.
+    """
+    field = CATEGORY_FIELDS.get(category)
+    if field is None:
+        return {}
+    
+    query = PointRollup.objects.filter(user_id__in=user_ids)
+    if start_date:
+        query = query.filter(day__gte=_day(start_date))
+    if end_date:
+        query = query.filter(day__lt=_day(end_date))
+    
+    rows = query.order_by().values('user_id').annotate(
+        score=Sum(field)
+    ).values_list('user_id', 'score')
+    return {str(user_id): score or 0 for user_id, score in rows}
+
+
+def compute_rollups(user_ids=None):
+    """
+    Aggregate rollups straight from the source tables.
+    Returns {(str(user_id), day): {field: value}}.
+    """
+    sources = [
+        ('points', Point.objects.filter(amount__gt=0), 'created_at', Sum('amount')),
+        ('challenges_completed', UserChallenge.objects.filter(status='completed', completed_at__isnull=False), 'completed_at', Count('id')),
+        ('badges_earned', UserBadge.objects.all(), 'earned_at', Count('id')),
+    ]
+    
+    totals = defaultdict(lambda: dict.fromkeys(ROLLUP_FIELDS, 0))
+    for field, query, date_field, aggregate in sources:
+        if user_ids is not None:
+            query = query.filter(user_id__in=user_ids)
+        rows = query.order_by().annotate(
+            rollup_day=TruncDate(date_field)
+        ).values('user_id', 'rollup_day').annotate(
+            total=aggregate
+        ).values_list('user_id', 'rollup_day', 'total')
+        for user_id, day, total in rows:
+            totals[(str(user_id), day)][field] = total or 0
+    return totals
+
+
+def backfill(user_ids=None, batch_size=1000):
+    """Rebuild rollups from the source tables. Returns the number of rows written."""
+    totals = compute_rollups(user_ids)
+    with transaction.atomic():
+        existing = PointRollup.objects.all()
+        if user_ids is not None:
+            existing = existing.filter(user_id__in=user_ids)
+        existing.delete()
+        PointRollup.objects.bulk_create(
+            [
+                PointRollup(user_id=user_id, day=day, **values)
+                for (user_id, day), values in totals.items()
+            ],
+            batch_size=batch_size
+        )
+    return len(totals)
+
+
+def find_inconsistencies(user_ids=None):
+    """
+    Compare stored rollups with the source tables.
+    Returns a list of (user_id, day, expected, stored) tuples.
+    """
+    expected = compute_rollups(user_ids)
+    stored_query = PointRollup.objects.all()
+    if user_ids is not None:
+        stored_query = stored_query.filter(user_id__in=user_ids)
+    
+    empty = dict.fromkeys(ROLLUP_FIELDS, 0)
+    stored = {
+        (str(row['user_id']), row['day']): {field: row[field] for field in ROLLUP_FIELDS}
+        for row in stored_query.values('user_id', 'day', *ROLLUP_FIELDS)
+    }
+    
+    mismatches = []
+    for key in sorted(set(expected) | set(stored), key=lambda k: (k[0], k[1])):
+        want = expected.get(key, empty)
+        have = stored.get(key, empty)
+        if want != have:
+            mismatches.append((key[0], key[1], want, have))
+    return mismatches
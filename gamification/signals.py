@@ -1,15 +1,66 @@
 # gamification/signals.py
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.db.models import Sum
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.utils import timezone
 
-from .models import (LeaderboardEntry, Level, Point, UserAchievement,
-                     UserBadge, UserChallenge, UserLevel, UserReward)
+from .models import (Achievement, ActivityDay, Badge, LeaderboardEntry, Level,
+                     Point, UserAchievement, UserBadge, UserChallenge,
+                     UserLevel, UserReward)
 
 User = get_user_model()
 
+
+@receiver(post_save, sender=Achievement)
+@receiver(post_delete, sender=Achievement)
+@receiver(post_save, sender=Badge)
+@receiver(post_delete, sender=Badge)
+def invalidate_achievement_index(sender, instance, **kwargs):
+    """Recompile the achievement rules after any achievement or badge change."""
+    from .services import achievement_service
+    achievement_service.invalidate_index()
+
+
+@receiver(post_save, sender=Level)
+@receiver(post_delete, sender=Level)
+def invalidate_level_table(sender, instance, **kwargs):
+    """Reload the cached level table after any level change."""
+    from .services import level_service
+    level_service.invalidate_level_table()
+
+
+@receiver(post_save, sender=Point)
+@receiver(post_delete, sender=Point)
+@receiver(post_save, sender=UserLevel)
+@receiver(post_delete, sender=UserLevel)
+@receiver(post_save, sender=UserBadge)
+@receiver(post_delete, sender=UserBadge)
+@receiver(post_save, sender=UserAchievement)
+@receiver(post_delete, sender=UserAchievement)
+@receiver(post_save, sender=UserChallenge)
+@receiver(post_delete, sender=UserChallenge)
+@receiver(post_save, sender=LeaderboardEntry)
+@receiver(post_delete, sender=LeaderboardEntry)
+def invalidate_user_profile(sender, instance, **kwargs):
+    """Drop the cached gamification profile of the affected user."""
+    from .services import profile_service
+    profile_service.invalidate_profiles([instance.user_id])
+
+
+# User fields shown in the profile
+PROFILE_USER_FIELDS = {'username', 'email', 'first_name', 'last_name', 'photo'}
+
+
+@receiver(post_save, sender=User)
+def invalidate_own_profile(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and not PROFILE_USER_FIELDS & set(update_fields)):
+        return
+    from .services import profile_service
+    profile_service.invalidate_profiles([instance.pk])
+
+
 @receiver(post_save, sender=UserLevel)
 def check_level_achievements(sender, instance, **kwargs):
     """Check if user has unlocked any level-based achievements."""
@@ -46,10 +97,80 @@ def process_reward_redemption(sender, instance, created, **kwargs):
         )
 
 
+@receiver(post_save, sender=Point)
+def rollup_point(sender, instance, created, **kwargs):
+    """Add earned points to the user's daily rollup."""
+    if created:
+        from .services import rollup_service
+        rollup_service.record_points(instance)
+
+
+@receiver(post_delete, sender=Point)
+def rollback_point(sender, instance, **kwargs):
+    from .services import rollup_service
+    rollup_service.record_points(instance, sign=-1)
+
+
+@receiver(post_save, sender=Point)
+def record_point_activity(sender, instance, created, **kwargs):
+    """Count earned points as activity of the day."""
+    if created and instance.amount > 0:
+        from .services import activity_service
+        activity_service.record_activity(
+            instance.user_id, ActivityDay.SOURCE_POINTS, instance.created_at
+        )
+
+
+@receiver(post_save, sender='learn.ModuleCompletion')
+def record_module_activity(sender, instance, created, **kwargs):
+    if created:
+        from .services import activity_service
+        activity_service.record_activity(
+            instance.user_id, ActivityDay.SOURCE_MODULE, instance.completed_at
+        )
+
+
+@receiver(post_save, sender='ctf.ChallengeSubmission')
+def record_ctf_submission_activity(sender, instance, created, **kwargs):
+    if created:
+        from .services import activity_service
+        activity_service.record_activity(
+            instance.user_id, ActivityDay.SOURCE_CTF_SUBMISSION, instance.submission_time
+        )
+
+
+@receiver(post_save, sender='challenges.Submission')
+def record_challenge_submission_activity(sender, instance, created, **kwargs):
+    if created:
+        from .services import activity_service
+        activity_service.record_activity(
+            instance.user_id, ActivityDay.SOURCE_CHALLENGE_SUBMISSION, instance.submission_time
+        )
+
+
+@receiver(post_save, sender=UserBadge)
+def rollup_badge(sender, instance, created, **kwargs):
+    """Count the earned badge in the user's daily rollup."""
+    if created:
+        from .services import rollup_service
+        rollup_service.record_badge_earned(instance)
+
+
+@receiver(post_delete, sender=UserBadge)
+def rollback_badge(sender, instance, **kwargs):
+    from .services import rollup_service
+    rollup_service.record_badge_earned(instance, sign=-1)
+
+
 def update_leaderboards(user):
-    """Update all active leaderboards for a user."""
+    """
+    Queue the user's leaderboard scores for recomputation.
+    The work is done in batches by process_dirty_leaderboards_task.
+    """
     from .services import leaderboard_service
-    leaderboard_service.update_user_leaderboards(user)
+    transaction.on_commit(
+        lambda: leaderboard_service.mark_users_dirty([user.pk])
+    )
 
 
 @receiver(post_save, sender=User)
@@ -57,7 +178,8 @@ def create_initial_user_level(sender, instance, created, **kwargs):
     """Create initial user level when a user is created."""
     if created:
         # Get the first level
-        first_level = Level.objects.order_by('number').first()
+        from .services.level_service import get_level_table
+        first_level = get_level_table().first()
         if first_level:
             UserLevel.objects.create(
                 user=instance,
@@ -73,24 +195,31 @@ def update_user_points(sender, instance, created, **kwargs):
         user = instance.user
         
         # Get or create user level
-        user_level, created = UserLevel.objects.get_or_create(
-            user=user,
-            defaults={
-                'level': Level.objects.order_by('number').first(),
-                'total_points': 0
-            }
-        )
-        
-        # Update total points - CORRECTION ICI
-        total_points = Point.objects.filter(user=user).aggregate(
-            total=Sum('amount')
-        )['total'] or 0
-        
-        user_level.total_points = total_points
-        user_level.save()
+        from .services.level_service import get_level_table
+        first_level = get_level_table().first()
+        if first_level is None:
+            # No level configured yet: there is no level to create
+            user_level = UserLevel.objects.filter(user=user).first()
+        else:
+            user_level, created = UserLevel.objects.get_or_create(
+                user=user,
+                defaults={
+                    'level': first_level,
+                    'total_points': 0
+                }
+            )
         
-        # Check if user should level up
-        user_level.update_level()
+        if user_level is not None:
+            # Update total points - CORRECTION ICI
+            total_points = Point.objects.filter(user=user).aggregate(
+                total=Sum('amount')
+            )['total'] or 0
+            
+            user_level.total_points = total_points
+            
+            # Check if user should level up; update_level saves on level change
+            if not user_level.update_level():
+                user_level.save()
         
         # Update leaderboards
         update_leaderboards(user)
\ No newline at end of file
@@ -1,10 +1,14 @@
 # gamification/tasks.py
 from django.utils import timezone
 
+from celery import shared_task
+
 from .models import Leaderboard, LeaderboardEntry
 from .services import leaderboard_service
+from .services.leaderboard_store import get_leaderboard_store
 
 
+@shared_task
 def create_periodic_leaderboards_task():
     """
     Task to create periodic leaderboards.
@@ -13,19 +17,22 @@ def create_periodic_leaderboards_task():
     leaderboard_service.create_periodic_leaderboards()
 
 
+@shared_task
 def update_leaderboard_ranks_task():
     """
-    Task to update ranks for all active leaderboards.
-    Should be run hourly.
+    Task to refresh scores and ranks of all active leaderboards from the
+    leaderboard store into the database.
+    Should be run every few minutes.
     """
     active_leaderboards = Leaderboard.objects.filter(is_active=True)
     for leaderboard in active_leaderboards:
-        leaderboard_service.update_leaderboard_ranks(leaderboard)
+        leaderboard_service.sync_leaderboard_from_store(leaderboard)
 
 
+@shared_task
 def close_expired_leaderboards_task():
     """
-    Task to close expired leaderboards.
+    Task to close expired leaderboards and freeze their standings.
     Should be run daily.
     """
     now = timezone.now()
@@ -34,6 +41,38 @@ def close_expired_leaderboards_task():
         end_date__lt=now
     )
     
+    store = get_leaderboard_store()
     for leaderboard in expired_leaderboards:
+        # Persist the final standings before dropping the live board
+        leaderboard_service.sync_leaderboard_from_store(leaderboard)
+        
         leaderboard.is_active = False
-        leaderboard.save()
\ No newline at end of file
+        leaderboard.save()
+        
+        # Move the entries out of the live table into a compact snapshot
+        leaderboard_service.freeze_leaderboard(leaderboard)
+        store.clear(leaderboard.pk)
+
+
+@shared_task
+def process_dirty_leaderboards_task():
+    """
+    Task to recompute leaderboard scores of users who received points
+    since the last run.
+    Should be run every few seconds.
+    """
+    return leaderboard_service.process_dirty_users()
+
+
+@shared_task
+def check_user_achievements_task(user_ids):
+    """
+    Task to re-evaluate achievements of users whose points were changed in
+    bulk, bypassing the per-record signals.
+    """
+    from django.contrib.auth import get_user_model
+    
+    from .services import achievement_service
+    
+    for user in get_user_model().objects.filter(pk__in=user_ids):
+        achievement_service.check_all_achievements(user)
@@ -89,6 +89,10 @@ class UserLevelModelTest(TestCase):
         
         self.assertTrue(result)
         self.assertEqual(self.user_level.level, self.level2)
+    
+    def test_points_to_next_level_without_level(self):
+        user_level = UserLevel(user=self.user, total_points=0)
+        self.assertEqual(user_level.calculate_points_to_next_level(), 0)
 
 
 class BadgeModelTest(TestCase):
@@ -219,4 +223,59 @@ class UserChallengeModelTest(TestCase):
         self.assertIsNotNone(self.user_challenge.completed_at)
 
 
+class UserChallengeProgressTest(TestCase):
+    def setUp(self):
+        Level.objects.create(number=1, name='Beginner', points_required=0)
+        self.user = User.objects.create_user(
+            username='progressor',
+            email='progressor@example.com',
+            password='testpass123'
+        )
+        self.challenge = Challenge.objects.create(
+            title='Counter Challenge',
+            description='A counter challenge',
+            difficulty='easy',
+            points_reward=40,
+            completion_criteria={'flags': 4, 'writeups': 1}
+        )
+        self.user_challenge = UserChallenge.objects.create(
+            user=self.user,
+            challenge=self.challenge
+        )
+    
+    def test_increment_progress(self):
+        self.user_challenge.update_progress({'flags': 2}, increment=True)
+        self.user_challenge.update_progress({'flags': 2}, increment=True)
+        
+        self.user_challenge.refresh_from_db()
+        self.assertEqual(self.user_challenge.progress, {'flags': 4})
+        self.assertEqual(self.user_challenge.progress_percentage, 50)
+        
+        self.user_challenge.update_progress({'writeups': 1}, increment=True)
+        self.assertEqual(self.user_challenge.status, 'completed')
+    
+    def test_percentage_read_under_lock(self):
+        stale = UserChallenge.objects.get(pk=self.user_challenge.pk)
+        self.user_challenge.update_progress({'flags': 4}, increment=True)
+        
+        # The stale instance must not write back its old percentage
+        self.assertEqual(stale.update_progress({'other': 1}, increment=True), 50)
+        stale.refresh_from_db()
+        self.assertEqual(stale.progress, {'flags': 4, 'other': 1})
+        self.assertEqual(stale.progress_percentage, 50)
+    
+    def test_bool_increment_rejected(self):
+        with self.assertRaises(ValueError):
+            self.user_challenge.update_progress({'flags': True}, increment=True)
+        self.user_challenge.refresh_from_db()
+        self.assertEqual(self.user_challenge.progress, {})
+    
+    def test_complete_awards_once(self):
+        other = UserChallenge.objects.get(pk=self.user_challenge.pk)
+        
+        self.assertTrue(self.user_challenge.complete())
+        self.assertFalse(other.complete())
+        self.assertEqual(Point.objects.filter(user=self.user, source='challenge').count(), 1)
+
+
 # Add more tests for other models as needed
\ No newline at end of file
@@ -0,0 +1,512 @@
+# gamification/test/test_services.py
+from datetime import datetime, time, timedelta
+from importlib import import_module
+from unittest import mock
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from ..models import (Achievement, ActivityDay, ActivityStreak, Badge,
+                      Leaderboard, LeaderboardEntry, LeaderboardSnapshot,
+                      Level, LevelUpEvent, Point, PointRollup, Reward,
+                      UserAchievement, UserBadge, UserLevel, UserReward)
+from ..services import (achievement_service, activity_service,
+                        leaderboard_service, point_service, profile_service,
+                        reward_service, rollup_service)
+from ..services.leaderboard_store import (InMemoryLeaderboardStore,
+                                          get_leaderboard_store)
+
+IN_MEMORY_STORE = {
+    'BACKEND': 'gamification.services.leaderboard_store.InMemoryLeaderboardStore',
+}
+
+User = get_user_model()
+
+
+class LeaderboardRankTest(TestCase):
+    def setUp(self):
+        self.leaderboard = Leaderboard.objects.create(
+            name='Points All Time',
+            category='points',
+            period='all_time'
+        )
+        self.entries = []
+        for i, score in enumerate([50, 100, 100, 10]):
+            user = User.objects.create_user(
+                username=f'ranker{i}',
+                email=f'ranker{i}@example.com',
+                password='testpass123'
+            )
+            self.entries.append(LeaderboardEntry.objects.create(
+                leaderboard=self.leaderboard,
+                user=user,
+                score=score
+            ))
+    
+    def test_ties_share_rank(self):
+        leaderboard_service.update_leaderboard_ranks(self.leaderboard)
+        
+        ranks = [
+            LeaderboardEntry.objects.get(pk=entry.pk).rank
+            for entry in self.entries
+        ]
+        self.assertEqual(ranks, [3, 1, 1, 4])
+    
+    def test_only_changed_ranks_rewritten(self):
+        leaderboard_service.update_leaderboard_ranks(self.leaderboard)
+        
+        LeaderboardEntry.objects.filter(pk=self.entries[3].pk).update(score=75)
+        leaderboard_service.update_leaderboard_ranks(self.leaderboard)
+        
+        self.assertEqual(LeaderboardEntry.objects.get(pk=self.entries[3].pk).rank, 3)
+        self.assertEqual(LeaderboardEntry.objects.get(pk=self.entries[0].pk).rank, 4)
+
+
+class LeaderboardSnapshotTest(TestCase):
+    def setUp(self):
+        self.leaderboard = Leaderboard.objects.create(
+            name='Points Daily',
+            category='points',
+            period='daily',
+            is_active=False
+        )
+        self.users = []
+        for i, score in enumerate([50, 100, 100, 10]):
+            user = User.objects.create_user(
+                username=f'frozen{i}',
+                email=f'frozen{i}@example.com',
+                password='testpass123'
+            )
+            self.users.append(user)
+            LeaderboardEntry.objects.create(leaderboard=self.leaderboard, user=user, score=score)
+    
+    def test_freeze_moves_entries_into_snapshot(self):
+        snapshot = leaderboard_service.freeze_leaderboard(self.leaderboard)
+        
+        self.assertEqual(snapshot.participants, 4)
+        self.assertFalse(LeaderboardEntry.objects.filter(leaderboard=self.leaderboard).exists())
+        
+        entries = leaderboard_service.get_snapshot_entries(self.leaderboard)
+        self.assertEqual([entry.rank for entry in entries], [1, 1, 3, 4])
+        self.assertEqual(entries[2].user, self.users[0])
+        
+        position = leaderboard_service.get_snapshot_position(self.leaderboard, self.users[3])
+        self.assertEqual((position.score, position.rank), (10, 4))
+        self.assertEqual(LeaderboardSnapshot.objects.count(), 1)
+    
+    def test_snapshot_pages_beyond_top_entries(self):
+        with mock.patch.object(leaderboard_service, 'SNAPSHOT_TOP_SIZE', 2):
+            leaderboard_service.freeze_leaderboard(self.leaderboard)
+        
+        first = leaderboard_service.get_snapshot_page(self.leaderboard, 3)
+        self.assertEqual([entry.rank for entry in first], [1, 1, 3])
+        rest = leaderboard_service.get_snapshot_page(
+            self.leaderboard, 3, after=(first[-1].score, first[-1].user_id)
+        )
+        self.assertEqual([(entry.user, entry.rank) for entry in rest], [(self.users[3], 4)])
+        self.assertEqual(
+            [(entry.user, entry.rank) for entry in leaderboard_service.get_entries_page(self.leaderboard, 10)],
+            [(entry.user, entry.rank) for entry in leaderboard_service.get_snapshot_page(self.leaderboard, 10)]
+        )
+
+
+class InMemoryLeaderboardStoreTest(TestCase):
+    def setUp(self):
+        self.store = InMemoryLeaderboardStore()
+        self.store.load(1, {'a': 10, 'b': 30, 'c': 30, 'd': 5, 'e': 20})
+    
+    def test_rank_and_top(self):
+        self.assertEqual(self.store.get_rank(1, 'b'), 1)
+        self.assertEqual(self.store.get_rank(1, 'c'), 1)
+        self.assertEqual(self.store.get_rank(1, 'e'), 3)
+        self.assertIsNone(self.store.get_rank(1, 'zz'))
+        
+        top = self.store.top(1, 3)
+        self.assertEqual([(e.user_id, e.rank) for e in top], [('b', 1), ('c', 1), ('e', 3)])
+    
+    def test_incr_score_reorders(self):
+        self.assertEqual(self.store.incr_score(1, 'd', 40), 45)
+        self.assertEqual(self.store.get_rank(1, 'd'), 1)
+        self.assertEqual(self.store.get_rank(1, 'b'), 2)
+    
+    def test_around(self):
+        around = self.store.around(1, 'a', 1)
+        self.assertEqual(
+            [(e.user_id, e.score, e.rank) for e in around],
+            [('e', 20, 3), ('a', 10, 4), ('d', 5, 5)]
+        )
+    
+    def test_page_after_key(self):
+        first = self.store.page(1, None, 2)
+        self.assertEqual([(e.user_id, e.rank) for e in first], [('b', 1), ('c', 1)])
+        
+        tie = self.store.page(1, (30, 'b'), 2)
+        self.assertEqual([(e.user_id, e.rank) for e in tie], [('c', 1), ('e', 3)])
+        
+        rest = self.store.page(1, (30, 'c'), 10)
+        self.assertEqual([(e.user_id, e.rank) for e in rest], [('e', 3), ('a', 4), ('d', 5)])
+        self.assertEqual(self.store.page(1, (5, 'd'), 10), [])
+
+
+@override_settings(LEADERBOARD_STORE=IN_MEMORY_STORE)
+class LeaderboardStoreServiceTest(TestCase):
+    def setUp(self):
+        get_leaderboard_store.cache_clear()
+        Level.objects.create(number=1, name='Beginner', points_required=0)
+        self.leaderboard = Leaderboard.objects.create(
+            name='Points All Time',
+            category='points',
+            period='all_time'
+        )
+        self.users = [
+            User.objects.create_user(
+                username=f'player{i}',
+                email=f'player{i}@example.com',
+                password='testpass123'
+            )
+            for i in range(3)
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            for user, amount in zip(self.users, [30, 10, 20]):
+                Point.objects.create(user=user, amount=amount, source='test')
+        self.assertEqual(leaderboard_service.process_dirty_users(), 3)
+    
+    def test_positions_read_from_store(self):
+        self.assertFalse(LeaderboardEntry.objects.exists())
+        
+        top = leaderboard_service.get_top_entries(self.leaderboard, limit=2)
+        self.assertEqual([e.user for e in top], [self.users[0], self.users[2]])
+        
+        positions = leaderboard_service.get_user_positions(
+            self.users[1], Leaderboard.objects.all()
+        )
+        self.assertEqual([(p.score, p.rank) for p in positions], [(10, 3)])
+    
+    def test_profile_positions_read_from_store(self):
+        self.assertFalse(LeaderboardEntry.objects.exists())
+        
+        positions = profile_service.get_profile(self.users[1])['leaderboard_positions']
+        self.assertEqual([(p['score'], p['rank']) for p in positions], [(10, 3)])
+    
+    def test_sync_to_database(self):
+        leaderboard_service.sync_leaderboard_from_store(self.leaderboard)
+        
+        ranks = dict(LeaderboardEntry.objects.values_list('user_id', 'rank'))
+        self.assertEqual(
+            [ranks[user.pk] for user in self.users],
+            [1, 3, 2]
+        )
+        self.assertEqual(get_leaderboard_store().count(self.leaderboard.pk), 3)
+    
+    def test_around_and_keyset_pages(self):
+        around = leaderboard_service.get_entries_around(self.leaderboard, self.users[2], 1)
+        self.assertEqual([e.user for e in around], [self.users[0], self.users[2], self.users[1]])
+        
+        leaderboard_service.sync_leaderboard_from_store(self.leaderboard)
+        first = leaderboard_service.get_entries_page(self.leaderboard, 2)
+        self.assertEqual([e.user for e in first], [self.users[0], self.users[2]])
+        rest = leaderboard_service.get_entries_page(
+            self.leaderboard, 2, after=(first[-1].score, first[-1].user_id)
+        )
+        self.assertEqual([e.user for e in rest], [self.users[1]])
+
+
+class PointRollupTest(TestCase):
+    def setUp(self):
+        Level.objects.create(number=1, name='Beginner', points_required=0)
+        self.user = User.objects.create_user(
+            username='roller',
+            email='roller@example.com',
+            password='testpass123'
+        )
+        for amount in [10, 15]:
+            Point.objects.create(user=self.user, amount=amount, source='test')
+    
+    def test_points_rolled_up_on_insert(self):
+        rollup = PointRollup.objects.get(user=self.user)
+        self.assertEqual(rollup.points, 25)
+        self.assertEqual(rollup_service.find_inconsistencies(), [])
+    
+    def test_period_score_uses_rollups(self):
+        start, end = leaderboard_service.get_date_range_for_period('weekly')
+        self.assertTrue(rollup_service.covers_whole_days(start, end))
+        self.assertEqual(
+            leaderboard_service.calculate_user_score(self.user, 'points', start, end),
+            25
+        )
+    
+    def test_checker_and_backfill(self):
+        PointRollup.objects.all().delete()
+        self.assertEqual(len(rollup_service.find_inconsistencies()), 1)
+        
+        rollup_service.backfill()
+        self.assertEqual(rollup_service.find_inconsistencies(), [])
+    
+    def test_increment_many_creates_and_increments(self):
+        other = User.objects.create_user(
+            username='roller2',
+            email='roller2@example.com',
+            password='testpass123'
+        )
+        today = timezone.localdate()
+        amounts = {str(self.user.pk): 5, str(other.pk): 7}
+        rollup_service.increment_many(today, 'points', amounts)
+        rollup_service.increment_many(today, 'points', amounts)
+        
+        points = dict(PointRollup.objects.filter(day=today).values_list('user_id', 'points'))
+        self.assertEqual(points, {self.user.pk: 35, other.pk: 14})
+    
+    def test_migration_backfills_all_time_scores(self):
+        PointRollup.objects.all().delete()
+        self.assertEqual(leaderboard_service.calculate_user_score(self.user, 'points'), 0)
+        
+        migration = import_module('gamification.migrations.0007_backfill_point_rollups')
+        migration.backfill_rollups(apps, None)
+        self.assertEqual(leaderboard_service.calculate_user_score(self.user, 'points'), 25)
+        self.assertEqual(rollup_service.find_inconsistencies(), [])
+
+
+class BulkPointAwardTest(TestCase):
+    def setUp(self):
+        Level.objects.create(number=1, name='Beginner', points_required=0)
+        Level.objects.create(number=2, name='Intermediate', points_required=100)
+        self.users = [
+            User.objects.create_user(
+                username=f'winner{i}',
+                email=f'winner{i}@example.com',
+                password='testpass123'
+            )
+            for i in range(3)
+        ]
+        Point.objects.create(user=self.users[0], amount=60, source='test')
+    
+    def test_bulk_award_updates_totals_levels_and_rollups(self):
+        points = point_service.bulk_award_points(
+            [(user.pk, 50, 'event') for user in self.users]
+        )
+        
+        self.assertEqual(len(points), 3)
+        self.assertEqual(UserLevel.objects.get(user=self.users[0]).total_points, 110)
+        self.assertEqual(UserLevel.objects.get(user=self.users[0]).level.number, 2)
+        self.assertEqual(UserLevel.objects.get(user=self.users[1]).total_points, 50)
+        self.assertEqual(UserLevel.objects.get(user=self.users[1]).level.number, 1)
+        self.assertEqual(LevelUpEvent.objects.filter(user=self.users[0]).count(), 1)
+        self.assertEqual(rollup_service.find_inconsistencies(), [])
+    
+    def test_bulk_award_counts_as_activity(self):
+        point_service.bulk_award_points(
+            [(user.pk, 50, 'event') for user in self.users] + [(self.users[1].pk, 5, 'event')]
+        )
+        
+        days = dict(ActivityDay.objects.values_list('user_id', 'events'))
+        # users[0] already had a point today from setUp
+        self.assertEqual(days, {self.users[0].pk: 2, self.users[1].pk: 2, self.users[2].pk: 1})
+        for user in self.users:
+            self.assertEqual(activity_service.get_streak(user)['current_streak'], 1)
+    
+    def test_levels_locked_before_totals_are_summed(self):
+        with CaptureQueriesContext(connection) as queries:
+            point_service._update_user_levels([str(user.pk) for user in self.users])
+        statements = [query['sql'] for query in queries.captured_queries]
+        locked = next(i for i, sql in enumerate(statements) if sql.startswith('SELECT') and 'gamification_userlevel' in sql)
+        summed = next(i for i, sql in enumerate(statements) if 'SUM(' in sql)
+        self.assertLess(locked, summed)
+        self.assertEqual(UserLevel.objects.get(user=self.users[0]).total_points, 60)
+    
+    def test_unknown_user_rejected(self):
+        with self.assertRaises(ValueError):
+            point_service.bulk_award_points(
+                [(self.users[0].pk, 10), ('00000000-0000-0000-0000-000000000000', 10)]
+            )
+        self.assertEqual(Point.objects.count(), 1)
+
+
+@override_settings(LEADERBOARD_STORE=IN_MEMORY_STORE)
+class RewardRedemptionTest(TestCase):
+    def setUp(self):
+        Level.objects.create(number=1, name='Beginner', points_required=0)
+        self.user = User.objects.create_user(
+            username='redeemer',
+            email='redeemer@example.com',
+            password='testpass123'
+        )
+        Point.objects.create(user=self.user, amount=100, source='test')
+        self.reward = Reward.objects.create(
+            name='Sticker',
+            description='A sticker',
+            points_cost=40,
+            quantity_available=1
+        )
+    
+    def test_redeem_debits_balance_once(self):
+        reward_service.redeem_reward(self.user, self.reward)
+        
+        self.reward.refresh_from_db()
+        self.assertEqual(self.reward.quantity_available, 0)
+        self.assertEqual(UserLevel.objects.get(user=self.user).total_points, 60)
+        self.assertEqual(Point.objects.filter(user=self.user).count(), 2)
+    
+    def test_sold_out_rolls_back_debit(self):
+        reward_service.redeem_reward(self.user, self.reward)
+        with self.assertRaises(reward_service.RedemptionError):
+            reward_service.redeem_reward(self.user, self.reward)
+        
+        self.assertEqual(UserReward.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(UserLevel.objects.get(user=self.user).total_points, 60)
+    
+    def test_points_to_next_level(self):
+        # Last level: there is no next level to get closer to
+        reward_service.redeem_reward(self.user, self.reward)
+        self.assertEqual(UserLevel.objects.get(user=self.user).points_to_next_level, 0)
+        
+        Level.objects.create(number=2, name='Explorer', points_required=500)
+        user_level = UserLevel.objects.get(user=self.user)
+        user_level.save()
+        self.assertEqual(user_level.points_to_next_level, 440)
+        
+        self.reward.quantity_available = 1
+        self.reward.save()
+        reward_service.redeem_reward(self.user, self.reward)
+        self.assertEqual(UserLevel.objects.get(user=self.user).points_to_next_level, 480)
+    
+    def test_insufficient_points(self):
+        self.reward.points_cost = 150
+        with self.assertRaises(reward_service.RedemptionError):
+            reward_service.redeem_reward(self.user, self.reward)
+        self.assertFalse(UserReward.objects.exists())
+
+
+class GamificationProfileTest(TestCase):
+    def setUp(self):
+        Level.objects.create(number=1, name='Beginner', points_required=0)
+        self.user = User.objects.create_user(
+            username='profiled',
+            email='profiled@example.com',
+            password='testpass123'
+        )
+        for i in range(3):
+            badge = Badge.objects.create(name=f'Badge {i}', description='Badge', category='general')
+            UserBadge.objects.create(user=self.user, badge=badge)
+            Point.objects.create(user=self.user, amount=10, source='test')
+    
+    def test_profile_queries_are_bounded_and_cached(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            profile_service.invalidate_profiles([self.user.pk])
+        
+        with self.assertNumQueries(6):
+            profile = profile_service.get_profile(self.user)
+        self.assertEqual(len(profile['badges']), 3)
+        self.assertEqual(profile['level']['total_points'], 30)
+        
+        with self.assertNumQueries(0):
+            profile_service.get_profile(self.user)
+    
+    def test_profile_invalidated_by_signals(self):
+        profile_service.get_profile(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            Point.objects.create(user=self.user, amount=5, source='test')
+        
+        self.assertEqual(profile_service.get_profile(self.user)['level']['total_points'], 35)
+
+
+class ActivityStreakTest(TestCase):
+    def setUp(self):
+        Level.objects.create(number=1, name='Beginner', points_required=0)
+        self.user = User.objects.create_user(
+            username='streaker',
+            email='streaker@example.com',
+            password='testpass123'
+        )
+        self.today = timezone.localdate()
+    
+    def record(self, days_ago):
+        day = self.today - timedelta(days=days_ago)
+        activity_service.record_activity(
+            self.user.pk,
+            ActivityDay.SOURCE_MODULE,
+            timezone.make_aware(datetime.combine(day, time(12)))
+        )
+    
+    def test_streaks_advance_incrementally(self):
+        for days_ago in [6, 5, 3, 2, 1, 1, 0]:
+            self.record(days_ago)
+        
+        streak = activity_service.get_streak(self.user)
+        self.assertEqual((streak['current_streak'], streak['longest_streak']), (4, 4))
+        self.assertEqual(ActivityDay.objects.filter(user=self.user).count(), 6)
+        self.assertEqual(
+            [day['events'] for day in activity_service.get_heatmap(self.user, days=7)],
+            [1, 1, 1, 1, 2, 1]
+        )
+    
+    def test_points_are_activity_and_rebuild_matches(self):
+        Point.objects.create(user=self.user, amount=10, source='test')
+        self.assertEqual(activity_service.get_streak(self.user)['current_streak'], 1)
+        
+        ActivityStreak.objects.all().delete()
+        ActivityDay.objects.all().delete()
+        activity_service.rebuild()
+        self.assertEqual(activity_service.get_streak(self.user)['current_streak'], 1)
+        self.assertEqual(ActivityDay.objects.get(user=self.user).sources, ActivityDay.SOURCE_POINTS)
+
+
+class AchievementRuleEngineTest(TestCase):
+    def setUp(self):
+        self.level1 = Level.objects.create(number=1, name='Beginner', points_required=0)
+        self.user = User.objects.create_user(
+            username='achiever',
+            email='achiever@example.com',
+            password='testpass123'
+        )
+        self.collector = Achievement.objects.create(
+            name='Collector',
+            description='Earn two badges',
+            criteria={'badges_count': 2},
+            points_reward=5
+        )
+        self.veteran = Achievement.objects.create(
+            name='Veteran',
+            description='Reach level 1 with a badge',
+            criteria={'min_level': 1, 'badges_count': 1}
+        )
+        Achievement.objects.create(
+            name='Mystery',
+            description='Unknown criteria',
+            criteria={'secret_metric': 1}
+        )
+        self.badges = [
+            Badge.objects.create(name=f'Badge {i}', description='', category='test')
+            for i in range(2)
+        ]
+    
+    def test_unlocks_only_when_all_criteria_met(self):
+        self.assertEqual(achievement_service.check_all_achievements(self.user), [])
+        
+        UserBadge.objects.create(user=self.user, badge=self.badges[0])
+        self.assertEqual(
+            list(UserAchievement.objects.filter(user=self.user).values_list('achievement', flat=True)),
+            [self.veteran.pk]
+        )
+        
+        UserBadge.objects.create(user=self.user, badge=self.badges[1])
+        self.assertEqual(UserAchievement.objects.filter(user=self.user).count(), 2)
+        # Rewards are granted for bulk-created achievements too
+        self.assertTrue(Point.objects.filter(user=self.user, source='achievement', amount=5).exists())
+    
+    def test_unlock_invalidates_profile(self):
+        # Inserted without signals, so that nothing is unlocked yet
+        UserBadge.objects.bulk_create([UserBadge(user=self.user, badge=self.badges[0])])
+        self.assertEqual(profile_service.get_profile(self.user)['achievements'], [])
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            achievement_service.check_badge_achievements(self.user)
+        achievements = profile_service.get_profile(self.user)['achievements']
+        self.assertEqual([a['achievement']['id'] for a in achievements], [self.veteran.pk])
+    
+    def test_already_unlocked_not_duplicated(self):
+        UserBadge.objects.create(user=self.user, badge=self.badges[0])
+        self.assertEqual(achievement_service.check_all_achievements(self.user), [])
@@ -0,0 +1,137 @@
+# gamification/test/test_views.py
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from ..models import Leaderboard, LeaderboardEntry, Level, Point
+from ..services import leaderboard_service
+from ..services.leaderboard_store import get_leaderboard_store
+
+IN_MEMORY_STORE = {
+    'BACKEND': 'gamification.services.leaderboard_store.InMemoryLeaderboardStore',
+}
+
+User = get_user_model()
+
+
+@override_settings(LEADERBOARD_STORE=IN_MEMORY_STORE)
+class LeaderboardRankingViewTest(TestCase):
+    def setUp(self):
+        get_leaderboard_store.cache_clear()
+        Level.objects.create(number=1, name='Beginner', points_required=0)
+        self.leaderboard = Leaderboard.objects.create(
+            name='Points All Time',
+            category='points',
+            period='all_time'
+        )
+        self.users = [
+            User.objects.create_user(
+                username=f'ranked{i}',
+                email=f'ranked{i}@example.com',
+                password='testpass123'
+            )
+            for i in range(3)
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            for user, amount in zip(self.users, [30, 10, 30]):
+                Point.objects.create(user=user, amount=amount, source='test')
+        leaderboard_service.process_dirty_users()
+        
+        self.client = APIClient()
+        self.client.force_authenticate(self.users[1])
+        self.url = reverse('leaderboardentry-ranking')
+    
+    def fetch_all(self, url):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append([(entry['score'], entry['rank']) for entry in response.data['results']])
+            url = response.data['next']
+        return pages
+    
+    def test_live_ranking_matches_around_me(self):
+        # The store is ahead of the entry table, which is still empty
+        self.assertFalse(LeaderboardEntry.objects.exists())
+        
+        pages = self.fetch_all(f"{self.url}?leaderboard={self.leaderboard.pk}&limit=2")
+        self.assertEqual(pages, [[(30, 1), (30, 1)], [(10, 3)]])
+        
+        response = self.client.get(
+            reverse('leaderboardentry-around-me'),
+            {'leaderboard': self.leaderboard.pk, 'radius': 0, 'top': 0}
+        )
+        self.assertEqual(
+            [(entry['score'], entry['rank']) for entry in response.data['around']],
+            [(10, 3)]
+        )
+    
+    def test_frozen_ranking_read_from_snapshot(self):
+        leaderboard_service.sync_leaderboard_from_store(self.leaderboard)
+        self.leaderboard.is_active = False
+        self.leaderboard.save()
+        leaderboard_service.freeze_leaderboard(self.leaderboard)
+        
+        pages = self.fetch_all(f"{self.url}?leaderboard={self.leaderboard.pk}&limit=2")
+        self.assertEqual(pages, [[(30, 1), (30, 1)], [(10, 3)]])
+    
+    def test_history_validates_leaderboard_like_ranking(self):
+        url = reverse('leaderboardentry-history')
+        for view_url in (url, self.url):
+            response = self.client.get(view_url, {'leaderboard': 'bogus'})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('leaderboard', response.data)
+        
+        # Not frozen yet
+        response = self.client.get(url, {'leaderboard': self.leaderboard.pk})
+        self.assertEqual(response.status_code, 404)
+    
+    def test_history_matches_frozen_ranking(self):
+        leaderboard_service.sync_leaderboard_from_store(self.leaderboard)
+        self.leaderboard.is_active = False
+        self.leaderboard.save()
+        leaderboard_service.freeze_leaderboard(self.leaderboard)
+        
+        response = self.client.get(reverse('leaderboardentry-history'), {'leaderboard': self.leaderboard.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['participants'], 3)
+        self.assertEqual(response.data['my_position']['rank'], 3)
+        ranking = self.client.get(self.url, {'leaderboard': self.leaderboard.pk})
+        self.assertEqual(
+            [entry['user'] for entry in response.data['entries']],
+            [entry['user'] for entry in ranking.data['results']]
+        )
+    
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'leaderboard': self.leaderboard.pk, 'cursor': 'bogus'})
+        self.assertEqual(response.status_code, 404)
+
+
+class UserGamificationProfileViewTest(TestCase):
+    def setUp(self):
+        Level.objects.create(number=1, name='Beginner', points_required=0)
+        self.user = User.objects.create_user(
+            username='profiled',
+            email='profiled@example.com',
+            password='testpass123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+    
+    def test_cached_profile_is_trimmed(self):
+        url = reverse('usergamificationprofile-my-profile')
+        full = self.client.get(url)
+        self.assertEqual(full.status_code, 200)
+        self.assertIn('badges', full.data)
+        
+        # Served from the cached profile filled by the first request
+        trimmed = self.client.get(url, {'fields': 'id,level'})
+        self.assertEqual(set(trimmed.data), {'id', 'level'})
+        self.assertEqual(trimmed.data['level'], full.data['level'])
+        
+        detail = self.client.get(
+            reverse('usergamificationprofile-detail', args=[self.user.pk]),
+            {'fields': 'username'}
+        )
+        self.assertEqual(detail.data, {'username': 'profiled'})
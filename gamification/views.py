@@ -7,23 +7,31 @@ from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 # Root API view
 from rest_framework.views import APIView
 
+from api.pagination import KeysetCursorPagination
+from api.serializers import SparseFieldsetViewMixin, sparse_fieldset
+
 from .models import (Achievement, Badge, Challenge, Leaderboard,
-                     LeaderboardEntry, Level, Point, Reward, UserAchievement,
-                     UserBadge, UserChallenge, UserLevel, UserReward)
+                     LeaderboardEntry, LeaderboardSnapshot, Level, Point,
+                     Reward, UserAchievement, UserBadge, UserChallenge,
+                     UserLevel, UserReward)
 from .permissions import IsAdminOrReadOnly
 from .serializers import (AchievementSerializer, BadgeSerializer,
-                          ChallengeSerializer, LeaderboardDetailSerializer,
+                          BulkPointAwardSerializer, ChallengeSerializer,
+                          LeaderboardDetailSerializer,
                           LeaderboardEntrySerializer, LeaderboardSerializer,
                           LevelSerializer, PointSerializer, RewardSerializer,
                           UserAchievementSerializer, UserBadgeSerializer,
                           UserChallengeSerializer,
                           UserGamificationProfileSerializer,
                           UserLevelSerializer, UserRewardSerializer)
-from .services import achievement_service, leaderboard_service, point_service
+from .services import (achievement_service, activity_service,
+                       leaderboard_service, point_service, profile_service,
+                       reward_service)
 
 
 class PointViewSet(viewsets.ModelViewSet):
@@ -33,10 +41,10 @@ class PointViewSet(viewsets.ModelViewSet):
     queryset = Point.objects.all()
     serializer_class = PointSerializer
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend]
     filterset_fields = ['user', 'source']
-    ordering_fields = ['created_at', 'amount']
-    ordering = ['-created_at']
+    # Newest first, by (created_at, id)
+    pagination_class = KeysetCursorPagination
     
     def get_queryset(self):
         user = self.request.user
@@ -79,6 +87,43 @@ class PointViewSet(viewsets.ModelViewSet):
                 {"detail": str(e)},
                 status=status.HTTP_400_BAD_REQUEST
             )
+    
+    @action(detail=False, methods=['post'], url_path='bulk-award')
+    def bulk_award(self, request):
+        """Award points to many users in one request, e.g. event prizes."""
+        if not request.user.is_staff:
+            return Response(
+                {"detail": "You do not have permission to perform this action."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        serializer = BulkPointAwardSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        try:
+            points = point_service.bulk_award_points(
+                [
+                    (award['user_id'], award['amount'], award.get('source'), award.get('description'))
+                    for award in data['awards']
+                ],
+                default_source=data['source'],
+                default_description=data['description']
+            )
+        except ValueError as e:
+            return Response(
+                {"detail": str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response(
+            {
+                "awarded": len(points),
+                "users": len({point.user_id for point in points}),
+                "total_points": sum(point.amount for point in points),
+            },
+            status=status.HTTP_201_CREATED
+        )
 
 
 class LevelViewSet(viewsets.ModelViewSet):
@@ -322,9 +367,28 @@ class UserChallengeViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Update progress
-        progress_data = request.data.get('progress', {})
-        progress_percentage = user_challenge.update_progress(progress_data)
+        # Update progress: "progress" sets values, "increment" adds to counters
+        progress_data = request.data.get('progress') or {}
+        increments = request.data.get('increment') or {}
+        if not isinstance(progress_data, dict) or not isinstance(increments, dict):
+            return Response(
+                {"detail": "progress and increment must be objects."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if any(
+            isinstance(value, bool) or not isinstance(value, (int, float))
+            for value in increments.values()
+        ):
+            return Response(
+                {"detail": "increment values must be numbers."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        progress_percentage = user_challenge.progress_percentage
+        if progress_data:
+            progress_percentage = user_challenge.update_progress(progress_data)
+        if increments:
+            progress_percentage = user_challenge.update_progress(increments, increment=True)
         
         return Response({
             "progress_percentage": progress_percentage,
@@ -450,36 +514,15 @@ class RewardViewSet(viewsets.ModelViewSet):
     def redeem(self, request, pk=None):
         """Redeem a reward."""
         reward = self.get_object()
-        user = request.user
-        
-        # Check if reward is available
-        if not reward.is_available:
-            return Response(
-                {"detail": "This reward is not available."},
-                status=status.HTTP_400_BAD_REQUEST
-            )
         
-        # Check if user has enough points
-        user_points = point_service.get_user_total_points(user)
-        if user_points < reward.points_cost:
+        try:
+            user_reward = reward_service.redeem_reward(request.user, reward)
+        except reward_service.RedemptionError as e:
             return Response(
-                {"detail": f"You don't have enough points. Required: {reward.points_cost}, Available: {user_points}"},
+                {"detail": str(e)},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Create user reward
-        user_reward = UserReward.objects.create(
-            user=user,
-            reward=reward,
-            points_spent=reward.points_cost,
-            status='pending'
-        )
-        
-        # Update reward quantity
-        if reward.quantity_available > 0:
-            reward.quantity_available -= 1
-            reward.save()
-        
         return Response(
             UserRewardSerializer(user_reward).data,
             status=status.HTTP_201_CREATED
@@ -544,6 +587,20 @@ class UserRewardViewSet(viewsets.ModelViewSet):
         )
 
 
+def _bounded_int_param(request, name, default, maximum):
+    try:
+        value = int(request.query_params.get(name, default))
+    except (TypeError, ValueError):
+        raise ValidationError({name: "A number is required."})
+    return max(0, min(value, maximum))
+
+
+class LeaderboardRankingPagination(KeysetCursorPagination):
+    """Keyset pages of a leaderboard's standings, by (score, user)."""
+    ordering = ('-score', 'user')
+    page_size = 50
+    page_size_query_param = 'limit'
+
 
 class LeaderboardEntryViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -560,27 +617,91 @@ class LeaderboardEntryViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=False, methods=['get'])
     def my_positions(self, request):
         """Get the current user's positions in leaderboards."""
-        entries = LeaderboardEntry.objects.filter(
-            user=request.user,
-            leaderboard__is_active=True
-        )
+        leaderboards = Leaderboard.objects.filter(is_active=True)
         
         # Filter by category
         category = request.query_params.get('category')
         if category:
-            entries = entries.filter(leaderboard__category=category)
+            leaderboards = leaderboards.filter(category=category)
         
         # Filter by period
         period = request.query_params.get('period')
         if period:
-            entries = entries.filter(leaderboard__period=period)
+            leaderboards = leaderboards.filter(period=period)
         
+        # Live scores and ranks come from the leaderboard store
+        entries = leaderboard_service.get_user_positions(request.user, leaderboards)
         return Response(
             LeaderboardEntrySerializer(entries, many=True).data
         )
+    
+    def _get_leaderboard(self, request):
+        try:
+            leaderboard_id = int(request.query_params.get('leaderboard'))
+        except (TypeError, ValueError):
+            raise ValidationError({"leaderboard": "A valid leaderboard id is required."})
+        return get_object_or_404(Leaderboard, pk=leaderboard_id)
+    
+    @action(detail=False, methods=['get'], url_path='around-me')
+    def around_me(self, request):
+        """
+        Get the current user's entry with up to `radius` neighbours above and
+        below, and the `top` first entries, for a personal leaderboard view.
+        """
+        leaderboard = self._get_leaderboard(request)
+        radius = _bounded_int_param(request, 'radius', default=5, maximum=50)
+        top = _bounded_int_param(request, 'top', default=3, maximum=100)
+        
+        top_entries = []
+        if top and leaderboard.is_active:
+            top_entries = leaderboard_service.get_top_entries(leaderboard, limit=top)
+        elif top:
+            top_entries = leaderboard_service.get_snapshot_entries(leaderboard, limit=top) or []
+        around = leaderboard_service.get_entries_around(leaderboard, request.user, radius)
+        
+        return Response({
+            "leaderboard": LeaderboardSerializer(leaderboard).data,
+            "top": LeaderboardEntrySerializer(top_entries, many=True).data,
+            "around": LeaderboardEntrySerializer(around, many=True).data,
+        })
+    
+    @action(detail=False, methods=['get'], pagination_class=LeaderboardRankingPagination)
+    def ranking(self, request):
+        """
+        Page through a leaderboard by score with keyset pagination. Active
+        boards are read from the store and closed boards from their snapshot,
+        like around-me. Pass the `next` URL of a page to get the following one.
+        """
+        leaderboard = self._get_leaderboard(request)
+        entries = self.paginator.paginate_rows(
+            lambda after, limit: leaderboard_service.get_entries_page(leaderboard, limit, after),
+            LeaderboardEntry,
+            request
+        )
+        return self.get_paginated_response(
+            LeaderboardEntrySerializer(entries, many=True).data
+        )
+    
+    @action(detail=False, methods=['get'])
+    def history(self, request):
+        """Get the frozen standings of a closed leaderboard and the user's position."""
+        leaderboard = self._get_leaderboard(request)
+        snapshot = get_object_or_404(
+            LeaderboardSnapshot.objects.defer('top_entries', 'ranks'),
+            leaderboard=leaderboard
+        )
+        entries = leaderboard_service.get_snapshot_entries(leaderboard)
+        position = leaderboard_service.get_snapshot_position(leaderboard, request.user)
+        
+        return Response({
+            "leaderboard": LeaderboardSerializer(leaderboard).data,
+            "participants": snapshot.participants,
+            "entries": LeaderboardEntrySerializer(entries, many=True).data,
+            "my_position": LeaderboardEntrySerializer(position).data if position else None,
+        })
 
 
-class UserGamificationProfileViewSet(viewsets.ReadOnlyModelViewSet):
+class UserGamificationProfileViewSet(SparseFieldsetViewMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint for user gamification profiles.
     """
@@ -594,12 +715,23 @@ class UserGamificationProfileViewSet(viewsets.ReadOnlyModelViewSet):
             return get_user_model().objects.all()
         return get_user_model().objects.filter(id=user.id)
     
+    def retrieve(self, request, *args, **kwargs):
+        profile = profile_service.get_profile(self.get_object())
+        return Response(sparse_fieldset(profile, request))
+    
     @action(detail=False, methods=['get'])
     def my_profile(self, request):
         """Get the current user's gamification profile."""
-        return Response(
-            UserGamificationProfileSerializer(request.user).data
-        )
+        return Response(sparse_fieldset(profile_service.get_profile(request.user), request))
+    
+    @action(detail=False, methods=['get'])
+    def activity(self, request):
+        """Get the current user's streaks and daily activity calendar."""
+        days = _bounded_int_param(request, 'days', default=365, maximum=731) or 1
+        return Response({
+            **activity_service.get_streak(request.user),
+            "days": activity_service.get_heatmap(request.user, days),
+        })
 
 
 class GamificationAPIRootView(APIView):
@@ -2,6 +2,8 @@ from ctf.models import *
 from django.contrib.auth.models import User
 from rest_framework import serializers
 
+from api.serializers import SparseFieldsetMixin
+
 from .models import *
 
 
@@ -21,7 +23,7 @@ class TagSerializer(serializers.ModelSerializer):
         model = Tag
         fields = ['id', 'name']
 
-class CourseListSerializer(serializers.ModelSerializer):
+class CourseListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     tags = serializers.SerializerMethodField() 
     progress = serializers.SerializerMethodField()
     nb_modules = serializers.SerializerMethodField()
@@ -33,6 +35,14 @@ class CourseListSerializer(serializers.ModelSerializer):
             'duration', 'instructor', 'image', 'students', 'rating',
             'tags', 'progress','nb_modules'
         ]
+        expandable_fields = {
+            'modules': ('learn.serializers.ModuleListSerializer', {'many': True, 'read_only': True}),
+        }
+        prefetch_related_fields = {
+            'tags': ['course_tags__tag'],
+            'nb_modules': ['modules'],
+            'modules': ['modules'],
+        }
     
     def get_progress(self, obj):
         request = self.context.get('request')
@@ -52,7 +62,11 @@ class CourseListSerializer(serializers.ModelSerializer):
     
     def get_tags(self, obj):
         # Récupérer les tags via la relation CourseTag
-        tags = obj.course_tags.all().select_related('tag')
+        # Use the course_tags__tag prefetch of CourseViewSet when there is one
+        if 'course_tags' in getattr(obj, '_prefetched_objects_cache', {}):
+            tags = obj.course_tags.all()
+        else:
+            tags = obj.course_tags.select_related('tag')
         return TagSerializer(
             [course_tag.tag for course_tag in tags],
             many=True,
@@ -74,7 +88,7 @@ class ModuleListSerializer(serializers.ModelSerializer):
             ).exists()
         return False
 
-class CourseDetailSerializer(serializers.ModelSerializer):
+class CourseDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     tags = TagSerializer(source='course_tags.tag', many=True, read_only=True)
     modules = ModuleListSerializer(many=True, read_only=True)
     progress = serializers.SerializerMethodField()
@@ -87,6 +101,10 @@ class CourseDetailSerializer(serializers.ModelSerializer):
             'duration', 'prerequisites', 'instructor', 'image', 'students',
             'rating', 'tags', 'modules', 'progress', 'certification'
         ]
+        prefetch_related_fields = {
+            'tags': ['course_tags__tag'],
+            'modules': ['modules'],
+        }
     
     def get_progress(self, obj):
         request = self.context.get('request')
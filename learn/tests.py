@@ -1,3 +1,35 @@
 from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
 
-# Create your tests here.
+from accounts.models import User
+
+from .models import Course, Module
+from .views import CourseViewSet
+
+
+class CourseSparseFieldsetTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', email='alice@example.com', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.course = Course.objects.create(
+            title='Web security', slug='web-security', description='', level='beginner',
+            category='web', duration='4 weeks', instructor='Bob', image='course.png'
+        )
+        for order in range(2):
+            Module.objects.create(course=self.course, title=f'Module {order}', duration='1h', order=order)
+
+    def test_fields_and_expand(self):
+        response = self.client.get('/api/learn/courses/', {'fields': 'id,title', 'expand': 'modules'})
+        self.assertEqual(response.status_code, 200)
+        results = response.data.get('results', response.data)
+        self.assertEqual(set(results[0]), {'id', 'title', 'modules'})
+        self.assertEqual(len(results[0]['modules']), 2)
+
+    def test_custom_actions_prefetch_relations(self):
+        view = CourseViewSet(action='modules', request=Request(APIRequestFactory().get('/')))
+        self.assertEqual(
+            set(view.get_queryset()._prefetch_related_lookups),
+            {'modules', 'course_tags__tag'}
+        )
@@ -2,6 +2,7 @@ import json
 
 from accounts.models import *
 from accounts.models import User
+from api.serializers import SparseFieldsetViewMixin
 from django.db import transaction
 from django.db.models import Count, Q
 from django.shortcuts import get_object_or_404
@@ -229,7 +230,7 @@ class AdminContentItemViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAdminUser]
     parser_classes = [MultiPartParser, FormParser, JSONParser]
     
-class CourseViewSet(viewsets.ReadOnlyModelViewSet):
+class CourseViewSet(SparseFieldsetViewMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint pour les cours
     """
@@ -244,10 +245,13 @@ class CourseViewSet(viewsets.ReadOnlyModelViewSet):
         return CourseListSerializer
     
     def get_queryset(self):
-        queryset = Course.objects.prefetch_related(
-            'modules', 
-            'course_tags__tag',            
-        ).all()
+        queryset = Course.objects.all()
+        # List and retrieve only prefetch the relations of the requested fields
+        if self.action not in ('list', 'retrieve'):
+            queryset = queryset.prefetch_related(
+                'modules', 
+                'course_tags__tag',            
+            )
         
         # Filtrer par niveau
         level = self.request.query_params.get('level')
@@ -136,6 +136,10 @@ class Message(models.Model):
     
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # Keyset pagination of the channel history
+            models.Index(fields=['channel', 'created_at', 'id']),
+        ]
     
     def __str__(self):
         return f"Message from {self.sender} in {self.channel}"
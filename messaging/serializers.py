@@ -2,6 +2,7 @@
 from rest_framework import serializers
 
 from accounts.serializers import UserSerializer
+from api.serializers import SparseFieldsetMixin
 
 from .models import Attachment, Channel, ChannelMember, Message, ReadReceipt
 
@@ -106,7 +107,7 @@ class ChannelMemberSerializer(serializers.ModelSerializer):
         ).count()
 
 
-class ChannelSerializer(serializers.ModelSerializer):
+class ChannelSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     members_details = ChannelMemberSerializer(source='members', many=True, read_only=True)
     created_by_details = UserSerializer(source='created_by', read_only=True)
     last_message = serializers.SerializerMethodField()
@@ -119,6 +120,8 @@ class ChannelSerializer(serializers.ModelSerializer):
                   'created_by', 'created_by_details', 'members_details',
                   'last_message', 'display_name', 'unread_count']
         read_only_fields = ['id', 'created_at', 'updated_at', 'created_by']
+        select_related_fields = {'created_by_details': ['created_by']}
+        prefetch_related_fields = {'members_details': ['members__user']}
     
     def get_last_message(self, obj):
         last_msg = obj.messages.order_by('-created_at').first()
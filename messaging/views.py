@@ -6,6 +6,9 @@ from rest_framework import filters, permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from api.pagination import KeysetCursorPagination
+from api.serializers import SparseFieldsetViewMixin
+
 from .models import Attachment, Channel, ChannelMember, Message, ReadReceipt
 from .permissions import IsChannelAdmin, IsChannelMember, IsMessageSender
 from .serializers import (AttachmentSerializer, ChannelMemberSerializer,
@@ -13,7 +16,7 @@ from .serializers import (AttachmentSerializer, ChannelMemberSerializer,
                           ReadReceiptSerializer)
 
 
-class ChannelViewSet(viewsets.ModelViewSet):
+class ChannelViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     serializer_class = ChannelSerializer
     permission_classes = [permissions.IsAuthenticated, IsChannelMember]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
@@ -27,12 +30,12 @@ class ChannelViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
     
-    @action(detail=True, methods=['get'])
+    @action(detail=True, methods=['get'], pagination_class=KeysetCursorPagination)
     def messages(self, request, pk=None):
         channel = self.get_object()
         
         # Get messages for this channel
-        messages = channel.messages.all().order_by('-created_at')
+        messages = channel.messages.all()
         
         # Filter by date range if provided
         since = request.query_params.get('since')
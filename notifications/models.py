@@ -49,6 +49,10 @@ class Notification(models.Model):
         verbose_name = _('notification')
         verbose_name_plural = _('notifications')
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of a user's notifications
+            models.Index(fields=['user', 'created_at', 'id']),
+        ]
     
     def __str__(self):
         return f"Notification for {self.user.username}: {self.title}"
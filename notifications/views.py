@@ -2,10 +2,12 @@
 from django.db.models import Q
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, permissions, status, viewsets
+from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from api.pagination import KeysetCursorPagination
+
 from .models import Notification, NotificationPreference
 from .permissions import IsUserOrAdmin
 from .serializers import (NotificationPreferenceSerializer,
@@ -15,9 +17,10 @@ from .serializers import (NotificationPreferenceSerializer,
 class NotificationViewSet(viewsets.ModelViewSet):
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated, IsUserOrAdmin]
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend]
     filterset_fields = ['user', 'notification_type', 'is_read']
-    ordering_fields = ['created_at', 'updated_at']
+    # Newest first, by (created_at, id)
+    pagination_class = KeysetCursorPagination
     
     def get_queryset(self):
         if self.request.user.is_staff or self.request.user.role == 'administrator':
@@ -101,9 +104,6 @@ class NotificationViewSet(viewsets.ModelViewSet):
         if notification_type:
             notifications = notifications.filter(notification_type=notification_type)
         
-        # Order by created_at (newest first)
-        notifications = notifications.order_by('-created_at')
-        
         page = self.paginate_queryset(notifications)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
@@ -40,6 +40,11 @@ class Post(models.Model):
         verbose_name = _('post')
         verbose_name_plural = _('posts')
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of the feed
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['user', 'created_at', 'id']),
+        ]
     
     def __str__(self):
         return f"{self.user.username}'s post - {self.created_at.strftime('%Y-%m-%d %H:%M')}"
@@ -1,7 +1,9 @@
 # social/serializers.py
+from django.db import transaction
 from rest_framework import serializers
 
 from accounts.serializers import UserSerializer
+from api.serializers import SparseFieldsetMixin
 from core.serializers import SkillSerializer, TagSerializer
 
 from .models import (Comment, Conversation, Message, Post, Project,
@@ -44,7 +46,7 @@ class CommentSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     user_details = UserSerializer(source='user', read_only=True)
     tags = TagSerializer(many=True, read_only=True)
     comment_count = serializers.SerializerMethodField()
@@ -62,6 +64,11 @@ class PostSerializer(serializers.ModelSerializer):
                   'is_public', 'tags', 'comment_count', 'like_count',
                   'share_count', 'is_liked', 'is_saved']
         read_only_fields = ['id', 'user', 'created_at', 'updated_at', 'is_edited']
+        expandable_fields = {
+            'mentions': (UserSerializer, {'many': True, 'read_only': True}),
+        }
+        select_related_fields = {'user_details': ['user']}
+        prefetch_related_fields = {'tags': ['tags'], 'mentions': ['mentions']}
     
     def get_comment_count(self, obj):
         return obj.comments.count()
@@ -101,11 +108,13 @@ class PostSerializer(serializers.ModelSerializer):
         # Handle tags
         tags_data = self.context['request'].data.get('tags', [])
         
-        post = Post.objects.create(**validated_data)
-        
-        # Add tags
-        if tags_data:
-            post.tags.set(tags_data)
+        # The author's post_count is incremented by a post_save receiver
+        with transaction.atomic():
+            post = Post.objects.create(**validated_data)
+            
+            # Add tags
+            if tags_data:
+                post.tags.set(tags_data)
         
         return post
     
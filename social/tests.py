@@ -1,3 +1,54 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from accounts.models import Tag, User
+
+from .models import Post
+
+
+class PostSparseFieldsetTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', email='alice@example.com', password='password')
+        self.bob = User.objects.create_user(username='bob', email='bob@example.com', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('post-feed')
+        self.tag = Tag.objects.create(name='web')
+        self.create_posts(2)
+
+    def create_posts(self, count):
+        for index in range(count):
+            post = Post.objects.create(user=self.user, content=f'Post {index}')
+            post.mentions.add(self.bob)
+
+    def get_results(self, params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data['results']
+
+    def test_fields(self):
+        results = self.get_results({'fields': 'id,content'})
+        self.assertTrue(results)
+        for post in results:
+            self.assertEqual(set(post), {'id', 'content'})
+
+    def test_expand(self):
+        self.assertNotIn('mentions', self.get_results({})[0])
+
+        for post in self.get_results({'fields': 'id', 'expand': 'mentions'}):
+            self.assertEqual(set(post), {'id', 'mentions'})
+            self.assertEqual([mention['username'] for mention in post['mentions']], ['bob'])
+
+    def test_requested_relations_are_prefetched(self):
+        params = {'fields': 'id,tags'}
+        with CaptureQueriesContext(connection) as few:
+            self.get_results(params)
+        self.create_posts(5)
+        for post in Post.objects.all():
+            post.tags.add(self.tag)
+        with CaptureQueriesContext(connection) as many:
+            self.assertEqual(len(self.get_results(params)), 7)
+        self.assertEqual(len(many), len(few))
@@ -6,6 +6,9 @@ from rest_framework import filters, permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from api.pagination import KeysetCursorPagination
+from api.serializers import SparseFieldsetViewMixin
+
 from .models import (Comment, Conversation, Message, Post, Project,
                      SocialInteraction)
 from .permissions import (IsOwnerOrReadOnly, IsParticipantOrAdmin,
@@ -15,7 +18,7 @@ from .serializers import (CommentSerializer, ConversationSerializer,
                           SocialInteractionSerializer)
 
 
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -180,7 +183,7 @@ class PostViewSet(viewsets.ModelViewSet):
         serializer = CommentSerializer(comments, many=True, context={'request': request})
         return Response(serializer.data)
     
-    @action(detail=False, methods=['get'])
+    @action(detail=False, methods=['get'], pagination_class=KeysetCursorPagination)
     def feed(self, request):
         # Get posts from users the current user follows
         from accounts.models import UserFollowing
@@ -193,7 +196,8 @@ class PostViewSet(viewsets.ModelViewSet):
         queryset = Post.objects.filter(
             Q(user=request.user) | Q(user__in=following_users),
             is_public=True
-        ).order_by('-created_at')
+        )
+        queryset = self.prefetch_for_fields(queryset)
         
         page = self.paginate_queryset(queryset)
         if page is not None:
@@ -79,6 +79,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # For static files in production
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -86,6 +87,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'accounts.middleware.LastActiveMiddleware',
+    'api.middleware.ApiRequestMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware',
@@ -188,11 +191,18 @@ REST_FRAMEWORK = {
         'burst': '60/min',
         'sustained': '1000/day',
         'anon': '20/min',
+        'flag_submission': '10/min',
+        'chat_stream': '30/min',
     },
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'api.renderers.FastJSONRenderer',
         'api.renderers.AdminBrowsableAPIRenderer',
     ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -298,9 +308,85 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Shared cache (also carries the version keys of process-local caches, see core/cache.py)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://localhost:6379/2',
+    }
+}
+
+# Shared GCRA rate limits of api.throttling (InMemoryThrottleStore is per
+# process and only used by the tests, see TEST_SETTINGS)
+THROTTLE_STORE = {
+    'BACKEND': 'api.throttling.RedisThrottleStore',
+    'OPTIONS': {
+        'url': 'redis://localhost:6379/3',
+    },
+}
+
+# Live leaderboard scores and ranks (gamification.services.leaderboard_store)
+LEADERBOARD_STORE = {
+    'BACKEND': 'gamification.services.leaderboard_store.RedisLeaderboardStore',
+    'OPTIONS': {
+        'url': 'redis://localhost:6379/1',
+    },
+}
+
+
+# Per-request instrumentation (core.instrumentation): Server-Timing header,
+# route histograms at /api/core/performance/ and query budgets by URL name
+PERFORMANCE = {
+    'SERVER_TIMING': True,
+    # Only staff users get Server-Timing unless DEBUG is on
+    'EXPOSE_SERVER_TIMING': False,
+    'QUERY_BUDGETS': {
+        'api_user_info': 5,
+        'leader-list': 5,
+        'usergamificationprofile-detail': 10,
+        'usergamificationprofile-my-profile': 10,
+        'usergamificationprofile-activity': 5,
+        'leaderboardentry-around-me': 10,
+        'leaderboardentry-ranking': 10,
+    },
+    # Budget overruns are logged; TEST_SETTINGS makes them fail the tests
+    'RAISE_ON_BUDGET': False,
+}
+
+# API request log (api.request_log): buffered in each process and written
+# in batches by a background thread
+API_REQUEST_LOG = {
+    'ENABLED': True,
+    'BUFFER_SIZE': 10000,
+    'BODY_SAMPLE_RATE': 0.01,
+    'BODY_MAX_BYTES': 4096,
+    'RETENTION_DAYS': 30,
+}
+
+# Overrides applied by core.test_runner while the test suite runs
+TEST_RUNNER = 'core.test_runner.TestRunner'
+TEST_SETTINGS = {
+    # The request log is written by a background thread, outside the test
+    # transactions and possibly after the test database is gone
+    'API_REQUEST_LOG': {**API_REQUEST_LOG, 'ENABLED': False},
+    'PERFORMANCE': {**PERFORMANCE, 'RAISE_ON_BUDGET': True},
+    'THROTTLE_STORE': {'BACKEND': 'api.throttling.InMemoryThrottleStore'},
+    'LEADERBOARD_STORE': {'BACKEND': 'gamification.services.leaderboard_store.InMemoryLeaderboardStore'},
+    # No Redis needed, and no cache entries or version keys left between runs
+    'CACHES': {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    },
+}
 
 # Email settings
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# E-mails are delivered by core.tasks.send_queued_mail_task; use
+# EMAIL_BACKEND=django.core.mail.backends.filebased.EmailBackend (written
+# to EMAIL_FILE_PATH) or ...console.EmailBackend to avoid SMTP locally.
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_FILE_PATH = os.getenv('EMAIL_FILE_PATH', os.path.join(BASE_DIR, 'sent_emails'))
+EMAIL_TIMEOUT = 10
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
@@ -421,6 +507,26 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'core.tasks.health_check_instances',
         'schedule': timedelta(minutes=5),
     },
+    'process_dirty_leaderboards': {
+        'task': 'gamification.tasks.process_dirty_leaderboards_task',
+        'schedule': timedelta(seconds=5),
+    },
+    'sync_leaderboards': {
+        'task': 'gamification.tasks.update_leaderboard_ranks_task',
+        'schedule': timedelta(minutes=5),
+    },
+    'send_queued_mail': {
+        'task': 'core.tasks.send_queued_mail_task',
+        'schedule': timedelta(minutes=1),
+    },
+    'prune_api_requests': {
+        'task': 'api.tasks.prune_api_requests_task',
+        'schedule': timedelta(days=1),
+    },
+    'flush_last_active': {
+        'task': 'accounts.tasks.flush_last_active_task',
+        'schedule': timedelta(minutes=1),
+    },
 }
 
 